@@ -0,0 +1,33 @@
+"""Soft delete columns for folders, processes, queue definitions and sessions
+
+Revision ID: 5d8e3b1f0a27
+Revises: c4f1a9d2e7b6
+Create Date: 2026-10-19 17:05:48.731260
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d8e3b1f0a27"
+down_revision = "c4f1a9d2e7b6"
+branch_labels = None
+depends_on = None
+
+TABLES = ("uipath_folders", "uipath_processes", "uipath_queuedefinitions", "uipath_sessions")
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column("IsDeleted", sa.Boolean(), server_default=sa.false(), nullable=False))
+        op.add_column(table, sa.Column("DeletedAt", sa.DateTime(), nullable=True))
+    op.add_column("sync_runs", sa.Column("deleted", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("sync_runs", "deleted")
+    for table in TABLES:
+        op.drop_column(table, "DeletedAt")
+        op.drop_column(table, "IsDeleted")
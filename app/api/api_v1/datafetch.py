@@ -1,11 +1,14 @@
 from typing import Any
 
+from celery import Task
 from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 from uipath_orchestrator_rest.rest import ApiException
 
 import app.worker.uipath as uipathtasks
 from app import crud, schemas
+from app.core.celery_app import BULK_QUEUE
+from app.core.tracing import span
 from app.db.session import get_db
 
 router = APIRouter()
@@ -29,8 +32,9 @@ def fetchfolders(
     """
     try:
         # Gets folders.
-        kwargs = {"fulldata": formdata.fulldata, "upsert": formdata.upsert}
-        uipathtasks.fetchfolders.apply_async(kwargs=kwargs)
+        kwargs = {"fulldata": formdata.fulldata, "upsert": formdata.upsert, "fullresult": formdata.fullresult}
+        with span("datafetch.dispatch", entity="folders"):
+            uipathtasks.fetchfolders.apply_async(kwargs=kwargs, queue=BULK_QUEUE)
     except ApiException as e:
         logger.error(f"Exception when calling FoldersApi->folders_get: {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -49,6 +53,18 @@ def validate_or_folderlist(formdata: schemas.UIPFetchPostBody) -> list[int]:
     return formdata.folderlist
 
 
+def dispatch_sync(task: Task, entity: str, formdata: schemas.UIPFetchPostBody, kwargs: dict) -> None:
+    # Requests from the API are backfills: bulk queue, so they never delay the scheduled polling
+    # Fan-out mode splits the sync in one subtask per folder, spread across the workers
+    # The trace context of the span travels in the task headers, so the sync shows up in the request trace
+    kwargs = {**kwargs, "fullresult": formdata.fullresult}
+    with span("datafetch.dispatch", entity=entity, fanout=formdata.fanout):
+        if formdata.fanout:
+            uipathtasks.fanoutsync.apply_async(kwargs={"entity": entity, **kwargs}, queue=BULK_QUEUE)
+        else:
+            task.apply_async(kwargs=kwargs, queue=BULK_QUEUE)
+
+
 # -------------------------------
 # ---------------Jobs------------
 # -------------------------------
@@ -74,7 +90,7 @@ def fetchjobs(
             "filter": formdata.filter,
             "folderlist": folderlist,
         }
-        uipathtasks.fetchjobs.apply_async(kwargs=kwargs)
+        dispatch_sync(uipathtasks.fetchjobs, "jobs", formdata=formdata, kwargs=kwargs)
     except ApiException as e:
         logger.error(f"Exception when calling JobsAPI->jobs_get: {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -108,7 +124,7 @@ def fetchprocesses(
             "filter": formdata.filter,
             "folderlist": folderlist,
         }
-        uipathtasks.fetchprocesses.apply_async(kwargs=kwargs)
+        dispatch_sync(uipathtasks.fetchprocesses, "processes", formdata=formdata, kwargs=kwargs)
     except ApiException as e:
         logger.error(f"Exception when calling ReleasesAPI->releases_get: {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -143,7 +159,7 @@ def fetchqueuedefinitions(
             "folderlist": folderlist,
         }
         # celery_app.send_task("app.worker.uipath.fetchqueuedefinitions", kwargs=kwargs)
-        uipathtasks.fetchqueuedefinitions.apply_async(kwargs=kwargs)
+        dispatch_sync(uipathtasks.fetchqueuedefinitions, "queuedefinitions", formdata=formdata, kwargs=kwargs)
     except ApiException as e:
         logger.error(f"Exception when calling QueueDefinitionsAPI->queuedefinitions_get {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -178,7 +194,7 @@ def fetchqueueitems(
             "folderlist": folderlist,
         }
         # celery_app.send_task("app.worker.uipath.fetchqueueitems", kwargs=kwargs)
-        uipathtasks.fetchqueueitems.apply_async(kwargs=kwargs)
+        dispatch_sync(uipathtasks.fetchqueueitems, "queueitems", formdata=formdata, kwargs=kwargs)
     except ApiException as e:
         logger.error(f"Exception when calling QueueItemsAPI->queueItems_get:{e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -213,7 +229,7 @@ def fetchqueueitemevents(
             "folderlist": folderlist,
         }
         # celery_app.send_task("app.worker.uipath.fetchqueueitemevents", kwargs=kwargs)
-        uipathtasks.fetchqueueitemevents.apply_async(kwargs=kwargs)
+        dispatch_sync(uipathtasks.fetchqueueitemevents, "queueitemevents", formdata=formdata, kwargs=kwargs)
     except ApiException as e:
         logger.error(f"Exception when calling QueueItemsAPI->queueItems_get: {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
@@ -246,9 +262,11 @@ def fetchsessions(
             "upsert": formdata.upsert,
             "filter": formdata.filter,
             "folderlist": folderlist,
+            "fullresult": formdata.fullresult,
         }
         # celery_app.send_task("app.worker.uipath.fetchsessions", kwargs=kwargs)
-        uipathtasks.fetchsessions.apply_async(kwargs=kwargs)
+        with span("datafetch.dispatch", entity="sessions"):
+            uipathtasks.fetchsessions.apply_async(kwargs=kwargs, queue=BULK_QUEUE)
     except ApiException as e:
         logger.error(f"Exception when calling SessionsAPI->sessions_get {e.body}")
         raise HTTPException(status_code=409, detail=f"Could not request data to UIPath: {e.body}")
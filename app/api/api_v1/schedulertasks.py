@@ -5,12 +5,15 @@ from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING, STATE_STOPP
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from loguru import logger
+from sqlalchemy.orm import Session
 from uipath_orchestrator_rest.rest import ApiException
 
 import app.worker.uipath as uipathtasks
 from app import crud, schemas
 from app.api import deps
+from app.core.config import settings
 from app.schedules import scheduler as schmodule
+from app.schedules.adaptive import adaptive_policy
 
 
 class JobSchema(schemas.BaseSchema):
@@ -66,6 +69,24 @@ def getschedules(scheduler=Depends(deps.get_scheduler)) -> list[JobSchema]:
     return alljobschemas
 
 
+@router.get("/adaptive", response_model=None, status_code=200)
+def getadaptiveintervals() -> dict:
+    # Current intervals of the adaptive schedules (per entity or entity:folder)
+    return {"enabled": settings.ADAPTIVE_SCHEDULE_ENABLED, "keys": adaptive_policy.snapshot()}
+
+
+@router.get("/syncruns", response_model=list[schemas.SyncRun], status_code=200)
+def getsyncruns(entity: Optional[str] = None, limit: int = 50, db: Session = Depends(deps.get_db_read)) -> Any:
+    # Latest runs of the sync tasks (sync_runs ledger), optionally for a single entity
+    return crud.sync_run.get_recent(db=db, entity=entity, limit=min(limit, 500))
+
+
+@router.get("/syncruns/trends", response_model=list[schemas.SyncRunTrend], status_code=200)
+def getsyncruntrends(hours: int = 24, db: Session = Depends(deps.get_db_read)) -> Any:
+    # Per entity aggregates of the sync runs in the last hours
+    return crud.sync_run.get_trends(db=db, hours=hours)
+
+
 @router.get("/schedule/{id}", response_model=None, status_code=200)
 def getschedulebyid(id: str, scheduler=Depends(deps.get_scheduler)) -> JobSchema | None:
     # Get schedule based on id in the path and update its interval (in seconds)
@@ -16,12 +16,12 @@ def getprocesses(
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get processes from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
@@ -45,12 +45,12 @@ def getqueues(
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get processes from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
@@ -1,49 +1,141 @@
+import functools
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from loguru import logger
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 
 import app.worker.uipath
 from app import crud, schemas
 from app.api import deps
+from app.core.config import settings
+from app.core.querycache import normalize_query, query_cache
+from app.crud.base import CRUDBase, odata_query_cache_info
 from app.worker.uipath import FetchUIPathToken, GetUIPathToken
 
 router = APIRouter()
 
 
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Evaluates the conditional GET headers. If-None-Match takes precedence over If-Modified-Since.
+    If-Modified-Since only has 1 second resolution: see _get_local_data for why it can't give a false 304"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+@functools.cache
+def _list_adapter(response_schema: type[BaseModel]) -> TypeAdapter:
+    # Built once per schema, pydantic-core compiles the validator/serializer
+    return TypeAdapter(list[response_schema])  # type: ignore
+
+
+def _get_local_data(
+    crudobject: CRUDBase,
+    response_schema: type[BaseModel],
+    request: Request,
+    db: Session,
+    filter: Optional[str],
+    select: Optional[str],
+    top: Optional[int],
+    skip: Optional[int],
+) -> Response:
+    """Runs the OData query (or the paginated get) for the endpoint, going through the query cache.
+    The cache stores the already serialized JSON so hits skip both the DB and the serialization.
+    Responses carry ETag/Last-Modified built from the last time the ingestion wrote the entity, so
+    polling clients get a 304 Not Modified without touching the main tables. The ETag is the validator to use:
+    Last-Modified has 1 second resolution, so it's only sent once the second of the last write has passed
+    (any later write then falls in a later second and can't be mistaken for the one the client has).
+    The session may be on the read replica: the version token is read from it too, so it matches the rows served.
+
+    Args:
+        crudobject (CRUDBase): CRUD object of the entity
+        response_schema (type[BaseModel]): InDB schema used to serialize the rows
+        request (Request): Incoming request (for the conditional headers)
+        db (Session): Database session
+        Standard OData Queries
+
+    Returns:
+        Response: JSON response with the results
+    """
+    entity = crudobject.model.__tablename__
+    normalized_query = normalize_query(filter, select, top, skip)
+    headers = {}
+    last_written = crud.tracked_synctimes.get_entity_written(db=db, entity=entity)
+    # Same token for the ETag and the query cache, so a cached body never goes out under a newer ETag
+    version_token = last_written.isoformat() if last_written is not None else "never"
+    if last_written is not None:
+        last_written = last_written.replace(tzinfo=timezone.utc)
+        version = f"{entity}|{last_written.isoformat()}|{normalized_query}"
+        etag = f'"{hashlib.sha1(version.encode()).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if last_written.replace(microsecond=0) < datetime.now(timezone.utc).replace(microsecond=0):
+            headers["Last-Modified"] = format_datetime(last_written, usegmt=True)
+        if _not_modified(request, etag, last_written):
+            return Response(status_code=304, headers=headers)
+
+    cache_key = None
+    if settings.QUERY_CACHE_ENABLED:
+        cached, cache_key = query_cache.get(entity, version_token, normalized_query)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", status_code=200, headers=headers)
+    if filter:
+        try:
+            results = crudobject.get_odata(db=db, filter=filter)  # type: ignore
+        except Exception as e:
+            raise HTTPException(status_code=401, detail="Invalid OData Query")
+    else:
+        try:
+            results = crudobject.get_multi(db=db, skip=skip, limit=top)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail="Error retrieving data")
+    adapter = _list_adapter(response_schema)
+    content = adapter.dump_json(adapter.validate_python(results, from_attributes=True)).decode()
+    query_cache.set(cache_key, content)
+    return Response(content=content, media_type="application/json", status_code=200, headers=headers)
+
+
 # -------------------------------
 # -------------Folders----------
 # -------------------------------
 
 
-@router.get("/folders", response_model=None, status_code=201)
+@router.get("/folders", response_model=list[schemas.FolderInDB], status_code=200)
 def getfolders(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get folders from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
         results: List of Folders (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_folder.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_folder.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_folder, schemas.FolderInDB, request=request, db=db, filter=filter, select=select, top=top, skip=skip
+    )
 
 
 # -------------------------------
@@ -51,33 +143,27 @@ def getfolders(
 # -------------------------------
 
 
-@router.get("/jobs", response_model=None, status_code=201)
+@router.get("/jobs", response_model=list[schemas.JobInDB], status_code=200)
 def getjobs(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get folders from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
         results: List of Jobs (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_job.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_job.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_job, schemas.JobInDB, request=request, db=db, filter=filter, select=select, top=top, skip=skip
+    )
 
 
 # -------------------------------
@@ -85,33 +171,27 @@ def getjobs(
 # -------------------------------
 
 
-@router.get("/processes", response_model=None, status_code=201)
+@router.get("/processes", response_model=list[schemas.ProcessInDB], status_code=200)
 def getprocesses(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get Processes from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
         results: List of Processes (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_process.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_process.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_process, schemas.ProcessInDB, request=request, db=db, filter=filter, select=select, top=top, skip=skip
+    )
 
 
 # -------------------------------
@@ -119,33 +199,34 @@ def getprocesses(
 # -------------------------------
 
 
-@router.get("/queuedefinitions", response_model=None, status_code=201)
+@router.get("/queuedefinitions", response_model=list[schemas.QueueDefinitionInDB], status_code=200)
 def getqueuedefinitions(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get queuedefinitions from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
         results: List of QueueDefinitions (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_queue_definitions.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_queue_definitions.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_queue_definitions,
+        schemas.QueueDefinitionInDB,
+        request=request,
+        db=db,
+        filter=filter,
+        select=select,
+        top=top,
+        skip=skip,
+    )
 
 
 # -------------------------------
@@ -153,33 +234,34 @@ def getqueuedefinitions(
 # -------------------------------
 
 
-@router.get("/queueitems", response_model=None, status_code=201)
+@router.get("/queueitems", response_model=list[schemas.QueueItemInDB], status_code=200)
 def getqueueitems(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get folders from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
 
     Returns:
         results: List of QueueItems (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_queue_item.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_queue_item.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_queue_item,
+        schemas.QueueItemInDB,
+        request=request,
+        db=db,
+        filter=filter,
+        select=select,
+        top=top,
+        skip=skip,
+    )
 
 
 # -------------------------------
@@ -187,32 +269,33 @@ def getqueueitems(
 # -------------------------------
 
 
-@router.get("/queueitemevents", response_model=None, status_code=201)
+@router.get("/queueitemevents", response_model=list[schemas.QueueItemEventInDB], status_code=200)
 def getqueueitemevents(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get queueitemevents from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         Standard OData Queries
     Returns:
         results: List of QueueItemEvents (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_queue_item_event.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_queue_item_event.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_queue_item_event,
+        schemas.QueueItemEventInDB,
+        request=request,
+        db=db,
+        filter=filter,
+        select=select,
+        top=top,
+        skip=skip,
+    )
 
 
 # -------------------
@@ -220,33 +303,42 @@ def getqueueitemevents(
 # --------------------
 
 
-@router.get("/sessions", response_model=None, status_code=201)
+@router.get("/sessions", response_model=list[schemas.SessionInDB], status_code=200)
 def getsessions(
+    request: Request,
     filter: Optional[str] = Query(None),
     select: Optional[str] = Query(None),
     top: Optional[int] = Query(100),
     skip: Optional[int] = Query(0),
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_db_read),
 ) -> Any:
     """Get Sessions from DB
 
     Args:
-        db (Session, optional): Database session. Defaults to Depends(deps.get_db).
+        db (Session, optional): Database session. Defaults to Depends(deps.get_db_read).
         OData Queries
 
     Returns:
        sessions: List of sessions (Pydantic models)
     """
-    if filter:
-        try:
-            return crud.uip_session.get_odata(db=db, filter=filter)
-        except Exception as e:
-            raise HTTPException(status_code=401, detail="Invalid OData Query")
-    else:
-        try:
-            return crud.uip_session.get_multi(db=db, skip=skip, limit=top)
-        except Exception as e:
-            raise HTTPException(status_code=503, detail="Error retrieving data")
+    return _get_local_data(
+        crud.uip_session, schemas.SessionInDB, request=request, db=db, filter=filter, select=select, top=top, skip=skip
+    )
+
+
+# --------------------------------
+# --------------- Query Cache
+# ------------------------------
+@router.get("/cache", response_model=None, status_code=200)
+def getcachestats() -> Any:
+    """Query cache hit ratios (for this process)
+
+    Returns:
+        stats: Hits, misses and hit ratio per entity, plus the OData statement cache info
+    """
+    stats = query_cache.stats()
+    stats["odata_statements"] = odata_query_cache_info()
+    return stats
 
 
 # --------------------------------
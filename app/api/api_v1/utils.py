@@ -1,11 +1,14 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
 from pydantic.networks import EmailStr
 
 from app import models, schemas
 from app.api import deps
 from app.core.celery_app import celery_app
+from app.core.profiling import list_profiles, profile_path
+from app.db.querylog import query_stats
 from app.utilities import send_test_email
 
 router = APIRouter()
@@ -46,3 +49,51 @@ def test_email(
     """
     send_test_email(email_to=email_to)
     return {"msg": "Test email sent"}
+
+
+@router.get("/profiles", response_model=None, status_code=200)
+def get_profiles(
+    limit: int = 50,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Latest profiles of this process' PROFILING_DIR (requests and tasks), newest first.
+    """
+    return list_profiles(limit=min(limit, 500))
+
+
+@router.get("/profiles/{profile_id}", response_model=None, status_code=200)
+def get_profile(
+    profile_id: str,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Collapsed stacks of a profile (flamegraph.pl or speedscope input).
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
+
+
+@router.get("/querystats", response_model=None, status_code=200)
+def get_query_stats(
+    limit: int = 50,
+    order: str = "total_ms",
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Per-statement stats of this process (normalized SQL), ordered by total_ms, mean_ms, max_ms, calls or slow_calls.
+    """
+    if order not in ("total_ms", "mean_ms", "max_ms", "calls", "slow_calls"):
+        raise HTTPException(status_code=400, detail="Invalid order")
+    return query_stats.top(limit=min(limit, 500), order=order)
+
+
+@router.delete("/querystats", response_model=schemas.Msg, status_code=200)
+def reset_query_stats(current_user: models.User = Depends(deps.get_current_active_superuser)) -> Any:
+    """
+    Clears the per-statement stats of this process.
+    """
+    query_stats.reset()
+    return {"msg": "Query stats cleared"}
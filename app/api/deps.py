@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.core.config import settings
 from app.db.session import get_db_depends as get_db
+from app.db.session import get_db_read_depends as get_db_read
 from app.schedules.scheduler import scheduler
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login/oauth")
@@ -1,8 +1,13 @@
-from datetime import timedelta
+import time
+from typing import Any, Optional
 
 from celery import Celery
-from celery.signals import worker_init
+from celery.signals import before_task_publish, worker_init
+from kombu import Queue
+
 from app.core.config import settings
+from app.core.profiling import profile_requested
+from app.core.tracing import inject_context
 
 celery_app = Celery(
     "worker",
@@ -17,23 +22,44 @@ def worker_initialize(**kwargs):
     print("Startup worker...custom code")
 
 
+@before_task_publish.connect
+def stamp_headers(headers: Optional[dict] = None, **kwargs: Any) -> None:
+    if headers is not None:
+        # Publish time, for the queue lag metric of the workers (app.worker.metrics)
+        headers.setdefault("sent_at", time.time())
+        # Trace context of the publisher (API handler or scheduler), continued by the task (app.worker.tracing)
+        inject_context(headers)
+        # Published while handling a profiled request: profile the task too (app.worker.profiling)
+        if profile_requested.get():
+            headers.setdefault("profile", True)
+
+
+# Queues, so slow backfills never starve the latency sensitive tasks (one worker pool per queue, see worker-start.sh)
+#   - critical-queue: unfinished job state polling (polljobs), short and what the dashboards watch live
+#   - main-queue: realtime polling dispatched by the scheduler
+#   - bulk-queue: backfills requested through the datafetch endpoints
+# main-queue keeps its original declaration (no x-max-priority): RabbitMQ refuses to redeclare a queue with new arguments
+CRITICAL_QUEUE = "critical-queue"
+REALTIME_QUEUE = "main-queue"
+BULK_QUEUE = "bulk-queue"
+
+celery_app.conf.task_queues = (
+    Queue(CRITICAL_QUEUE, routing_key=CRITICAL_QUEUE, queue_arguments={"x-max-priority": 10}),
+    Queue(REALTIME_QUEUE, routing_key=REALTIME_QUEUE),
+    Queue(BULK_QUEUE, routing_key=BULK_QUEUE, queue_arguments={"x-max-priority": 10}),
+)
+celery_app.conf.task_default_queue = REALTIME_QUEUE
 celery_app.conf.task_routes = {
-    "app.worker.tests.*": "main-queue",
-    "app.worker.uipath.*": "main-queue",
+    "app.worker.uipath.polljobs": {"queue": CRITICAL_QUEUE, "priority": 9},
+    "app.worker.tests.*": REALTIME_QUEUE,
+    "app.worker.uipath.*": REALTIME_QUEUE,
 }
+# Default prefetch, each pool overrides it in worker-start.sh
+celery_app.conf.worker_prefetch_multiplier = 1
 celery_app.conf.update(
     task_serializer="json", result_serializer="json", accept_content=["json"]
 )
 celery_app.conf.timezone = "UTC"
-# Note that this will only work when run as a beat instead of a regular worker
-celery_app.conf.beat_schedule = {
-    "refresh-token": {
-        "task": "app.worker.uipath.FetchUIPathToken",
-        "schedule": timedelta(seconds=30),
-        "options": {
-            "expires": 30
-        },  # This will ensure the task runs immediately when the worker starts
-    },
-}
-
-celery_app.send_task("app.worker.uipath.FetchUIPathToken")
+# The UIPath token is not refreshed from here: each process keeps it in memory and refreshes it
+# right before it expires (see app.core.uipapiconfig.UIPathTokenManager)
+celery_app.conf.beat_schedule = {}
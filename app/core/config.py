@@ -86,6 +86,28 @@ class Settings(BaseSettings):
             path=f"{info.data.get('POSTGRES_DB') or ''}",
         ).unicode_string()
 
+    # Optional read replica (same user, password and database as the primary) for the dashboard reads
+    POSTGRES_REPLICA_SERVER: Optional[str] = None
+    SQLALCHEMY_DATABASE_URI_REPLICA: Optional[str] = None
+
+    @field_validator("SQLALCHEMY_DATABASE_URI_REPLICA", mode="before")  # type: ignore
+    @classmethod
+    def assemble_db_connection_replica(cls, v: Optional[str], info: ValidationInfo) -> Any:
+        if isinstance(v, str) or not info.data.get("POSTGRES_REPLICA_SERVER"):
+            return v
+        return PostgresDsn.build(
+            scheme="postgresql",
+            username=info.data.get("POSTGRES_USER"),
+            password=info.data.get("POSTGRES_PASSWORD"),
+            host=info.data["POSTGRES_REPLICA_SERVER"],
+            path=f"{info.data.get('POSTGRES_DB') or ''}",
+        ).unicode_string()
+
+    # The reads go back to the primary while the replica lags more than REPLICA_MAX_LAG_SECONDS (or can't be
+    # reached), measured at most every REPLICA_LAG_CHECK_SECONDS per process
+    REPLICA_MAX_LAG_SECONDS: float = 10
+    REPLICA_LAG_CHECK_SECONDS: float = 5
+
     SMTP_TLS: bool = True
     SMTP_PORT: Optional[int] = None
     SMTP_HOST: Optional[str] = None
@@ -128,6 +150,8 @@ class Settings(BaseSettings):
     UIP_GRANT_TYPE: str = "client_credentials"
     UIP_AUTH_TOKENURL: str = "https://cloud.uipath.com/identity_/connect/token"
     UIP_API_URL: str
+    # The token is kept in memory and refreshed this many seconds before it expires
+    UIP_TOKEN_REFRESH_MARGIN_SECONDS: int = 300
 
     BROKER_CONNECTION_STRING: str = "amqp://guest@queue//"
 
@@ -136,5 +160,110 @@ class Settings(BaseSettings):
     MAX_APIREQUEST_GET: int = 1000
     EXECUTOR_MAX_THREADS: int = 20
 
+    # Ingestion writes: pooled asyncpg connections (their prepared statements survive between batches) and one
+    # executemany INSERT ... ON CONFLICT per batch instead of a merge per row.
+    # ASYNCPG_STATEMENT_CACHE_SIZE must be 0 behind PgBouncer in transaction mode
+    INGESTION_DB_POOLED: bool = True
+    INGESTION_POOL_RECYCLE_SECONDS: int = 1800
+    ASYNCPG_STATEMENT_CACHE_SIZE: int = 500
+    INGESTION_BULK_UPSERT: bool = True
+    INGESTION_UPSERT_BATCH_SIZE: int = 500
+    # Existing rows are only rewritten when a column changed (reported as unchanged otherwise)
+    INGESTION_SKIP_UNCHANGED: bool = True
+
+    # Full syncs of folders, processes, queue definitions and sessions soft delete (IsDeleted) the rows that
+    # Orchestrator no longer returns
+    RECONCILE_DELETED_ENABLED: bool = True
+
+    # Unfinished job state poller (see app.schedules.jobpolling)
+    # Job Ids per request ("Id in (...)" filter, one folder per request)
+    JOBPOLL_CHUNK_SIZE: int = 100
+    # A job is polled again once this share of its age has passed since its last poll
+    JOBPOLL_AGING_FACTOR: float = 0.1
+    # Jobs stuck for days are still polled at least this often
+    JOBPOLL_MAX_INTERVAL_SECONDS: int = 21600
+    # Jobs that reached a finished state are refetched in full (the poll only selects Id, State and EndTime)
+    JOBPOLL_REFETCH_FINISHED: bool = True
+
+    # Status/StartProcessing/EndProcessing of the queue items already in the DB are derived from their events with a
+    # set based UPDATE after each event batch, instead of refetching them from the API. Items that ended Successful or
+    # Failed are still refetched (Output, ProcessingException)
+    QUEUEITEM_STATUS_FROM_EVENTS: bool = False
+
+    # Single-flight sync tasks (Postgres advisory locks keyed by entity + folder set + filter/synctimes)
+    SYNC_LOCK_ENABLED: bool = True
+    # Time a request waits for the same sync to finish before running it again. 0: coalesced into the running one
+    SYNC_LOCK_WAIT_SECONDS: int = 0
+
+    # Scheduled watermark syncs (jobs, queue items, events) split in one subtask per folder
+    SYNC_FANOUT_ENABLED: bool = False
+
+    # Adaptive schedules: intervals shrink/grow with the rows each sync brings back, within these bounds
+    ADAPTIVE_SCHEDULE_ENABLED: bool = False
+    ADAPTIVE_SCHEDULE_MIN_SECONDS: int = 30
+    ADAPTIVE_SCHEDULE_MAX_SECONDS: int = 1800
+    ADAPTIVE_SCHEDULE_BUSY_ROWS: int = 100
+    ADAPTIVE_SCHEDULE_BACKOFF: float = 1.5
+    ADAPTIVE_SCHEDULE_SPEEDUP: float = 0.5
+
+    # Sync run ledger (sync_runs table): one row per sync task with its telemetry, kept this many days
+    SYNC_RUNS_ENABLED: bool = True
+    SYNC_RUNS_RETENTION_DAYS: int = 30
+
+    # Prometheus metrics: /metrics on the API, and one exporter per worker process on
+    # METRICS_WORKER_PORT + process index (0 disables the worker exporters)
+    METRICS_ENABLED: bool = True
+    METRICS_WORKER_PORT: int = 9101
+
+    # OpenTelemetry tracing (needs the optional opentelemetry packages). Exporter "otlp" (HTTP) or "file" (JSON lines)
+    TRACING_ENABLED: bool = False
+    TRACING_SERVICE_NAME: str = "turinsights"
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: str = "traces.jsonl"
+
+    # Slow query log: statements over the threshold are logged (without bind values) and, with SLOW_QUERY_EXPLAIN,
+    # SELECTs get an EXPLAIN (ANALYZE, BUFFERS) once per interval. Per-statement stats of each process in memory
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_EXPLAIN: bool = False
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 600
+    QUERY_STATS_MAX_STATEMENTS: int = 500
+
+    # Opt-in sampling profiler (see app.core.profiling): requests with the X-Profile header or under the
+    # PROFILING_ROUTES path prefixes, and the PROFILING_TASKS ("*" for all), both comma separated.
+    # The sampler backs off to stay under PROFILING_MAX_OVERHEAD of the wall time; the newest PROFILING_KEEP are kept
+    PROFILING_ENABLED: bool = False
+    PROFILING_DIR: str = "profiles"
+    PROFILING_ROUTES: str = ""
+    PROFILING_TASKS: str = ""
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_MAX_OVERHEAD: float = 0.05
+    PROFILING_MAX_SECONDS: int = 300
+    PROFILING_KEEP: int = 200
+
+    # Query result cache for the local data endpoints ("memory" or "redis", the latter needs the redis package)
+    QUERY_CACHE_BACKEND: str = "memory"
+    QUERY_CACHE_REDIS_URL: Optional[str] = None
+    # Defaults to enabled only with the shared (redis) backend
+    QUERY_CACHE_ENABLED: Optional[bool] = None
+
+    @field_validator("QUERY_CACHE_ENABLED", mode="before")  # type: ignore
+    @classmethod
+    def get_query_cache_enabled(cls, v: Optional[bool], info: ValidationInfo) -> Any:
+        if v is None or v == "":
+            return info.data.get("QUERY_CACHE_BACKEND") == "redis"
+        return v
+
+    QUERY_CACHE_TTL_SECONDS: int = 30
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    # Parsed OData filters -> SQLAlchemy statements kept in memory
+    ODATA_QUERY_CACHE_SIZE: int = 256
+
+    # API response compression ("gzip" or "none"). Responses smaller than the minimum size are sent as is
+    RESPONSE_COMPRESSION: str = "gzip"
+    RESPONSE_COMPRESSION_MINIMUM_SIZE: int = 1024
+    RESPONSE_COMPRESSION_LEVEL: int = 5
+
 
 settings = Settings()  # type: ignore it's filled in runtime with envs
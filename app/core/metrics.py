@@ -0,0 +1,302 @@
+"""Prometheus metrics for the API and the Celery workers.
+
+A small in-process registry (counters, gauges and histograms with labels) rendered in the Prometheus text
+exposition format (version 0.0.4), so there's nothing to install and nothing to reach: the API serves it
+on /metrics and every worker process on its own port (see app.worker.metrics).
+
+Everything the app measures is declared here, so the catalogue of metrics lives in one place.
+"""
+
+import math
+import threading
+import time
+from types import TracebackType
+from typing import Any, Callable, Iterable, Optional, TypeVar
+
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, labels, value) of a series
+Sample = tuple[str, tuple[tuple[str, str], ...], float]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list[Sample]:
+        """(name, labels, value) of every series"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> list[Sample]:
+        with self.lock:
+            values = sorted(self.values.items())
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in values]
+
+
+class Gauge(Metric):
+    """Gauge set directly or read from a function when the metrics are rendered"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple, float] = {}
+        self.functions: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: Any) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.functions[key] = function
+
+    def samples(self) -> list[Sample]:
+        with self.lock:
+            values = dict(self.values)
+            functions = dict(self.functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                values.pop(key, None)
+        return [(self.name, tuple(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [count per bucket (not cumulative)..., sum]
+        self.values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self.lock:
+            series = self.values.setdefault(key, [0] * (len(self.buckets) + 1))
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager observing the seconds spent inside it"""
+        return _Timer(self, labels)
+
+    def samples(self) -> list[Sample]:
+        with self.lock:
+            values = sorted((key, list(series)) for key, series in self.values.items())
+        samples: list[Sample] = []
+        for key, series in values:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", labels, series[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+MetricType = TypeVar("MetricType", bound=Metric)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: MetricType) -> MetricType:
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# API
+HTTP_REQUEST_DURATION: Histogram = REGISTRY.register(
+    Histogram("http_request_duration_seconds", "Latency of the API requests", ["method", "route", "status"])
+)
+# Orchestrator
+UIPATH_API_REQUESTS: Counter = REGISTRY.register(
+    Counter("uipath_api_requests_total", "Calls to the Orchestrator API", ["endpoint", "status"])
+)
+UIPATH_API_DURATION: Histogram = REGISTRY.register(
+    Histogram("uipath_api_request_duration_seconds", "Latency of the Orchestrator API calls", ["endpoint"])
+)
+# DB
+DB_POOL_CHECKOUTS: Counter = REGISTRY.register(
+    Counter("db_pool_checkouts_total", "Connections checked out of the DB pools", ["pool"])
+)
+DB_POOL_WAIT: Histogram = REGISTRY.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time waiting for a DB connection (or session, for the round robin pool)",
+        ["pool"],
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+    )
+)
+DB_POOL_IN_USE: Gauge = REGISTRY.register(
+    Gauge("db_pool_connections_in_use", "Connections currently checked out of the DB pool", ["pool"])
+)
+DB_READ_SESSIONS: Counter = REGISTRY.register(
+    Counter("db_read_sessions_total", "Read-only API sessions, by the database serving them", ["target"])
+)
+DB_REPLICA_LAG: Gauge = REGISTRY.register(
+    Gauge("db_replica_lag_seconds", "Replay lag of the read replica at the last check")
+)
+SYNC_ROWS: Counter = REGISTRY.register(Counter("sync_rows_total", "Rows written by the sync tasks", ["entity", "op"]))
+# Celery
+TASK_DURATION: Histogram = REGISTRY.register(
+    Histogram("celery_task_duration_seconds", "Run time of the Celery tasks", ["task", "state"])
+)
+TASK_QUEUE_LAG: Histogram = REGISTRY.register(
+    Histogram("celery_task_queue_lag_seconds", "Time between publishing a task and a worker starting it", ["queue"])
+)
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    """Counts the checkouts of a SQLAlchemy engine pool and the time spent waiting for them
+
+    Args:
+        engine (Engine): Sync engine (for async engines, their sync_engine)
+        name (str): Value of the pool label
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start, pool=name)
+            DB_POOL_CHECKOUTS.inc(pool=name)
+
+    pool.connect = timed_connect  # type: ignore[method-assign]
+    if hasattr(pool, "checkedout"):
+        DB_POOL_IN_USE.set_function(pool.checkedout, pool=name)
+
+
+class MetricsMiddleware:
+    """Observes the latency of every request, labelled with the route template (not the raw path)"""
+
+    def __init__(self, app: ASGIApp, exclude: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status or 500,
+            )
@@ -0,0 +1,252 @@
+"""Opt-in sampling profiler for API requests and Celery tasks.
+
+With PROFILING_ENABLED a background thread samples the stacks of every thread of the process (sys._current_frames)
+while the request or task runs, and writes them as collapsed stacks ("thread;frame;frame count" per line) to
+PROFILING_DIR, ready for flamegraph.pl or speedscope. Next to each profile goes a small JSON with its metadata,
+which is what the profiles endpoint lists.
+
+What gets profiled:
+    - API requests with the X-Profile header, or whose path starts with one of PROFILING_ROUTES
+    - Celery tasks in PROFILING_TASKS ("*" for all), or published while handling a profiled request
+The whole process is sampled (the async runtime and the executor threads do most of the sync work), so only one
+profile runs at a time per process: overlapping requests/tasks are not profiled. The sampler measures its own time
+and doubles its interval whenever it goes over PROFILING_MAX_OVERHEAD, and stops after PROFILING_MAX_SECONDS.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+MAX_INTERVAL = 1.0
+PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+# Set while handling a profiled request, so the tasks it publishes are profiled too (see celery_app.stamp_headers)
+profile_requested: ContextVar[bool] = ContextVar("profile_requested", default=False)
+
+# One profile at a time per process
+_active = threading.Lock()
+
+
+def _split_setting(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def should_profile_task(task_name: str, requested: bool = False) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    tasks = _split_setting(settings.PROFILING_TASKS)
+    return requested or "*" in tasks or task_name in tasks
+
+
+def should_profile_request(path: str, headers: dict[str, str]) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return any(path.startswith(prefix) for prefix in _split_setting(settings.PROFILING_ROUTES))
+
+
+def _frame_name(code: CodeType) -> str:
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all the threads (but its own) until stopped
+
+    Args:
+        kind (str): "request" or "task"
+        name (str): Route or task name
+        interval (float): Seconds between samples (grows to keep the overhead under max_overhead)
+        max_overhead (float): Maximum share of the wall time spent sampling
+        max_seconds (float): Sampling stops after this long
+    """
+
+    def __init__(self, kind: str, name: str, interval: float, max_overhead: float, max_seconds: float):
+        self.kind = kind
+        self.name = name
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{kind}-{uuid.uuid4().hex[:8]}"
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.truncated = False
+        self.started = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            if now - self.started > self.max_seconds:
+                self.truncated = True
+                return
+            self.sample(skip={own})
+            spent = time.perf_counter() - now
+            self.sampling_seconds += spent
+            if self.sampling_seconds > self.max_overhead * (time.perf_counter() - self.started):
+                self.interval = min(self.interval * 2, MAX_INTERVAL)
+
+    def sample(self, skip: set[int]) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident in skip:
+                continue
+            stack = []
+            current: Optional[FrameType] = frame
+            while current is not None:
+                stack.append(_frame_name(current.f_code))
+                current = current.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def metadata(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "seconds": round(self.elapsed, 3),
+            "samples": self.samples,
+            "final_interval_ms": round(self.interval * 1000, 2),
+            "overhead": round(self.sampling_seconds / self.elapsed, 4) if self.elapsed else 0.0,
+            "truncated": self.truncated,
+        }
+
+    def write(self, directory: Path) -> Path:
+        """Writes <id>.collapsed and <id>.json in the directory. Returns the path of the collapsed stacks"""
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"{self.id}.collapsed"
+        target.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+        (directory / f"{self.id}.json").write_text(json.dumps(self.metadata()))
+        _prune(directory, settings.PROFILING_KEEP)
+        return target
+
+
+def _prune(directory: Path, keep: int) -> None:
+    profiles = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for old in profiles[keep:]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def start_profile(kind: str, name: str) -> Optional[SamplingProfiler]:
+    """Starts profiling the process, unless another profile is running. Returns None if it's not started"""
+    if not _active.acquire(blocking=False):
+        return None
+    return SamplingProfiler(
+        kind,
+        name,
+        interval=settings.PROFILING_INTERVAL_MS / 1000,
+        max_overhead=settings.PROFILING_MAX_OVERHEAD,
+        max_seconds=settings.PROFILING_MAX_SECONDS,
+    ).start()
+
+
+def finish_profile(profiler: Optional[SamplingProfiler], **metadata: Any) -> Optional[Path]:
+    """Stops the profiler and writes its output. Extra metadata (i.e. status) goes to the JSON"""
+    if profiler is None:
+        return None
+    try:
+        profiler.stop()
+        path = profiler.write(Path(settings.PROFILING_DIR))
+        if metadata:
+            sidecar = path.with_suffix(".json")
+            sidecar.write_text(json.dumps({**json.loads(sidecar.read_text()), **metadata}))
+        logger.info(f"Profile of {profiler.kind} {profiler.name} written to {path}")
+        return path
+    except OSError as e:
+        logger.warning(f"Could not write the profile of {profiler.name}: {e}")
+        return None
+    finally:
+        _active.release()
+
+
+def list_profiles(limit: int = 50) -> list[dict]:
+    """Metadata of the latest profiles in PROFILING_DIR, newest first"""
+    directory = Path(settings.PROFILING_DIR)
+    if not directory.is_dir():
+        return []
+    sidecars = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+    profiles = []
+    for sidecar in sidecars[:limit]:
+        try:
+            profiles.append(json.loads(sidecar.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Collapsed stacks file of the profile, None if the id is not valid or doesn't exist"""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = Path(settings.PROFILING_DIR) / f"{profile_id}.collapsed"
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """Profiles the requests selected by should_profile_request. The response carries the profile id"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        if not should_profile_request(scope["path"], headers):
+            await self.app(scope, receive, send)
+            return
+        profiler = start_profile("request", f"{scope['method']} {scope['path']}")
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+        status: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER.encode(), profiler.id.encode())]
+            await send(message)
+
+        token = profile_requested.set(True)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile_requested.reset(token)
+            finish_profile(profiler, status=status or 500)
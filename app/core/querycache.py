@@ -0,0 +1,191 @@
+"""Query result cache for the local data endpoints.
+
+Dashboards poll the same OData URLs every few seconds, so we keep the serialized response for a short time.
+Keys are built from the normalized query (entity, filter, select, top, skip) plus the entity version token: the
+last time the ingestion wrote the entity, as stored in the DB by the workers (tracked_synctimes). Whenever new data
+is written the token moves, in every API process, and every cached query for that entity becomes unreachable
+(old entries just expire through TTL/LRU eviction).
+
+Two backends are available:
+    - "memory": In-process LRU. Good for tests and single process deployments.
+    - "redis": Any server that speaks the Redis protocol, shared by the API processes. The cache is only enabled
+      by default with this one. Needs the redis package, which is not installed with the API.
+The backend is built on first use, so a misconfigured backend only fails (with a clear error) once the cache is
+enabled, never at import time.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Protocol
+
+from loguru import logger
+
+from app.core.config import settings
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        ...
+
+
+class InMemoryLRUBackend:
+    """Thread safe LRU with per-entry expiration"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class RedisBackend:
+    """Backend for anything that speaks the Redis protocol (Redis, Valkey, KeyDB, Dragonfly...)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "QUERY_CACHE_BACKEND is 'redis' but the redis package is not installed (pip install redis)"
+            ) from e
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+
+def normalize_filter(filter: str) -> str:
+    """Collapses the whitespace of an OData filter, leaving the quoted string literals untouched"""
+    parts = re.split(r"('(?:[^']|'')*')", filter.strip())
+    return "".join(part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts))
+
+
+def normalize_query(
+    filter: Optional[str] = None, select: Optional[str] = None, top: Optional[int] = None, skip: Optional[int] = None
+) -> str:
+    """Builds a canonical string for the query so equivalent URLs share the same cache entry
+    (extra whitespace and the order of the $select fields don't matter)"""
+    norm_filter = normalize_filter(filter) if filter else ""
+    norm_select = ",".join(sorted(s.strip() for s in select.split(",") if s.strip())) if select else ""
+    return f"filter={norm_filter}|select={norm_select}|top={top}|skip={skip}"
+
+
+class QueryCache:
+    """Query result cache with entity versioning and hit ratio tracking"""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: int = 30,
+        prefix: str = "turinsights:querycache",
+        backend_factory: Optional[Callable[[], CacheBackend]] = None,
+    ):
+        self._backend = backend
+        self.backend_factory = backend_factory
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats_lock = threading.Lock()
+        self.hits: dict[str, int] = {}
+        self.misses: dict[str, int] = {}
+
+    @property
+    def backend(self) -> CacheBackend:
+        """Builds the backend on first use. Raises RuntimeError if it is misconfigured"""
+        if self._backend is None:
+            if self.backend_factory is None:
+                raise RuntimeError("QueryCache needs either a backend or a backend_factory")
+            self._backend = self.backend_factory()
+        return self._backend
+
+    def make_key(self, entity: str, version: str, normalized_query: str) -> str:
+        digest = hashlib.sha1(f"{version}|{normalized_query}".encode()).hexdigest()
+        return f"{self.prefix}:{entity}:{digest}"
+
+    def get(self, entity: str, version: str, normalized_query: str) -> tuple[Optional[str], Optional[str]]:
+        """Returns (cached value, key). The key is None if the cache can't be used right now.
+
+        Args:
+            entity (str): Table of the entity
+            version (str): Entity version token (last time the ingestion wrote it, see the module docstring)
+            normalized_query (str): See normalize_query
+        """
+        key = self.make_key(entity, version, normalized_query)
+        # Outside of the try: a configuration error must surface, not be logged as an unavailable cache
+        backend = self.backend
+        try:
+            value = backend.get(key)
+        except Exception as e:
+            logger.warning(f"Query cache unavailable, could not read {key}: {e}")
+            return None, None
+        self._record(entity, hit=value is not None)
+        return value, key
+
+    def set(self, key: Optional[str], value: str) -> None:
+        if key is None:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Query cache unavailable, could not store {key}: {e}")
+
+    def _record(self, entity: str, hit: bool) -> None:
+        with self.stats_lock:
+            counter = self.hits if hit else self.misses
+            counter[entity] = counter.get(entity, 0) + 1
+
+    def stats(self) -> dict:
+        """Hit ratios per entity and overall (for this process)"""
+        with self.stats_lock:
+            entities = sorted(set(self.hits) | set(self.misses))
+            per_entity = {}
+            for entity in entities:
+                hits, misses = self.hits.get(entity, 0), self.misses.get(entity, 0)
+                per_entity[entity] = {"hits": hits, "misses": misses, "hit_ratio": hits / (hits + misses)}
+            total_hits, total_misses = sum(self.hits.values()), sum(self.misses.values())
+        total = total_hits + total_misses
+        return {
+            "backend": type(self._backend).__name__ if self._backend is not None else None,
+            "ttl": self.ttl,
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_ratio": total_hits / total if total else 0.0,
+            "entities": per_entity,
+        }
+
+
+def build_backend() -> CacheBackend:
+    if settings.QUERY_CACHE_BACKEND == "redis":
+        if not settings.QUERY_CACHE_REDIS_URL:
+            raise RuntimeError("QUERY_CACHE_BACKEND is 'redis' but QUERY_CACHE_REDIS_URL is not set")
+        return RedisBackend(settings.QUERY_CACHE_REDIS_URL)
+    return InMemoryLRUBackend(max_entries=settings.QUERY_CACHE_MAX_ENTRIES)
+
+
+query_cache = QueryCache(ttl=settings.QUERY_CACHE_TTL_SECONDS, backend_factory=build_backend)
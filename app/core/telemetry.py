@@ -0,0 +1,47 @@
+"""Per-run telemetry of the sync tasks.
+
+The sync task wrappers put their SyncReport in `current_report` before running, and the API and DB helpers
+record into whatever report is current: Orchestrator call latency, pages per folder and time spent writing
+to the DB. Context variables follow the coroutines and tasks of the sync (see app.worker.runtime), so the helpers
+don't need the report passed around. Outside of a sync (no current report) recording does nothing.
+"""
+
+import math
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from app.schemas.tracking import FolderSyncStats, SyncReport
+
+current_report: ContextVar[Optional[SyncReport]] = ContextVar("current_report", default=None)
+
+
+def record_api_call(seconds: float, folder: int | None = None, page: bool = True) -> None:
+    """Records an Orchestrator call of the current sync
+
+    Args:
+        seconds (float): Latency of the call
+        folder (int | None, optional): Folder (OrganizationUnitId) of the call. Defaults to None.
+        page (bool, optional): The call fetched a page of rows (False for count calls). Defaults to True.
+    """
+    report = current_report.get()
+    if report is None:
+        return
+    report.api_calls += 1
+    report._latencies.append(seconds * 1000)
+    if page:
+        report.folders.setdefault(folder or 0, FolderSyncStats()).pages += 1
+
+
+def record_db_write(seconds: float) -> None:
+    """Adds time spent writing rows to the DB to the current sync"""
+    report = current_report.get()
+    if report is not None:
+        report.db_write_seconds += seconds
+
+
+def percentiles(samples: Iterable[float], points: Iterable[int] = (50, 95, 99)) -> dict[str, float]:
+    """Nearest-rank percentiles, keyed "p50", "p95"... Empty if there are no samples"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {f"p{point}": round(ordered[max(math.ceil(point / 100 * len(ordered)) - 1, 0)], 2) for point in points}
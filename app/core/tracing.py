@@ -0,0 +1,132 @@
+"""Optional OpenTelemetry tracing.
+
+A slow datafetch request can spend its time in the broker, the Orchestrator, parsing or Postgres. With
+TRACING_ENABLED the whole path is one trace:
+    datafetch handler -> Celery publish (context injected in the task headers) -> task -> Orchestrator calls
+    -> parsing -> DB writes (one span per upsert)
+Spans go to an OTLP collector (TRACING_EXPORTER=otlp) or to a JSON lines file (TRACING_EXPORTER=file) for offline
+analysis. The opentelemetry packages are optional: without them (or with tracing disabled) every helper here
+does nothing.
+"""
+
+from contextlib import nullcontext
+from typing import Any, Optional
+
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+except ImportError:  # opentelemetry-api is not installed
+    trace = None  # type: ignore
+
+_configured = False
+
+
+def setup_tracing(service_name: str) -> bool:
+    """Sets up the tracer provider and exporter of the process (once). Returns True if tracing is on"""
+    global _configured
+    if _configured:
+        return True
+    if not settings.TRACING_ENABLED:
+        return False
+    if trace is None:
+        logger.warning("TRACING_ENABLED but opentelemetry is not installed, tracing disabled")
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("TRACING_ENABLED but opentelemetry-sdk is not installed, tracing disabled")
+        return False
+    exporter = _build_exporter()
+    if exporter is None:
+        return False
+    resource = Resource.create({"service.name": f"{settings.TRACING_SERVICE_NAME}-{service_name}"})
+    provider = TracerProvider(resource=resource)
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _configured = True
+    logger.info(f"Tracing enabled for {service_name} ({settings.TRACING_EXPORTER} exporter)")
+    return True
+
+
+def _build_exporter() -> Any:
+    if settings.TRACING_EXPORTER == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        # One JSON span per line
+        out = open(settings.TRACING_FILE_PATH, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        logger.warning("opentelemetry-exporter-otlp-proto-http is not installed, tracing disabled")
+        return None
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Context manager for a span in the current trace (a no-op without opentelemetry)
+
+    Args:
+        name (str): Span name
+        attributes: Span attributes (None values are left out)
+    """
+    if trace is None or not _configured:
+        return nullcontext()
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    return trace.get_tracer("turinsights").start_as_current_span(name, attributes=attributes)
+
+
+def start_span(name: str, carrier: Optional[dict] = None, **attributes: Any) -> Any:
+    """Starts a span and makes it current, for spans that can't be a with block (i.e. between Celery signals).
+
+    Args:
+        name (str): Span name
+        carrier (Optional[dict], optional): Trace context of the parent (i.e. task headers). Defaults to None.
+        attributes: Span attributes (None values are left out)
+
+    Returns:
+        Any: Handle for end_span (None if tracing is off)
+    """
+    if trace is None or not _configured:
+        return None
+    parent = propagate.extract(carrier) if carrier else None
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    new_span = trace.get_tracer("turinsights").start_span(name, context=parent, attributes=attributes)
+    token = otel_context.attach(trace.set_span_in_context(new_span))
+    return new_span, token
+
+
+def end_span(handle: Any, **attributes: Any) -> None:
+    """Ends a span started with start_span"""
+    if handle is None:
+        return
+    started_span, token = handle
+    for key, value in attributes.items():
+        if value is not None:
+            started_span.set_attribute(key, value)
+    otel_context.detach(token)
+    started_span.end()
+
+
+def inject_context(carrier: dict) -> None:
+    """Adds the current trace context to the carrier (i.e. Celery message headers)"""
+    if trace is not None and _configured:
+        propagate.inject(carrier)
+
+
+def instrument_app(app: Any) -> None:
+    """Server spans for every API request, if opentelemetry-instrumentation-fastapi is installed"""
+    if not setup_tracing("api"):
+        return
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    except ImportError:
+        logger.info("opentelemetry-instrumentation-fastapi is not installed, only the handler spans are traced")
+        return
+    FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
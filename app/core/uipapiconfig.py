@@ -1,8 +1,15 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
 import uipath_orchestrator_rest
 from authlib.integrations.requests_client import OAuth2Session
+from loguru import logger
 from uipath_orchestrator_rest import ApiClient, Configuration
+from uipath_orchestrator_rest.rest import ApiException
 
 from app.core.config import settings
+from app.schemas import UIPathTokenResponse
 
 oauth2_session = OAuth2Session(
     client_id=settings.UIP_CLIENT_ID,
@@ -13,8 +20,111 @@ uipclient_config = Configuration()
 uipclient_config.host = settings.UIP_API_URL
 
 
-# On application startup, we'll get a new token and add it to uipath api configuration to get everything ready
+class UIPathTokenManager:
+    """Keeps the UIPath access token in process memory and refreshes it shortly before it expires.
+
+    Refreshes are single-flight: the API calls run in executor threads (one per coroutine), and when several of them
+    find the token about to expire only the first one refreshes it, the rest wait for it and reuse the new token.
+    Before calling the identity server the manager tries the `loader` (the token stored in DB by another process),
+    and after a refresh it hands the new token to `on_refresh` so it can be persisted.
+    """
+
+    def __init__(
+        self,
+        session: OAuth2Session,
+        config: Configuration,
+        refresh_margin: int = 300,
+    ):
+        self.session = session
+        self.config = config
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.lock = threading.Lock()
+        self.token: Optional[UIPathTokenResponse] = None
+        self.loader: Optional[Callable[[], Optional[UIPathTokenResponse]]] = None
+        self.on_refresh: Optional[Callable[[UIPathTokenResponse], None]] = None
+
+    def _is_fresh(self, token: Optional[UIPathTokenResponse]) -> bool:
+        if token is None:
+            return False
+        expires_at = token.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) + self.refresh_margin < expires_at
+
+    def _set_token(self, token: UIPathTokenResponse) -> None:
+        self.token = token
+        self.config.access_token = token.access_token
+
+    def get_token(self, force: bool = False, stale_token: Optional[str] = None) -> UIPathTokenResponse:
+        """Returns a token that is valid for at least `refresh_margin` seconds.
+
+        Args:
+            force (bool, optional): Always go to the identity server. Defaults to False.
+            stale_token (Optional[str], optional): Token that was rejected (401). It is only refreshed if nobody
+                else replaced it in the meantime. Defaults to None.
 
+        Returns:
+            UIPathTokenResponse: Current token
+        """
+        token = self.token
+        if not force and stale_token is None and self._is_fresh(token):
+            return token  # type: ignore
+        with self.lock:
+            token = self.token
+            if stale_token is not None and token is not None and token.access_token != stale_token:
+                # Someone else already refreshed it while we were waiting
+                return token
+            if not force and stale_token is None:
+                if self._is_fresh(token):
+                    return token  # type: ignore
+                if self.loader is not None:
+                    try:
+                        loaded = self.loader()
+                    except Exception as e:
+                        logger.warning(f"Could not load UIPath token from storage: {e}")
+                        loaded = None
+                    if self._is_fresh(loaded):
+                        self._set_token(loaded)  # type: ignore
+                        return loaded  # type: ignore
+            return self._refresh()
+
+    def _refresh(self) -> UIPathTokenResponse:
+        # Must be called with the lock held
+        logger.info("Requesting new UIPath token")
+        response = self.session.fetch_token(url=settings.UIP_AUTH_TOKENURL, grant_type=settings.UIP_GRANT_TYPE)
+        token = UIPathTokenResponse.model_validate(response)
+        self._set_token(token)
+        if self.on_refresh is not None:
+            try:
+                self.on_refresh(token)
+            except Exception as e:
+                logger.error(f"Could not store the new UIPath token: {e}")
+        return token
+
+    def call(self, request: Callable[[], Any]) -> Any:
+        """Runs an API client request with a valid token. If Orchestrator answers 401 the token is refreshed
+        and the request is retried once.
+
+        Args:
+            request (Callable[[], Any]): Request to the API client (it must read the token from the shared config)
+
+        Returns:
+            Any: Whatever the request returns
+        """
+        token = self.get_token()
+        try:
+            return request()
+        except ApiException as e:
+            if e.status != 401:
+                raise
+            logger.warning("UIPath API returned 401, refreshing token and retrying once")
+            self.get_token(stale_token=token.access_token)
+            return request()
+
+
+uipath_token_manager = UIPathTokenManager(
+    session=oauth2_session, config=uipclient_config, refresh_margin=settings.UIP_TOKEN_REFRESH_MARGIN_SECONDS
+)
 
 uipclient_folders = uipath_orchestrator_rest.FoldersApi(ApiClient(uipclient_config))
 uipclient_jobs = uipath_orchestrator_rest.JobsApi(ApiClient(uipclient_config))
@@ -8,7 +8,7 @@ from .crud_orchestratorapi import (
     uip_session,
 )
 from .crud_token import token
-from .crud_tracking import tracked_process, tracked_queue, tracked_synctimes
+from .crud_tracking import sync_run, tracked_process, tracked_queue, tracked_synctimes
 from .crud_uipathtoken import uipath_token
 from .crud_user import user
 
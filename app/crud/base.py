@@ -1,14 +1,39 @@
-from datetime import datetime
+import functools
+from datetime import datetime, timezone
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from loguru import logger
+from odata_query.sqlalchemy.shorthand import apply_odata_query
 from pydantic import BaseModel
-from sqlalchemy import DateTime, delete
+from sqlalchemy import (
+    JSON,
+    ColumnElement,
+    DateTime,
+    Integer,
+    Select,
+    String,
+    Table,
+    any_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    or_,
+    select,
+)
+from sqlalchemy import update as sql_update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Result
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import ReturningInsert
 
+from app.core.config import settings
+from app.core.querycache import normalize_filter
+from app.core.tracing import span
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -16,6 +41,31 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+@functools.lru_cache(maxsize=settings.ODATA_QUERY_CACHE_SIZE)
+def _compile_odata_query(model: Type[Base], filter: str) -> Select:
+    # Parsing the OData filter (lexer + parser + AST visitor) is the expensive part, so the resulting statement is cached.
+    # Literal values are already bind parameters, so SQLAlchemy also reuses its compiled SQL for the cached statement.
+    # Invalid filters raise and are never cached.
+    return apply_odata_query(select(model), filter)  # type: ignore
+
+
+def compile_odata_query(model: Type[Base], filter: str) -> Select:
+    """Returns the SELECT statement for the OData filter, from the LRU cache when the same filter was seen before
+
+    Args:
+        model (Type[Base]): SQLAlchemy model to query
+        filter (str): OData filter
+
+    Returns:
+        Select: SQLAlchemy statement
+    """
+    return _compile_odata_query(model, normalize_filter(filter))
+
+
+def odata_query_cache_info() -> dict:
+    return _compile_odata_query.cache_info()._asdict()
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
@@ -146,14 +196,141 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         json_data = self.parse_and_replace_datetimes(obj_in_data)
         db_obj = self.model(**json_data)  # type: ignore
         try:
-            async with db.begin():
-                await db.merge(db_obj)
-                await db.commit()
+            with span("db.upsert", table=self.model.__tablename__):
+                async with db.begin():
+                    await db.merge(db_obj)
+                    await db.commit()
             return db_obj
         except IntegrityError as e:
             await db.rollback()  # Let the context manager do the rollback
             logger.error(e)
 
+    @functools.cached_property
+    def _table(self) -> Table:
+        # Typed as a FromClause in the declarative base, it's always the Table of the model
+        return self.model.__table__  # type: ignore[return-value]
+
+    @functools.cached_property
+    def _datetime_columns(self) -> frozenset[str]:
+        return frozenset(column.key for column in self._table.columns if isinstance(column.type, DateTime))
+
+    def _bulk_rows(self, objs_in: list[CreateSchemaType]) -> tuple[tuple[str, ...], list[dict[str, Any]]]:
+        """Column values of the rows, ready to bind. All of them get the same (sorted) columns"""
+        rows = []
+        for obj in objs_in:
+            values = jsonable_encoder(obj)
+            for key in self._datetime_columns & values.keys():
+                if isinstance(values[key], str):
+                    values[key] = self.parse_datetime(values[key])
+            rows.append(values)
+        columns = tuple(sorted(set().union(*rows).intersection(self._table.columns.keys())))
+        return columns, [{column: row.get(column) for column in columns} for row in rows]
+
+    def _changed(self, statement: Insert, column: str) -> ColumnElement[bool]:
+        # json has no equality operator, its jsonb cast does (and ignores key order and whitespace)
+        current: ColumnElement[Any] = self._table.c[column]
+        incoming: ColumnElement[Any] = statement.excluded[column]
+        if isinstance(current.type, JSON) and not isinstance(current.type, JSONB):
+            current, incoming = cast(current, JSONB), cast(incoming, JSONB)
+        return current.is_distinct_from(incoming)
+
+    @functools.lru_cache(maxsize=32)
+    def _upsert_statement(
+        self, columns: tuple[str, ...], upsert: bool, skip_unchanged: bool = True
+    ) -> ReturningInsert[Any]:
+        """INSERT ... ON CONFLICT for a fixed set of columns, returning the primary key of the rows written.
+        The SQL only depends on the columns (one per schema) and the rows per statement, so the batches send the
+        same statements and the pooled asyncpg connections reuse the prepared ones.
+        With skip_unchanged, existing rows are only updated if a column IS DISTINCT FROM the incoming value:
+        unchanged rows are neither rewritten (no new tuple version, no WAL) nor returned."""
+        table = self._table
+        statement = pg_insert(table)
+        primary_key = [column.key for column in table.primary_key.columns]
+        returning = [table.c[column] for column in primary_key]
+        updates = {column: statement.excluded[column] for column in columns if column not in primary_key}
+        if not upsert or not updates:
+            return statement.on_conflict_do_nothing(index_elements=primary_key).returning(*returning)
+        where = or_(*(self._changed(statement, column) for column in updates)) if skip_unchanged else None
+        return statement.on_conflict_do_update(index_elements=primary_key, set_=updates, where=where).returning(
+            *returning
+        )
+
+    def _written_keys(self, result: Result) -> set[Any]:
+        return {row[0] if len(row) == 1 else tuple(row) for row in result}
+
+    def upsert_many(self, db: Session, *, objs_in: list[CreateSchemaType], upsert: bool = True) -> set[Any]:
+        """Same as upsert_many_async, sync. Doesn't commit either"""
+        if not objs_in:
+            return set()
+        columns, rows = self._bulk_rows(objs_in)
+        statement = self._upsert_statement(columns, upsert, settings.INGESTION_SKIP_UNCHANGED)
+        with span("db.upsert", table=self.model.__tablename__, rows=len(rows)):
+            return self._written_keys(db.execute(statement, rows))
+
+    async def upsert_many_async(
+        self, db: AsyncSession, *, objs_in: list[CreateSchemaType], upsert: bool = True
+    ) -> set[Any]:
+        """Upserts the rows (or inserts them, leaving the existing ones alone, if upsert is False) in as few
+        statements as the bind parameter limit allows. Only the columns of the schema are written, like
+        upsert_async, and existing rows are only rewritten if something changed (INGESTION_SKIP_UNCHANGED).
+        Doesn't commit.
+
+        Args:
+            db (AsyncSession): Database session
+            objs_in (list[CreateSchemaType]): Rows, all of the same schema
+            upsert (bool, optional): Update the rows that already exist. Defaults to True.
+
+        Returns:
+            set[Any]: Primary keys of the rows inserted or changed
+        """
+        if not objs_in:
+            return set()
+        columns, rows = self._bulk_rows(objs_in)
+        statement = self._upsert_statement(columns, upsert, settings.INGESTION_SKIP_UNCHANGED)
+        with span("db.upsert", table=self.model.__tablename__, rows=len(rows)):
+            return self._written_keys(await db.execute(statement, rows))
+
+    def reconcile_deleted(
+        self, db: Session, *, seen_ids: list[Any], folders: list[int] | None = None
+    ) -> tuple[int, int]:
+        """Soft deletes, in one set-based UPDATE, the rows (of the folders, if given) whose primary key is not among
+        the ones seen in a full sync, and restores the deleted ones that were seen again. The ids are bound as a
+        single sorted array, so the statement is the same whatever their number. Only for models with IsDeleted.
+
+        Args:
+            db (Session): Database session
+            seen_ids (list[Any]): Primary keys returned by Orchestrator
+            folders (list[int] | None, optional): Limit to these OrganizationUnitIds. Defaults to None (every row).
+
+        Returns:
+            tuple[int, int]: Rows deleted and rows restored
+        """
+        table = self._table
+        pk = table.primary_key.columns[0]
+        ids: ColumnElement[Any]
+        if isinstance(pk.type, Integer):
+            ids = bindparam("seen_ids", sorted({int(id) for id in seen_ids}), type_=ARRAY(Integer))
+        else:
+            # i.e. UUID keys, that the schemas keep as str
+            keys = sorted({str(id) for id in seen_ids})
+            ids = cast(bindparam("seen_ids", keys, type_=ARRAY(String)), ARRAY(pk.type))
+        seen = pk == any_(ids)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        # Only the rows whose flag has to flip: deleted and seen again, or live and not seen
+        statement = (
+            sql_update(table)
+            .where(table.c.IsDeleted == seen)
+            .values(IsDeleted=~seen, DeletedAt=case((seen, None), else_=now))
+            .returning(table.c.IsDeleted)
+        )
+        if folders is not None:
+            statement = statement.where(table.c.OrganizationUnitId.in_(folders))
+        with span("db.reconcile", table=self.model.__tablename__, rows=len(seen_ids)):
+            flags = db.execute(statement).scalars().all()
+        db.commit()
+        deleted = sum(1 for flag in flags if flag)
+        return deleted, len(flags) - deleted
+
     def create_safe(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType | None:
         """Helper function to "Create and ignore duplicate errors"""
         try:
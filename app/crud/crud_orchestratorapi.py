@@ -1,12 +1,13 @@
+import datetime
 from typing import Any, Optional, Tuple
 
-from odata_query.sqlalchemy.shorthand import apply_odata_query
-from sqlalchemy import select
+from sqlalchemy import Integer, Row, any_, bindparam, case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
 import app.models.orchestratorapi as uipmodels
 import app.schemas.orchestratorapi as uipschemas
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, compile_odata_query
 
 
 class CRUDFolder(CRUDBase[uipmodels.Folder, uipschemas.FolderCreate, uipschemas.FolderCreate]):
@@ -17,7 +18,7 @@ class CRUDFolder(CRUDBase[uipmodels.Folder, uipschemas.FolderCreate, uipschemas.
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.Folder]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
 
@@ -29,7 +30,7 @@ class CRUDQueueItem(CRUDBase[uipmodels.QueueItem, uipschemas.QueueItemCreate, ui
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.QueueItem]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
     def get_by_id_list_split(self, db: Session, ids: list[int]) -> Tuple[list[int], list[int]]:
@@ -49,6 +50,65 @@ class CRUDQueueItem(CRUDBase[uipmodels.QueueItem, uipschemas.QueueItemCreate, ui
         ids_not_in_db = list(all_ids_set - existing_ids_set)
         return existing_ids, ids_not_in_db
 
+    # Event statuses after which the item is no longer processed (EndProcessing is set)
+    ended_states = ["Successful", "Failed", "Abandoned", "Retried", "Deleted"]
+
+    def apply_latest_events(self, db: Session, *, ids: list[int]) -> list[Row]:
+        """Derives Status, StartProcessing and EndProcessing of the items from their events
+        (uipath_queueitemevents) in a single UPDATE, only for the items where one of them changed:
+            - Status: status of the latest event
+            - StartProcessing: time of the latest InProgress event
+            - EndProcessing: time of the latest Successful/Failed/Abandoned event, if the item is no longer processed
+
+        Args:
+            db (Session): Database session
+            ids (list[int]): Queue item Ids
+
+        Returns:
+            list[Row]: Id and new Status of the updated items
+        """
+        if not ids:
+            return []
+        item, events = self.model, uipmodels.QueueItemEvent
+        item_ids = bindparam("item_ids", sorted(set(ids)), type_=ARRAY(Integer))
+        latest = (
+            select(events.QueueItemId, events.Status)
+            .where(events.QueueItemId == any_(item_ids))
+            .distinct(events.QueueItemId)
+            .order_by(events.QueueItemId, events.Timestamp.desc(), events.Id.desc())
+            .subquery()
+        )
+        times = (
+            select(
+                events.QueueItemId,
+                func.max(events.Timestamp).filter(events.Status == "InProgress").label("started"),
+                func.max(events.Timestamp)
+                .filter(events.Status.in_(["Successful", "Failed", "Abandoned"]))
+                .label("ended"),
+            )
+            .where(events.QueueItemId == any_(item_ids))
+            .group_by(events.QueueItemId)
+            .subquery()
+        )
+        started = func.coalesce(times.c.started, item.StartProcessing)
+        ended = case((latest.c.Status.in_(self.ended_states), func.coalesce(times.c.ended, item.EndProcessing)))
+        statement = (
+            update(item)
+            .where(item.Id == latest.c.QueueItemId, item.Id == times.c.QueueItemId)
+            .where(
+                or_(
+                    item.Status.is_distinct_from(latest.c.Status),
+                    item.StartProcessing.is_distinct_from(started),
+                    item.EndProcessing.is_distinct_from(ended),
+                )
+            )
+            .values(Status=latest.c.Status, StartProcessing=started, EndProcessing=ended)
+            .returning(item.Id, item.Status)
+        )
+        rows = db.execute(statement).all()
+        db.commit()
+        return rows  # type: ignore
+
 
 class CRUDQueueItemEvent(
     CRUDBase[
@@ -64,7 +124,7 @@ class CRUDQueueItemEvent(
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.QueueItemEvent]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
 
@@ -82,7 +142,7 @@ class CRUDQueueDefinitions(
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.QueueDefinitions]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
 
@@ -94,7 +154,7 @@ class CRUDSession(CRUDBase[uipmodels.Sessions, uipschemas.SessionCreate, uipsche
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.Sessions]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
 
@@ -106,7 +166,7 @@ class CRUDProcess(CRUDBase[uipmodels.Process, uipschemas.ProcessCreate, uipschem
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[uipmodels.Process]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
 
@@ -118,14 +178,50 @@ class CRUDJob(CRUDBase[uipmodels.Job, uipschemas.JobCreate, uipschemas.JobUpdate
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> list[uipmodels.Job]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type: ignore
 
+    finished_states = ["Faulted", "Successful", "Stopped"]
+
     def get_unfinished_jobid(self, db: Session) -> list[int] | None:
         # Returns the Ids for the jobs that are not in a finished state so that they can be polled
-        finished_states = ["Faulted", "Successful", "Stopped"]
-        res = db.query(self.model.Id).filter(self.model.State.notin_(finished_states)).all()
+        res = db.query(self.model.Id).filter(self.model.State.notin_(self.finished_states)).all()
         return [row[0] for row in res] if res else None
+
+    def get_unfinished(self, db: Session) -> list[Row]:
+        """What the job state poller needs of every unfinished job (see app.schedules.jobpolling)"""
+        model = self.model
+        query = select(
+            model.Id,
+            model.OrganizationUnitId,
+            model.State,
+            model.EndTime,
+            model.StartTime,
+            model.CreationTime,
+            model.LastPolledAt,
+        ).where(model.State.notin_(self.finished_states))
+        return db.execute(query).all()  # type: ignore
+
+    def update_states(self, db: Session, *, changes: list[dict[str, Any]]) -> None:
+        """Writes State and EndTime of the jobs ({"job_id", "state", "end_time"} each) in one executemany"""
+        if not changes:
+            return
+        table = self._table
+        statement = (
+            update(table)
+            .where(table.c.Id == bindparam("job_id"))
+            .values(State=bindparam("state"), EndTime=bindparam("end_time"))
+        )
+        db.execute(statement, changes)
+        db.commit()
+
+    def mark_polled(self, db: Session, *, ids: list[int], polled_at: datetime.datetime) -> None:
+        if not ids:
+            return
+        table = self._table
+        seen = bindparam("job_ids", sorted(ids), type_=ARRAY(Integer))
+        db.execute(update(table).where(table.c.Id == any_(seen)).values(LastPolledAt=polled_at))
+        db.commit()
         ...
 
 
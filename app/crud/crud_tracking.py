@@ -3,14 +3,13 @@ from enum import IntEnum, unique
 from typing import Any, Optional
 
 from loguru import logger
-from odata_query.sqlalchemy.shorthand import apply_odata_query
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, select
 from sqlalchemy.orm import Session
 
 import app.models.orchestratorapi as uipmodels
 import app.models.schedulers as schedulermodels
 import app.schemas.tracking as trackschemas
-from app.crud.base import CRUDBase
+from app.crud.base import CRUDBase, compile_odata_query
 
 
 # This is basically an internal config enum.
@@ -19,6 +18,26 @@ class TrackingKeys(IntEnum):
     QueueItemEvents = 1
     JobsStarted = 2
     QueueItemsNew = 3
+    # Last time the ingestion wrote each entity (used as version token for conditional GETs)
+    FoldersWritten = 10
+    ProcessesWritten = 11
+    QueueDefinitionsWritten = 12
+    QueueItemsWritten = 13
+    QueueItemEventsWritten = 14
+    JobsWritten = 15
+    SessionsWritten = 16
+
+
+# Table name -> key of its "last written" synctime
+EntityWrittenKeys = {
+    uipmodels.Folder.__tablename__: TrackingKeys.FoldersWritten,
+    uipmodels.Process.__tablename__: TrackingKeys.ProcessesWritten,
+    uipmodels.QueueDefinitions.__tablename__: TrackingKeys.QueueDefinitionsWritten,
+    uipmodels.QueueItem.__tablename__: TrackingKeys.QueueItemsWritten,
+    uipmodels.QueueItemEvent.__tablename__: TrackingKeys.QueueItemEventsWritten,
+    uipmodels.Job.__tablename__: TrackingKeys.JobsWritten,
+    uipmodels.Sessions.__tablename__: TrackingKeys.SessionsWritten,
+}
 
 
 # TrackingKeys = {"QueueItemEvents": 1, "JobsStarted": 2, "QueueItemsNew": 3}
@@ -35,7 +54,7 @@ class CRUDTrackedProcess(
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[trackschemas.TrackedProcess]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type:ignore
 
 
@@ -44,7 +63,7 @@ class CRUDTrackedQueue(CRUDBase[uipmodels.TrackedQueue, trackschemas.TrackedQueu
         return db.query(self.model).filter(self.model.Id == id).first()
 
     def get_odata(self, db: Session, filter: str) -> Optional[trackschemas.TrackedQueue]:
-        query = apply_odata_query(select(self.model), filter)
+        query = compile_odata_query(self.model, filter)
         return db.execute(query).scalars().all()  # type:ignore
 
 
@@ -103,7 +122,100 @@ class CRUDSyncTimes(
         )
         return self.upsert(db=db, obj_in=schematoupdate)  # type: ignore
 
+    def get_entity_written(self, db: Session, entity: str) -> datetime.datetime | None:
+        """Last time the ingestion wrote rows for the entity (table name), None if unknown"""
+        key = EntityWrittenKeys.get(entity)
+        if key is None:
+            return None
+        synctime = self.get(db=db, id=key)
+        return synctime.TimeStamp if synctime else None
+
+    def update_entity_written(self, db: Session, entity: str, newtime: datetime.datetime) -> None:
+        key = EntityWrittenKeys.get(entity)
+        if key is None:
+            return None
+        schematoupdate = trackschemas.SyncTimes(id=int(key), TimeStamp=newtime, Description=f"{key.name}")
+        return self.upsert(db=db, obj_in=schematoupdate)  # type: ignore
+
+
+class CRUDSyncRun(CRUDBase[schedulermodels.SyncRun, trackschemas.SyncRun, trackschemas.SyncRun]):
+    def start(self, db: Session, entity: str, task_id: str | None = None, filter: str | None = None) -> int:
+        """Adds a "running" row to the ledger and returns its id"""
+        run = self.model(
+            task_id=task_id,
+            entity=entity,
+            status="running",
+            started_at=datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+            filter=filter,
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+
+    def finish(
+        self, db: Session, id: int, report: trackschemas.SyncReport, status: str, error: str | None = None
+    ) -> None:
+        """Closes the ledger row of a run with the telemetry of its report"""
+        run = db.get(self.model, id)
+        if run is None:
+            return
+        run.status = status
+        run.finished_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        run.duration = report.duration
+        run.filter = report.filter
+        run.rows = report.rows
+        run.inserted = report.inserted
+        run.updated = report.updated
+        run.unchanged = report.unchanged
+        run.skipped = report.skipped
+        run.deleted = report.deleted
+        run.api_calls = report.api_calls
+        run.api_latency_p50 = report.api_latency_ms.get("p50")
+        run.api_latency_p95 = report.api_latency_ms.get("p95")
+        run.api_latency_p99 = report.api_latency_ms.get("p99")
+        run.db_write_seconds = report.db_write_seconds
+        run.pages = {str(folder): stats.pages for folder, stats in report.folders.items() if stats.pages}
+        run.error = error
+        db.commit()
+
+    def get_recent(self, db: Session, entity: str | None = None, limit: int = 50) -> list[schedulermodels.SyncRun]:
+        query = select(self.model).order_by(self.model.started_at.desc()).limit(limit)
+        if entity:
+            query = query.where(self.model.entity == entity)
+        return db.execute(query).scalars().all()  # type: ignore
+
+    def get_trends(self, db: Session, hours: int = 24) -> list[trackschemas.SyncRunTrend]:
+        """Per entity aggregates of the runs started in the last `hours`"""
+        since = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(hours=hours)
+        model = self.model
+        query = (
+            select(
+                model.entity,
+                func.count().label("runs"),
+                func.count(case((model.status == "failed", 1))).label("failed"),
+                func.count(case((model.status == "coalesced", 1))).label("coalesced"),
+                func.avg(model.duration).label("avg_duration"),
+                func.percentile_cont(0.95).within_group(model.duration).label("p95_duration"),
+                func.avg(model.rows).label("avg_rows"),
+                func.avg(model.api_latency_p95).label("avg_api_latency_p95"),
+                func.avg(model.db_write_seconds).label("avg_db_write_seconds"),
+                func.max(model.started_at).label("last_run"),
+            )
+            .where(model.started_at >= since)
+            .group_by(model.entity)
+            .order_by(model.entity)
+        )
+        return [trackschemas.SyncRunTrend.model_validate(row._asdict()) for row in db.execute(query)]
+
+    def purge(self, db: Session, days: int) -> int:
+        """Removes the runs older than `days`"""
+        cutoff = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(days=days)
+        result = db.execute(delete(self.model).where(self.model.started_at < cutoff))
+        db.commit()
+        return result.rowcount  # type: ignore
+
 
 tracked_process = CRUDTrackedProcess(uipmodels.TrackedProcess)
 tracked_queue = CRUDTrackedQueue(uipmodels.TrackedQueue)
 tracked_synctimes = CRUDSyncTimes(schedulermodels.ScheduleSyncTimes)
+sync_run = CRUDSyncRun(schedulermodels.SyncRun)
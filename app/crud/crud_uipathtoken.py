@@ -26,6 +26,18 @@ class CRUDUIPathToken(CRUDBase[UIPathToken, UIPathTokenResponse, UIPathTokenBear
             db.query(UIPathToken).filter(UIPathToken.is_valid(UIPathToken)).first().access_token  # type: ignore
         )
 
+    def get_latest_valid(self, db: Session) -> UIPathTokenResponse | None:
+        """Valid token that lasts the longest (None if there is none)"""
+        token = (
+            db.query(UIPathToken)
+            .filter(UIPathToken.is_valid(UIPathToken))  # type: ignore
+            .order_by(UIPathToken.expires_at.desc())
+            .first()
+        )
+        if token is None:
+            return None
+        return UIPathTokenResponse.model_validate(token, from_attributes=True)
+
     def remove_expired(self, db: Session):
         # Get the current time
         now = datetime.now(timezone.utc)
@@ -0,0 +1,98 @@
+"""Distributed locks for the sync tasks, using Postgres advisory locks.
+
+The scheduler fires the sync tasks at fixed intervals and users can trigger the same sync from the API,
+so the same entity could be synced by several workers at once (double API load, races on the watermarks).
+Each sync task runs inside `sync_lock`, keyed by entity + folder set + request (normalized filter and synctimes), so
+only identical requests are coalesced: a filtered request never gets dropped because a scheduled sync of the same
+entity is running.
+    - If nobody is running it, the task takes the lock and runs.
+    - If it's already running, the request is coalesced into the running one and skipped. With
+      SYNC_LOCK_WAIT_SECONDS > 0 the task waits (up to that long) for it to finish and then runs instead, picking up
+      whatever changed meanwhile, unless another task is already waiting (then it's coalesced into that one).
+      Waiting holds a worker slot, so keep it at 0 for the realtime queue.
+The locks are session level and live in a dedicated connection, so they are released if the worker dies.
+"""
+
+import zlib
+from contextlib import contextmanager
+from typing import Generator
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.querycache import normalize_filter
+from app.db.session import engine
+
+# First half of the two-key advisory lock, to tell apart the running and the waiting locks
+RUNNING_NAMESPACE = 7301
+WAITING_NAMESPACE = 7302
+
+
+def sync_lock_key(
+    entity: str, folderlist: list[int] | None = None, filter: str | None = None, synctimes: bool = False
+) -> int:
+    """Stable 32 bit key for the entity, folder set (the order of the folders doesn't matter) and request"""
+    folders = ",".join(str(folder) for folder in sorted(set(folderlist or [])))
+    request = f"{normalize_filter(filter) if filter else ''}|{synctimes}"
+    key = zlib.crc32(f"{entity}|{folders}|{request}".encode())
+    # pg_advisory_lock(int, int) takes signed integers
+    return key - 2**32 if key >= 2**31 else key
+
+
+@contextmanager
+def sync_lock(
+    entity: str,
+    folderlist: list[int] | None = None,
+    filter: str | None = None,
+    synctimes: bool = False,
+    wait_seconds: int | None = None,
+) -> Generator[bool, None, None]:
+    """Single-flight lock for a sync task.
+
+    Args:
+        entity (str): Entity being synced (i.e. "jobs")
+        folderlist (list[int] | None, optional): Folders being synced. Defaults to None.
+        filter (str | None, optional): OData filter of the request. Defaults to None.
+        synctimes (bool, optional): Whether the request syncs from the watermark. Defaults to False.
+        wait_seconds (int | None, optional): Max time to wait for the running sync, 0 to coalesce right away.
+            Defaults to SYNC_LOCK_WAIT_SECONDS.
+
+    Yields:
+        bool: True if the caller must run the sync, False if it was coalesced into another request
+    """
+    if not settings.SYNC_LOCK_ENABLED:
+        yield True
+        return
+    wait_seconds = settings.SYNC_LOCK_WAIT_SECONDS if wait_seconds is None else wait_seconds
+    key = sync_lock_key(entity, folderlist, filter, synctimes)
+    params = {"running": RUNNING_NAMESPACE, "waiting": WAITING_NAMESPACE, "key": key}
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:running, :key)"), params).scalar()
+        if not acquired:
+            if wait_seconds <= 0:
+                logger.info(f"Sync of {entity} for folders {folderlist} already running, coalesced")
+                yield False
+                return
+            if not conn.execute(text("SELECT pg_try_advisory_lock(:waiting, :key)"), params).scalar():
+                logger.info(f"Sync of {entity} for folders {folderlist} already running and queued, coalesced")
+                yield False
+                return
+            logger.info(f"Sync of {entity} for folders {folderlist} already running, waiting for it")
+            try:
+                conn.execute(text(f"SET lock_timeout = '{int(wait_seconds)}s'"))
+                conn.execute(text("SELECT pg_advisory_lock(:running, :key)"), params)
+                acquired = True
+            except OperationalError:
+                logger.warning(f"Timeout waiting for the sync of {entity} for folders {folderlist}, skipped")
+            finally:
+                conn.execute(text("RESET lock_timeout"))
+                conn.execute(text("SELECT pg_advisory_unlock(:waiting, :key)"), params)
+            if not acquired:
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:running, :key)"), params)
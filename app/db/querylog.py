@@ -0,0 +1,176 @@
+"""Slow query log and per-statement stats of the SQLAlchemy engines.
+
+Every statement executed through an instrumented engine is timed (cursor execution, as seen by the driver) and
+aggregated under its normalized SQL: bind placeholders and string literals replaced by ?, repeated VALUES tuples
+and IN lists collapsed, so the 1000-row upsert and the 10-row one are the same statement. The stats live in
+memory, per process, bounded to QUERY_STATS_MAX_STATEMENTS (the cheapest ones are dropped first).
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with the normalized SQL, never the bind values. With
+SLOW_QUERY_EXPLAIN, slow SELECTs also get an EXPLAIN (ANALYZE, BUFFERS) on the same connection, at most once per
+statement every SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS since ANALYZE runs the query again. Writes are never
+explained. Postgres prints the bound values inside the plan conditions, so the plan is redacted like the SQL before
+it's logged or kept in the stats.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, ExceptionContext
+
+from app.core.config import settings
+
+MAX_LOGGED_SQL = 2000
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|%s|\?")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_REPEATED = re.compile(r"\((\s*\?\s*,)*\s*\?\s*\)(\s*,\s*\((\s*\?\s*,)*\s*\?\s*\))+")
+_IN_LIST = re.compile(r"\((\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+# Plan lines with an expression (Filter, Index Cond, Hash Cond, Sort Key...), not the Rows Removed by Filter counts
+_PLAN_EXPRESSION = re.compile(r"^(\s*(?!Rows Removed)(?:[A-Z][\w-]* )*(?:Cond|Filter|Key):)(.*)$", re.MULTILINE)
+_NUMBER = re.compile(r"(?<![\w\".$])-?\d+(?:\.\d+)?(?![\w\"])")
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL without bind values or literals, with repeated tuples/lists collapsed"""
+    sql = _STRING_LITERAL.sub("'?'", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _REPEATED.sub("(...), ...", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def redact_plan(plan: str) -> str:
+    """EXPLAIN output without literals: strings (bound values, arrays of ids) and the numbers in the conditions"""
+    plan = _STRING_LITERAL.sub("'?'", plan)
+    return _PLAN_EXPRESSION.sub(lambda match: match.group(1) + _NUMBER.sub("?", match.group(2)), plan)
+
+
+def _is_explainable(sql: str) -> bool:
+    head = sql.lstrip("( ").upper()
+    return head.startswith(("SELECT", "WITH")) and not re.search(r"\b(INSERT|UPDATE|DELETE)\b", sql.upper())
+
+
+class QueryStats:
+    """Per-statement aggregates, thread safe"""
+
+    def __init__(self, max_statements: int):
+        self.max_statements = max_statements
+        self.lock = threading.Lock()
+        self.statements: dict[str, dict[str, Any]] = {}
+
+    def record(self, engine: str, sql: str, seconds: float, rows: int) -> dict[str, Any]:
+        key = hashlib.sha1(f"{engine}|{sql}".encode()).hexdigest()[:16]
+        with self.lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                if len(self.statements) >= self.max_statements:
+                    cheapest = min(self.statements, key=lambda name: self.statements[name]["total_ms"])
+                    del self.statements[cheapest]
+                stats = self.statements[key] = {
+                    "id": key,
+                    "engine": engine,
+                    "sql": sql,
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                    "slow_calls": 0,
+                    "last_explain_at": None,
+                    "plan": None,
+                }
+            milliseconds = seconds * 1000
+            stats["calls"] += 1
+            stats["total_ms"] += milliseconds
+            stats["max_ms"] = max(stats["max_ms"], milliseconds)
+            stats["rows"] += max(rows, 0)
+            if milliseconds >= settings.SLOW_QUERY_THRESHOLD_MS:
+                stats["slow_calls"] += 1
+            return stats
+
+    def top(self, limit: int = 50, order: str = "total_ms") -> list[dict[str, Any]]:
+        with self.lock:
+            rows = [{**stats, "mean_ms": stats["total_ms"] / stats["calls"]} for stats in self.statements.values()]
+        rows.sort(key=lambda stats: stats.get(order, 0.0), reverse=True)
+        for stats in rows:
+            for field in ("total_ms", "max_ms", "mean_ms"):
+                stats[field] = round(stats[field], 2)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self.lock:
+            self.statements.clear()
+
+
+query_stats = QueryStats(max_statements=settings.QUERY_STATS_MAX_STATEMENTS)
+
+
+def _explain(conn: Any, statement: str, parameters: Any) -> Optional[str]:
+    # In a savepoint: a failed EXPLAIN must not abort the caller's transaction
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT querylog_explain")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+            plan = redact_plan("\n".join(str(row[0]) for row in cursor.fetchall()))
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT querylog_explain")
+            raise
+        cursor.execute("RELEASE SAVEPOINT querylog_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def instrument_queries(engine: Engine, name: str) -> None:
+    """Times every statement of the engine into query_stats and logs the slow ones
+
+    Args:
+        engine (Engine): Sync engine (for async engines, their sync_engine)
+        name (str): Engine name in the stats and logs
+    """
+    if not settings.SLOW_QUERY_LOG_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        sql = normalize_sql(statement)
+        stats = query_stats.record(name, sql, seconds, getattr(cursor, "rowcount", 0) or 0)
+        if seconds * 1000 < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+        logger.warning(f"Slow query ({name}, {seconds * 1000:.0f} ms, id {stats['id']}): {sql[:MAX_LOGGED_SQL]}")
+        if not settings.SLOW_QUERY_EXPLAIN or executemany or not _is_explainable(statement):
+            return
+        now = time.time()
+        last = stats["last_explain_at"]
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return
+        stats["last_explain_at"] = now
+        try:
+            stats["plan"] = _explain(conn, statement, parameters)
+            logger.warning(f"Plan of slow query {stats['id']}:\n{stats['plan']}")
+        except Exception as e:
+            logger.warning(f"Could not explain slow query {stats['id']}: {e}")
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(exception_context: ExceptionContext) -> None:
+        # The failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        started = connection.info.get("query_started") if connection is not None else None
+        if started:
+            started.pop()
@@ -1,15 +1,20 @@
 import asyncio
+import threading
+import time
 from collections import deque
 from contextlib import AbstractContextManager, asynccontextmanager, contextmanager
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 
 from loguru import logger
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_WAIT, DB_READ_SESSIONS, DB_REPLICA_LAG, instrument_pool
+from app.db.querylog import instrument_queries
 
 # We have two different engines because one is sync while the other is async.
 # The async engine uses a special connection pool with round robin assignment to avoid creating multiple sessions that would degrade performance
@@ -17,6 +22,19 @@ from app.core.config import settings
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)  # type: ignore
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_pool(engine, "sync")
+instrument_queries(engine, "sync")
+
+# Optional read replica for the read-only API endpoints (see get_db_read_depends)
+replica_engine: Optional[Engine] = None
+ReplicaSessionLocal: Optional[sessionmaker] = None
+if settings.SQLALCHEMY_DATABASE_URI_REPLICA:
+    replica_engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI_REPLICA, pool_pre_ping=True, connect_args={"connect_timeout": 5}
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    instrument_pool(replica_engine, "replica")
+    instrument_queries(replica_engine, "replica")
 
 
 # poolclass NullPool is CRITICAL to avoid really weird asyncio errors that can't be debugged
@@ -24,6 +42,8 @@ async_engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URI_ASYNC, pool_pre_ping=True, echo=False, poolclass=NullPool
 )
 AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+instrument_pool(async_engine.sync_engine, "async")
+instrument_queries(async_engine.sync_engine, "async")
 
 
 class DBContext(AbstractContextManager):
@@ -42,6 +62,71 @@ class DBContext(AbstractContextManager):
         return False
 
 
+class ReplicaRouter:
+    """Decides whether the read-only sessions go to the replica: only while it can be reached and its replay lag is
+    under max_lag. The lag is measured at most once every check_interval seconds (per process), the requests in
+    between reuse the last decision.
+
+    Args:
+        replica (Engine | None): Replica engine, None if there is no replica
+        max_lag (float): Seconds of lag above which the reads go to the primary
+        check_interval (float): Seconds between lag checks
+    """
+
+    # A replica that has replayed everything it received is up to date, however old its last transaction is
+    # (the replay timestamp alone would report an idle primary as lag)
+    LAG_QUERY = text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self, replica: Optional[Engine], max_lag: float, check_interval: float):
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.lag: Optional[float] = None
+        self.use_replica = False
+        self.checked_at: Optional[float] = None
+
+    def measure_lag(self) -> float:
+        """Replay lag of the replica in seconds"""
+        with self.replica.connect() as conn:  # type: ignore
+            return float(conn.execute(self.LAG_QUERY).scalar() or 0)
+
+    def _due(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval
+
+    def replica_usable(self) -> bool:
+        if self.replica is None:
+            return False
+        if not self._due():
+            return self.use_replica
+        with self.lock:
+            if not self._due():  # Checked by another thread meanwhile
+                return self.use_replica
+            try:
+                self.lag = self.measure_lag()
+                DB_REPLICA_LAG.set(self.lag)
+                usable = self.lag <= self.max_lag
+                if not usable:
+                    logger.warning(f"Read replica lag {self.lag:.1f}s over {self.max_lag}s, reading from the primary")
+            except Exception as e:
+                self.lag = None
+                usable = False
+                logger.warning(f"Read replica unavailable, reading from the primary: {e}")
+            if usable and not self.use_replica:
+                logger.info("Reading from the replica")
+            self.use_replica = usable
+            self.checked_at = time.monotonic()
+        return self.use_replica
+
+
+replica_router = ReplicaRouter(
+    replica_engine, max_lag=settings.REPLICA_MAX_LAG_SECONDS, check_interval=settings.REPLICA_LAG_CHECK_SECONDS
+)
+
+
 class ConnectionPool:
     # Async connection pool with round robin assignment using asyncpg.
     def __init__(self, pool_size: int):
@@ -53,13 +138,28 @@ class ConnectionPool:
 
     def initialize_pool(self):
         """Initialize all the DB sessions in the pool"""
-        # Create async engine and session factory
+        # Create async engine and session factory.
+        # The workers run every coroutine on one long-lived loop per process (app.worker.runtime), so the engine can
+        # keep its connections, and with them the asyncpg prepared statements of the ingestion upserts.
+        # INGESTION_DB_POOLED=False goes back to a connection per session (NullPool)
+        if settings.INGESTION_DB_POOLED:
+            pool_options = {
+                "pool_size": self.pool_size,
+                "max_overflow": 0,
+                "pool_pre_ping": True,
+                "pool_recycle": settings.INGESTION_POOL_RECYCLE_SECONDS,
+            }
+        else:
+            pool_options = {"poolclass": NullPool}
         self.engine = create_async_engine(
             settings.SQLALCHEMY_DATABASE_URI_ASYNC,
             echo=False,
-            poolclass=NullPool,
+            connect_args={"prepared_statement_cache_size": settings.ASYNCPG_STATEMENT_CACHE_SIZE},
+            **pool_options,
         )
         self.async_session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        instrument_pool(self.engine.sync_engine, "roundrobin")
+        instrument_queries(self.engine.sync_engine, "roundrobin")
 
         # Prepopulate the pool with sessions
         for _ in range(self.pool_size):
@@ -68,10 +168,18 @@ class ConnectionPool:
 
     async def get_async_dbsession(self):
         """Returns a DB session in a round-robin manner"""
-        async with self.lock:  # Ensure that session allocation is async-safe
-            session = self.sessions[self.current]
-            self.current = (self.current + 1) % self.pool_size
-            return session
+        with DB_POOL_WAIT.time(pool="roundrobin_session"):
+            async with self.lock:  # Ensure that session allocation is async-safe
+                session = self.sessions[self.current]
+                self.current = (self.current + 1) % self.pool_size
+        return session
+
+    @asynccontextmanager
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        """A session of its own in a transaction (committed on exit), for concurrent writes on the pooled engine"""
+        async with self.async_session_factory() as session:
+            async with session.begin():
+                yield session
 
     async def close_all_sessions(self):
         """Close all DB sessions"""
@@ -148,3 +256,25 @@ def get_db_depends() -> Generator:
     finally:
         db.close()
         db.close()
+
+
+def get_db_read_depends() -> Generator:
+    """Gets a read-only DB Session for FastAPI Depends(): on the read replica when there's one and it's not
+    lagging behind (see ReplicaRouter), on the primary otherwise. Never write through it.
+
+    Yields:
+        Generator: db session
+    """
+    if replica_router.replica_usable():
+        db = ReplicaSessionLocal()  # type: ignore
+        DB_READ_SESSIONS.inc(target="replica")
+    else:
+        db = SessionLocal()
+        DB_READ_SESSIONS.inc(target="primary")
+    try:
+        yield db
+    except:
+        db.rollback()
+        raise
+    finally:
+        db.close()
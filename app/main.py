@@ -1,14 +1,18 @@
 from time import sleep
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 
 from app.api.api_v1.mainrouter import api_router
 
 # For startup
 from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import instrument_app
 from app.frontend.mainrouter import front_router
 
 from .schedules.scheduler import scheduler, start_basic_schedules
@@ -40,9 +44,36 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Response compression
+if settings.RESPONSE_COMPRESSION == "gzip":
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MINIMUM_SIZE,
+        compresslevel=settings.RESPONSE_COMPRESSION_LEVEL,
+    )
+
+# Opt-in sampling profiler (PROFILING_ENABLED)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Added last so it's the outermost middleware and the latency includes the others
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 app.include_router(front_router, prefix="")
 
+# Optional OpenTelemetry tracing (TRACING_ENABLED)
+instrument_app(app)
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        # Prometheus text exposition format
+        return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 
 """
 @app.on_event("startup")
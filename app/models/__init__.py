@@ -1,5 +1,5 @@
 from .orchestratorapi import Folder
-from .schedulers import ScheduleSyncTimes
+from .schedulers import ScheduleSyncTimes, SyncRun
 from .token import Token
 from .uipathtoken import UIPathToken
 from .user import User
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, Integer, String, false, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import mapped_column, relationship
 
@@ -18,6 +18,9 @@ class Folder(Base):
     FolderType = mapped_column(String)
     ParentId = mapped_column(Integer)
     ParentKey = mapped_column(UUID(as_uuid=True))
+    # Soft delete: set by the reconciliation after a full sync when Orchestrator no longer returns the row
+    IsDeleted = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+    DeletedAt = mapped_column(DateTime, nullable=True)
     # Refs
 
     QueueDefinitions = relationship("QueueDefinitions", back_populates="Folder")
@@ -48,6 +51,9 @@ class QueueDefinitions(Base):
     IsProcessInCurrentFolder = mapped_column(Boolean)
     FoldersCount = mapped_column(Integer)
     Tags = mapped_column(JSON)
+    # Soft delete: set by the reconciliation after a full sync when Orchestrator no longer returns the row
+    IsDeleted = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+    DeletedAt = mapped_column(DateTime, nullable=True)
 
     # Refs
     # Establish the relationship with Folder
@@ -80,6 +86,9 @@ class Process(Base):
     ProcessKey = mapped_column(String)
     ProcessVersion = mapped_column(String)
     Arguments = mapped_column(JSON)
+    # Soft delete: set by the reconciliation after a full sync when Orchestrator no longer returns the row
+    IsDeleted = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+    DeletedAt = mapped_column(DateTime, nullable=True)
     # Refs
     Folder = relationship("Folder", back_populates="Processes")
     Tracked = relationship("TrackedProcess", back_populates="Process")
@@ -150,6 +159,9 @@ class QueueItemEvent(Base):
     # refs
     QueueItems = relationship("QueueItem", back_populates="Events")
 
+    # Latest event of each item (see CRUDQueueItem.apply_latest_events)
+    __table_args__ = (Index("ix_uipath_queueitemevents_item_timestamp", "QueueItemId", "Timestamp"),)
+
 
 class Job(Base):
     __tablename__ = "uipath_jobs"  # type: ignore
@@ -176,10 +188,21 @@ class Job(Base):
     LocalSystemAccount = mapped_column(String)
     OrchestratorUserIdentity = mapped_column(String)
     MaxExpectedRunningTimeSeconds = mapped_column(Integer)
+    # Last time the job state poller asked about it (see app.schedules.jobpolling)
+    LastPolledAt = mapped_column(DateTime, nullable=True)
     # Refs
     # Establish the relationship with Folder
     Folder = relationship("Folder", back_populates="Jobs")
 
+    # The poller only reads the unfinished jobs, a small share of the table
+    __table_args__ = (
+        Index(
+            "ix_uipath_jobs_unfinished",
+            "OrganizationUnitId",
+            postgresql_where=text(""""State" NOT IN ('Faulted', 'Successful', 'Stopped')"""),
+        ),
+    )
+
 
 class Sessions(Base):
     __tablename__ = "uipath_sessions"  # type: ignore
@@ -194,3 +217,6 @@ class Sessions(Base):
     UsedRuntimes = mapped_column(Integer)
     ServiceUserName = mapped_column(String)
     Platform = mapped_column(String)
+    # Soft delete: set by the reconciliation after a full sync when Orchestrator no longer returns the row
+    IsDeleted = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+    DeletedAt = mapped_column(DateTime, nullable=True)
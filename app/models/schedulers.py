@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import JSON, DateTime, Float, Integer, String, Text
 from sqlalchemy.orm import mapped_column
 
 from app.db.base_class import Base
@@ -12,3 +12,29 @@ class ScheduleSyncTimes(Base):
     id = mapped_column(Integer, primary_key=True, index=True, autoincrement=False)
     TimeStamp = mapped_column(DateTime)
     Description = mapped_column(String)
+
+
+class SyncRun(Base):
+    # Ledger of every sync task run, with its performance telemetry
+    __tablename__ = "sync_runs"  # type:ignore
+    id = mapped_column(Integer, primary_key=True, index=True, autoincrement=True)
+    task_id = mapped_column(String, nullable=True)
+    entity = mapped_column(String, index=True)
+    status = mapped_column(String)  # running, success, failed, coalesced
+    started_at = mapped_column(DateTime, index=True)
+    finished_at = mapped_column(DateTime, nullable=True)
+    duration = mapped_column(Float, nullable=True)
+    filter = mapped_column(String, nullable=True)
+    rows = mapped_column(Integer, default=0)
+    inserted = mapped_column(Integer, default=0)
+    updated = mapped_column(Integer, default=0)
+    unchanged = mapped_column(Integer, default=0)
+    skipped = mapped_column(Integer, default=0)
+    deleted = mapped_column(Integer, default=0)
+    api_calls = mapped_column(Integer, default=0)
+    api_latency_p50 = mapped_column(Float, nullable=True)  # ms
+    api_latency_p95 = mapped_column(Float, nullable=True)
+    api_latency_p99 = mapped_column(Float, nullable=True)
+    db_write_seconds = mapped_column(Float, nullable=True)
+    pages = mapped_column(JSON, nullable=True)  # {folder: pages}
+    error = mapped_column(Text, nullable=True)
@@ -0,0 +1,103 @@
+"""Adaptive refresh intervals for the main schedules.
+
+Each sync is observed when its task finishes, through its SyncReport: how many rows it inserted or updated
+and how long it took. If the digest of the rows is the same as in the previous sync for the key, nothing
+changed whatever the counts say. Keys are either an entity ("jobs") or an entity and folder ("processes:123").
+    - Nothing changed: the interval grows (quiet folders end up polled every ADAPTIVE_SCHEDULE_MAX_SECONDS)
+    - ADAPTIVE_SCHEDULE_BUSY_ROWS or more changed: the interval shrinks
+    - The interval is never shorter than twice the last duration, so runs don't pile up
+Intervals always stay within ADAPTIVE_SCHEDULE_MIN_SECONDS and ADAPTIVE_SCHEDULE_MAX_SECONDS.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import settings
+
+
+class AdaptiveSchedulePolicy:
+    """Keeps the current interval, next due time and last rows digest for each key"""
+
+    def __init__(
+        self,
+        min_seconds: float = 30,
+        max_seconds: float = 1800,
+        busy_rows: int = 100,
+        backoff: float = 1.5,
+        speedup: float = 0.5,
+        slack_seconds: float = 5,
+    ):
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.busy_rows = busy_rows
+        self.backoff = backoff
+        self.speedup = speedup
+        self.slack = timedelta(seconds=slack_seconds)
+        self.lock = threading.Lock()
+        self.intervals: dict[str, float] = {}
+        self.next_due: dict[str, datetime] = {}
+        self.digests: dict[str, Optional[str]] = {}
+
+    def _clamp(self, seconds: float) -> float:
+        return min(max(seconds, self.min_seconds), self.max_seconds)
+
+    def interval(self, key: str, base: float) -> float:
+        """Current interval for the key (the base interval if it was never observed)"""
+        with self.lock:
+            return self.intervals.get(key, self._clamp(base))
+
+    def is_due(self, key: str, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now()
+        with self.lock:
+            next_due = self.next_due.get(key)
+        return next_due is None or now + self.slack >= next_due
+
+    def mark_dispatched(self, key: str, base: float, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now()
+        interval = self.interval(key, base)
+        with self.lock:
+            self.next_due[key] = now + timedelta(seconds=interval)
+
+    def observe(self, key: str, changed: int, duration: float, base: float, digest: Optional[str] = None) -> float:
+        """Feeds the result of a sync into the policy
+
+        Args:
+            key (str): Entity or entity:folder key
+            changed (int): Rows inserted or updated by the sync
+            duration (float): Seconds the sync took
+            base (float): Configured interval of the schedule
+            digest (Optional[str], optional): Digest of the rows (detects syncs that changed nothing). Defaults to None.
+
+        Returns:
+            float: New interval for the key
+        """
+        with self.lock:
+            if digest is not None and self.digests.get(key) == digest:
+                changed = 0
+            self.digests[key] = digest
+            interval = self.intervals.get(key, self._clamp(base))
+            if changed == 0:
+                interval *= self.backoff
+            elif changed >= self.busy_rows:
+                interval *= self.speedup
+            interval = self._clamp(max(interval, duration * 2))
+            self.intervals[key] = interval
+        return interval
+
+    def snapshot(self) -> dict[str, dict]:
+        """Current state for every key (for the scheduler endpoints)"""
+        with self.lock:
+            return {
+                key: {"interval": interval, "next_due": self.next_due.get(key)}
+                for key, interval in sorted(self.intervals.items())
+            }
+
+
+adaptive_policy = AdaptiveSchedulePolicy(
+    min_seconds=settings.ADAPTIVE_SCHEDULE_MIN_SECONDS,
+    max_seconds=settings.ADAPTIVE_SCHEDULE_MAX_SECONDS,
+    busy_rows=settings.ADAPTIVE_SCHEDULE_BUSY_ROWS,
+    backoff=settings.ADAPTIVE_SCHEDULE_BACKOFF,
+    speedup=settings.ADAPTIVE_SCHEDULE_SPEEDUP,
+)
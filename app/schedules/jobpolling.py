@@ -0,0 +1,69 @@
+"""Which unfinished jobs the job state poller asks Orchestrator about, and how.
+
+Every run of the poller (main_jobspolled_refresh) only polls the jobs that are due: a job is polled again once
+JOBPOLL_AGING_FACTOR times its age has passed since its last poll, capped at JOBPOLL_MAX_INTERVAL_SECONDS. With the
+default 0.1, a job that started 5 minutes ago is polled on every run, one running for 10 hours every hour, and
+jobs stuck for days every JOBPOLL_MAX_INTERVAL_SECONDS. Jobs never polled are always due.
+The due jobs are grouped by folder (the API is folder scoped) and split in chunks of JOBPOLL_CHUNK_SIZE Ids,
+so each request has a bounded "Id in (...)" filter.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+
+from app.core.config import settings
+
+# Only what's needed to tell whether a job changed
+POLL_SELECT = "Id,State,EndTime"
+
+
+def poll_interval(age_seconds: float, factor: float, max_seconds: float) -> float:
+    """Seconds between polls of a job of that age"""
+    return min(max(age_seconds, 0.0) * factor, max_seconds)
+
+
+def is_due(
+    started: Optional[datetime],
+    last_polled: Optional[datetime],
+    now: datetime,
+    factor: Optional[float] = None,
+    max_seconds: Optional[float] = None,
+) -> bool:
+    """Whether the job has to be polled now
+
+    Args:
+        started (Optional[datetime]): Start (or creation) time of the job
+        last_polled (Optional[datetime]): Last time it was polled, None if never
+        now (datetime): Current time (same timezone convention as the others: naive UTC in the DB)
+        factor (float, optional): Share of the age between polls. Defaults to JOBPOLL_AGING_FACTOR.
+        max_seconds (float, optional): Maximum interval. Defaults to JOBPOLL_MAX_INTERVAL_SECONDS.
+    """
+    if last_polled is None or started is None:
+        return True
+    factor = settings.JOBPOLL_AGING_FACTOR if factor is None else factor
+    max_seconds = settings.JOBPOLL_MAX_INTERVAL_SECONDS if max_seconds is None else max_seconds
+    interval = poll_interval((last_polled - started).total_seconds(), factor, max_seconds)
+    return (now - last_polled).total_seconds() >= interval
+
+
+def due_by_folder(jobs: Sequence[Any], now: datetime) -> dict[int, list[Any]]:
+    """The due jobs grouped by folder. Jobs need Id, OrganizationUnitId, StartTime, CreationTime and LastPolledAt"""
+    folders: dict[int, list[Any]] = defaultdict(list)
+    for job in jobs:
+        if job.OrganizationUnitId is None:
+            continue
+        if is_due(job.StartTime or job.CreationTime, job.LastPolledAt, now):
+            folders[job.OrganizationUnitId].append(job)
+    return dict(folders)
+
+
+def chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    size = max(size, 1)
+    for index in range(0, len(items), size):
+        yield items[index : index + size]
+
+
+def id_filter(ids: Sequence[int]) -> str:
+    """OData filter for the jobs with these Ids"""
+    return f"Id in ({', '.join(str(id) for id in ids)})"
@@ -2,8 +2,10 @@ import asyncio
 import datetime
 from typing import Callable
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore as JobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler as Scheduler
+from celery import Task
 from celery.result import AsyncResult
 from loguru import logger
 from pydantic import BaseModel, field_validator
@@ -12,31 +14,88 @@ import app.worker.uipath as uipathtasks
 from app.core.config import settings
 from app.crud import uip_folder, uip_job
 from app.db.session import DBContext
+from app.schedules.adaptive import adaptive_policy
 
 jobstore = JobStore(url=settings.SQLALCHEMY_DATABASE_URI)
 scheduler = Scheduler(jobstores={"default": jobstore})
+# The event loop only keeps weak references to its tasks: hold the running observers until they finish
+observers: set[asyncio.Task] = set()
 
 
-async def refresh_token() -> None:
-    token = uipathtasks.FetchUIPathToken()
-    uipathtasks.GetUIPathToken.apply_async()
+def dispatch_sync(task: Task, kwargs: dict, jobid: str, keys: dict[str, int | None]) -> None:
+    """Sends the sync task and, with adaptive schedules enabled, observes its result in the background
+
+    Args:
+        task (Task): Celery task
+        kwargs (dict): Task arguments
+        jobid (str): Schedule that dispatched it (its interval gets tuned)
+        keys (dict[str, int | None]): Adaptive policy keys and the folder whose rows they count (None = all rows)
+    """
+    result = task.apply_async(kwargs=kwargs)
+    if settings.ADAPTIVE_SCHEDULE_ENABLED:
+        base = main_schedules[jobid].seconds
+        for key in keys:
+            adaptive_policy.mark_dispatched(key, base=base)
+        observer = asyncio.get_running_loop().create_task(observe_sync(result, jobid, keys))
+        observers.add(observer)
+        observer.add_done_callback(observers.discard)
+
+
+async def observe_sync(result: AsyncResult, jobid: str, keys: dict[str, int | None]) -> None:
+    """Waits for the sync task, feeds the adaptive policy with its report and reschedules the job"""
+    if not await wait_for_result(result, timeout=settings.ADAPTIVE_SCHEDULE_MAX_SECONDS):
+        logger.debug(f"Adaptive schedule: no usable result for {jobid}, interval unchanged")
+        return
+    report = result.result
+    if not isinstance(report, dict) or "folders" not in report or report.get("coalesced"):
+        # Fan-out syncs only return the dispatch info (each shard reports on its own), coalesced ones did nothing
+        return
+    base = main_schedules[jobid].seconds
+    for key, folder in keys.items():
+        # Folder keys arrive as strings through the JSON result backend
+        stats = report if folder is None else report["folders"].get(str(folder), {})
+        changed = stats.get("inserted", 0) + stats.get("updated", 0)
+        adaptive_policy.observe(key, changed, duration=report["duration"], base=base, digest=stats.get("digest"))
+    apply_adaptive_interval(jobid)
+
+
+def apply_adaptive_interval(jobid: str) -> None:
+    """The job runs at the shortest interval of its keys (per folder keys only dispatch the due folders)"""
+    base = main_schedules[jobid].seconds
+    keys = [key for key in adaptive_policy.snapshot() if key.split(":")[0] in schedule_entities[jobid]]
+    interval = min((adaptive_policy.interval(key, base) for key in keys), default=base)
+    job = scheduler.get_job(jobid)
+    if job is None:
+        return
+    current = job.trigger.interval_length
+    if abs(interval - current) > 0.1 * current:
+        logger.info(f"Adaptive schedule: {jobid} interval {current:.0f}s -> {interval:.0f}s")
+        scheduler.reschedule_job(job_id=jobid, trigger="interval", seconds=interval)
 
 
 async def refresh_folders() -> None:
     kwargs = {"fulldata": True, "upsert": True}
-    uipathtasks.fetchfolders.apply_async(kwargs=kwargs)
+    dispatch_sync(uipathtasks.fetchfolders, kwargs, "main_folder_refresh", {"folders": None})
 
 
 async def refresh_sessions() -> None:
     kwargs = {"fulldata": True, "filter": None}
-    uipathtasks.fetchsessions.apply_async(kwargs=kwargs)
+    dispatch_sync(uipathtasks.fetchsessions, kwargs, "main_sessions_refresh", {"sessions": None})
 
 
 async def refresh_processes_and_queues() -> None:
+    # No watermarks for these, so each folder can have its own interval: only the due folders are synced
     folderlist = get_folderlist()
-    kwargs = {"fulldata": True, "folderlist": folderlist, "filter": None}
-    uipathtasks.fetchprocesses.apply_async(kwargs=kwargs)
-    uipathtasks.fetchqueuedefinitions.apply_async(kwargs=kwargs)
+    jobid = "main_processesandqueues_refresh"
+    tasks = {"processes": uipathtasks.fetchprocesses, "queuedefinitions": uipathtasks.fetchqueuedefinitions}
+    for entity, task in tasks.items():
+        keys = {f"{entity}:{folder}": folder for folder in folderlist}
+        if settings.ADAPTIVE_SCHEDULE_ENABLED:
+            keys = {key: folder for key, folder in keys.items() if adaptive_policy.is_due(key)}
+            if not keys:
+                continue
+        kwargs = {"fulldata": True, "folderlist": list(keys.values()), "filter": None}
+        dispatch_sync(task, kwargs, jobid, keys)
 
 
 async def refresh_queueitemevents() -> None:
@@ -48,7 +107,14 @@ async def refresh_queueitemevents() -> None:
         "filter": None,
         "synctimes": True,
     }
-    uipathtasks.fetchqueueitemevents.apply_async(kwargs=kwargs)
+    # Watermark based: the watermark is global, so the whole entity shares one interval
+    if settings.SYNC_FANOUT_ENABLED:
+        kwargs = {"entity": "queueitemevents", **kwargs}
+        dispatch_sync(uipathtasks.fanoutsync, kwargs, "main_queueitemevent_refresh", {"queueitemevents": None})
+    else:
+        dispatch_sync(
+            uipathtasks.fetchqueueitemevents, kwargs, "main_queueitemevent_refresh", {"queueitemevents": None}
+        )
 
 
 async def refresh_queueitemnew() -> None:
@@ -60,7 +126,10 @@ async def refresh_queueitemnew() -> None:
         "filter": None,
         "synctimes": True,
     }
-    uipathtasks.fetchqueueitems.apply_async(kwargs=kwargs)
+    if settings.SYNC_FANOUT_ENABLED:
+        uipathtasks.fanoutsync.apply_async(kwargs={"entity": "queueitems", **kwargs})
+    else:
+        uipathtasks.fetchqueueitems.apply_async(kwargs=kwargs)
 
 
 async def refresh_jobstarted() -> None:
@@ -72,28 +141,26 @@ async def refresh_jobstarted() -> None:
         "filter": None,
         "synctimes": True,
     }
-    uipathtasks.fetchjobs.apply_async(kwargs=kwargs)
+    if settings.SYNC_FANOUT_ENABLED:
+        kwargs = {"entity": "jobs", **kwargs}
+        dispatch_sync(uipathtasks.fanoutsync, kwargs, "main_jobstarted_refresh", {"jobsstarted": None})
+    else:
+        dispatch_sync(uipathtasks.fetchjobs, kwargs, "main_jobstarted_refresh", {"jobsstarted": None})
 
 
 async def refresh_jobsunfinished() -> None:
     folderlist = get_folderlist()
-    unfinished_ids = get_unfinishedjobs()
-    if unfinished_ids:
-        filter = f"Id in ({', '.join(str(x) for x in unfinished_ids)})"
+    # Only a cheap check here: the poller picks the jobs that are due, per folder (see app.schedules.jobpolling)
+    if get_unfinishedjobs():
         logger.info("Sending Poll Jobs Unfinished Request")
-        kwargs = {
-            "fulldata": True,
-            "folderlist": folderlist,
-            "filter": filter,
-            "synctimes": False,
-        }
-        uipathtasks.fetchjobs.apply_async(kwargs=kwargs)
+        kwargs = {"folderlist": folderlist}
+        dispatch_sync(uipathtasks.polljobs, kwargs, "main_jobspolled_refresh", {"jobspolled": None})
 
 
 async def wait_for_result(result: AsyncResult, timeout: int = 30):
-    # Use asyncio.to_thread to run the blocking result.ready() in a separate thread
+    # Use asyncio.to_thread to run the blocking result.ready() (a result backend query) in a separate thread
     start_time = datetime.datetime.now()
-    while not result.ready():
+    while not await asyncio.to_thread(result.ready):
         await asyncio.sleep(1)  # Yield control to the event loop for 1 second
         if (datetime.datetime.now() - start_time).seconds > timeout:
             return False
@@ -128,9 +195,11 @@ class Schedule(BaseModel):
         return v
 
 
+# Schedules that were removed, deleted from the jobstore if they are still there
+retired_schedules = ["main_uip_token_refresh"]
+
 # Main Schedules dict.
 main_schedules = {
-    "main_uip_token_refresh": Schedule(seconds=150, taskid="main_uip_token_refresh", taskfunction=refresh_token),
     "main_folder_refresh": Schedule(seconds=300, taskid="main_folder_refresh", taskfunction=refresh_folders),
     "main_sessions_refresh": Schedule(seconds=300, taskid="main_sessions_refresh", taskfunction=refresh_sessions),
     "main_processesandqueues_refresh": Schedule(
@@ -145,6 +214,16 @@ main_schedules = {
     ),
 }
 
+# Adaptive policy keys (entity part) tuned by each main schedule
+schedule_entities = {
+    "main_folder_refresh": ["folders"],
+    "main_sessions_refresh": ["sessions"],
+    "main_processesandqueues_refresh": ["processes", "queuedefinitions"],
+    "main_queueitemevent_refresh": ["queueitemevents"],
+    "main_jobstarted_refresh": ["jobsstarted"],
+    "main_jobspolled_refresh": ["jobspolled"],
+}
+
 
 def start_basic_schedules(schedules: dict[str, Schedule] = main_schedules):
     """Starts the schedules indicated in the argument
@@ -152,6 +231,13 @@ def start_basic_schedules(schedules: dict[str, Schedule] = main_schedules):
     Args:
         schedules (dict[str, Schedule], optional): _description_. Defaults to schedules.
     """
+    for taskid in retired_schedules:
+        try:
+            # Not get_job: the stored function may not exist anymore
+            scheduler.remove_job(taskid)
+            logger.info(f"Removed retired task: {taskid}")
+        except JobLookupError:
+            pass
     logger.info("Adding Main Schedules...")
     for key, val in schedules.items():
         if not scheduler.get_job(val.taskid):
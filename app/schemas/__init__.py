@@ -6,22 +6,26 @@ from .orchestratorapi import (
     FolderBase,
     FolderCreate,
     FolderGETResponse,
+    FolderInDB,
     FolderUpdate,
     JobBase,
     JobCreate,
     JobGETResponse,
     JobGETResponseExtended,
+    JobInDB,
     JobUpdate,
     ProcessBase,
     ProcessCreate,
     ProcessGETResponse,
     ProcessGETResponseExtended,
+    ProcessInDB,
     ProcessingExceptionSchema,
     ProcessUpdate,
     QueueDefinitionBase,
     QueueDefinitionCreate,
     QueueDefinitionGETResponse,
     QueueDefinitionGETResponseExtended,
+    QueueDefinitionInDB,
     QueueDefinitionUpdate,
     QueueItemBase,
     QueueItemCreate,
@@ -29,13 +33,16 @@ from .orchestratorapi import (
     QueueItemEventCreate,
     QueueItemEventGETResponse,
     QueueItemEventGETResponseExtended,
+    QueueItemEventInDB,
     QueueItemGETResponse,
     QueueItemGETResponseExtended,
+    QueueItemInDB,
     QueueItemUpdate,
     SessionBase,
     SessionCreate,
     SessionGETResponse,
     SessionGETResponseExtended,
+    SessionInDB,
     SessionUpdate,
 )
 from .orchestratorwebhooks import JobPayload, QueueItemPayload
@@ -51,6 +58,6 @@ from .token import (
     WebToken,
 )
 from .totp import EnableTOTP, NewTOTP
-from .tracking import SyncTimes, TrackedProcess, TrackedQueue
+from .tracking import FolderSyncStats, SyncReport, SyncRun, SyncRunTrend, SyncTimes, TrackedProcess, TrackedQueue
 from .uipendpointforms import ODataForm, UIPFetchPostBody
 from .user import User, UserCreate, UserInDB, UserLogin, UserUpdate
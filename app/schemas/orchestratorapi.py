@@ -2,6 +2,7 @@ import json
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
 
 from pydantic import UUID4, BaseModel, ConfigDict, field_validator
 
@@ -422,6 +423,153 @@ class SessionUpdate(SessionGETResponseExtended):
     pass
 
 
+# ----------------------------------------
+# ------LOCAL DATA (DB) RESPONSE MODELS---
+# ----------------------------------------
+# These mirror the database models so the local data endpoints can serialize ORM rows with pydantic-core
+# instead of going through jsonable_encoder. Everything is optional because the tables are nullable.
+
+
+class InDBBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+
+class FolderInDB(InDBBase):
+    Id: int
+    Key: Optional[UUID] = None
+    DisplayName: Optional[str] = None
+    FullyQualifiedName: Optional[str] = None
+    Description: Optional[str] = None
+    FolderType: Optional[str] = None
+    ParentId: Optional[int] = None
+    ParentKey: Optional[UUID] = None
+    IsDeleted: bool = False
+    DeletedAt: Optional[datetime] = None
+
+
+class QueueDefinitionInDB(InDBBase):
+    Id: int
+    Key: Optional[UUID] = None
+    OrganizationUnitId: Optional[int] = None
+    ReleaseId: Optional[int] = None
+    Name: Optional[str] = None
+    CreationTime: Optional[datetime] = None
+    Description: Optional[str] = None
+    MaxNumberOfRetires: Optional[int] = None
+    AcceptAutomaticallyRetry: Optional[bool] = None
+    EnforceUniqueReference: Optional[bool] = None
+    Encrypted: Optional[bool] = None
+    SpecificDataJsonSchema: Optional[str] = None
+    OutputDataJsonSchema: Optional[str] = None
+    AnalyticsDataJsonSchema: Optional[str] = None
+    ProcessScheduleId: Optional[int] = None
+    SlaInMinutes: Optional[int] = None
+    RiskSlaInMinutes: Optional[int] = None
+    IsProcessInCurrentFolder: Optional[bool] = None
+    FoldersCount: Optional[int] = None
+    Tags: Optional[Any] = None
+    IsDeleted: bool = False
+    DeletedAt: Optional[datetime] = None
+
+
+class ProcessInDB(InDBBase):
+    Key: UUID
+    Id: Optional[int] = None
+    OrganizationUnitId: Optional[int] = None
+    Name: Optional[str] = None
+    JobPriority: Optional[str] = None
+    ProcessKey: Optional[str] = None
+    ProcessVersion: Optional[str] = None
+    Arguments: Optional[Any] = None
+    IsDeleted: bool = False
+    DeletedAt: Optional[datetime] = None
+
+
+class QueueItemInDB(InDBBase):
+    Id: int
+    QueueDefinitionId: Optional[int] = None
+    ReviewerUserId: Optional[int] = None
+    AncestorId: Optional[int] = None
+    OrganizationUnitId: Optional[int] = None
+    Status: Optional[str] = None
+    ReviewStatus: Optional[str] = None
+    Key: Optional[UUID] = None
+    Reference: Optional[str] = None
+    ProcessingExceptionType: Optional[str] = None
+    DueDate: Optional[datetime] = None
+    RiskSlaDate: Optional[datetime] = None
+    Priority: Optional[str] = None
+    DeferDate: Optional[datetime] = None
+    StartProcessing: Optional[datetime] = None
+    EndProcessing: Optional[datetime] = None
+    SecondsInPreviousAttempts: Optional[int] = None
+    RetryNumber: Optional[int] = None
+    CreationTime: Optional[datetime] = None
+    Progress: Optional[str] = None
+    RowVersion: Optional[str] = None
+    ProcessingException: Optional[Any] = None
+    SpecificContent: Optional[Any] = None
+    Output: Optional[Any] = None
+    Analytics: Optional[Any] = None
+
+
+class QueueItemEventInDB(InDBBase):
+    Id: int
+    QueueItemId: Optional[int] = None
+    UserId: Optional[int] = None
+    Timestamp: Optional[datetime] = None
+    Action: Optional[str] = None
+    Data: Optional[str] = None
+    UserName: Optional[str] = None
+    Status: Optional[str] = None
+    ReviewStatus: Optional[str] = None
+    ReviewerUserId: Optional[int] = None
+    ReviewerUserName: Optional[str] = None
+    ExternalClientId: Optional[int] = None
+
+
+class JobInDB(InDBBase):
+    Id: int
+    Key: Optional[UUID] = None
+    StartingScheduleId: Optional[int] = None
+    OrganizationUnitId: Optional[int] = None
+    PersistenceId: Optional[int] = None
+    StartTime: Optional[datetime] = None
+    EndTime: Optional[datetime] = None
+    State: Optional[str] = None
+    JobPriority: Optional[str] = None
+    ResourceOverwrites: Optional[str] = None
+    Source: Optional[str] = None
+    SourceType: Optional[str] = None
+    Info: Optional[str] = None
+    CreationTime: Optional[datetime] = None
+    ReleaseName: Optional[str] = None
+    InputArguments: Optional[Any] = None
+    OutputArguments: Optional[Any] = None
+    HostMachineName: Optional[str] = None
+    StopStrategy: Optional[str] = None
+    Reference: Optional[str] = None
+    LocalSystemAccount: Optional[str] = None
+    OrchestratorUserIdentity: Optional[str] = None
+    MaxExpectedRunningTimeSeconds: Optional[int] = None
+
+
+class SessionInDB(InDBBase):
+    SessionId: int
+    MachineId: Optional[int] = None
+    MachineName: Optional[str] = None
+    HostMachineName: Optional[str] = None
+    RuntimeType: Optional[str] = None
+    Status: Optional[str] = None
+    IsUnresponsive: Optional[bool] = None
+    Runtimes: Optional[int] = None
+    UsedRuntimes: Optional[int] = None
+    ServiceUserName: Optional[str] = None
+    Platform: Optional[str] = None
+    IsDeleted: bool = False
+    DeletedAt: Optional[datetime] = None
+
+
 # ----------------------------------------
 # ------XXXX SCHEMAS---------------
 # ----------------------------------------
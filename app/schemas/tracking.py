@@ -1,7 +1,7 @@
 import datetime
 from typing import Optional
 
-from pydantic import UUID4, BaseModel
+from pydantic import UUID4, BaseModel, ConfigDict, PrivateAttr
 
 
 class TrackedProcess(BaseModel):
@@ -26,3 +26,80 @@ class SyncTimes(BaseModel):
     id: int
     TimeStamp: datetime.datetime
     Description: Optional[str] = None
+
+
+class FolderSyncStats(BaseModel):
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0  # Already in the DB with the same values, not rewritten
+    skipped: int = 0
+    pages: int = 0  # API pages requested (count calls not included)
+    digest: Optional[str] = None  # Order independent hash of the rows content
+
+
+class SyncReport(BaseModel):
+    """Compact result of a sync task (instead of every row)"""
+
+    entity: str
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    deleted: int = 0  # Soft deleted by the reconciliation of a full sync
+    coalesced: bool = False
+    duration: float = 0.0
+    filter: Optional[str] = None
+    watermark: Optional[datetime.datetime] = None
+    digest: Optional[str] = None
+    api_calls: int = 0
+    api_latency_ms: dict[str, float] = {}  # p50/p95/p99 of the Orchestrator calls
+    db_write_seconds: float = 0.0
+    folders: dict[int, FolderSyncStats] = {}
+    results: Optional[list[dict]] = None  # Only with fullresult=True
+    # Latency of every API call (ms), summarized in api_latency_ms when the sync finishes
+    _latencies: list[float] = PrivateAttr(default_factory=list)
+
+
+class SyncRun(BaseModel):
+    """Row of the sync run ledger"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    task_id: Optional[str] = None
+    entity: str
+    status: str
+    started_at: datetime.datetime
+    finished_at: Optional[datetime.datetime] = None
+    duration: Optional[float] = None
+    filter: Optional[str] = None
+    rows: Optional[int] = None
+    inserted: Optional[int] = None
+    updated: Optional[int] = None
+    unchanged: Optional[int] = None
+    skipped: Optional[int] = None
+    deleted: Optional[int] = None
+    api_calls: Optional[int] = None
+    api_latency_p50: Optional[float] = None
+    api_latency_p95: Optional[float] = None
+    api_latency_p99: Optional[float] = None
+    db_write_seconds: Optional[float] = None
+    pages: Optional[dict[str, int]] = None
+    error: Optional[str] = None
+
+
+class SyncRunTrend(BaseModel):
+    """Aggregated sync runs of an entity over a time window"""
+
+    entity: str
+    runs: int
+    failed: int
+    coalesced: int
+    avg_duration: Optional[float] = None
+    p95_duration: Optional[float] = None
+    avg_rows: Optional[float] = None
+    avg_api_latency_p95: Optional[float] = None
+    avg_db_write_seconds: Optional[float] = None
+    last_run: Optional[datetime.datetime] = None
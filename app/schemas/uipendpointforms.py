@@ -19,3 +19,5 @@ class UIPFetchPostBody(BaseModel):
     fulldata: bool = False
     filter: Optional[str] = None
     folderlist: Optional[List[int]] = None
+    fanout: bool = False  # One subtask per folder
+    fullresult: bool = False  # Store every row in the task result, not just the sync report
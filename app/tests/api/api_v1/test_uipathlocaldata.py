@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.core.config import settings
+
+FOLDERS_URL = f"{settings.API_V1_STR}/uipath/folders"
+
+
+def _written(db: Session, when: datetime) -> None:
+    crud.tracked_synctimes.update_entity_written(db=db, entity="uipath_folders", newtime=when.replace(tzinfo=None))
+
+
+def test_conditional_get_etag(client: TestClient, db: Session) -> None:
+    _written(db, datetime.now(timezone.utc) - timedelta(minutes=1))
+    r = client.get(FOLDERS_URL)
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert client.get(FOLDERS_URL, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(FOLDERS_URL, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get(FOLDERS_URL, headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get(FOLDERS_URL, headers={"If-None-Match": '"other"'}).status_code == 200
+    # Another query of the same entity has its own tag
+    assert client.get(FOLDERS_URL, params={"top": 5}, headers={"If-None-Match": etag}).status_code == 200
+    # New data written: the old tag no longer matches
+    _written(db, datetime.now(timezone.utc) - timedelta(seconds=30))
+    r = client.get(FOLDERS_URL, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_conditional_get_last_modified(client: TestClient, db: Session) -> None:
+    _written(db, datetime.now(timezone.utc) - timedelta(minutes=1))
+    r = client.get(FOLDERS_URL)
+    last_modified = r.headers["last-modified"]
+    assert client.get(FOLDERS_URL, headers={"If-Modified-Since": last_modified}).status_code == 304
+    # If-None-Match takes precedence
+    headers = {"If-Modified-Since": last_modified, "If-None-Match": '"other"'}
+    assert client.get(FOLDERS_URL, headers=headers).status_code == 200
+    # Written in the current second (slightly ahead so the test can't cross into the next one): no Last-Modified,
+    # a write later in that second would look the same
+    _written(db, datetime.now(timezone.utc) + timedelta(seconds=5))
+    r = client.get(FOLDERS_URL, headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 200
+    assert "last-modified" not in r.headers
+
+
+def test_local_data_typed_and_compressed(client: TestClient, db: Session) -> None:
+    for id in range(900001, 900021):
+        folder = schemas.FolderCreate(
+            Id=id, Key=uuid.uuid4(), DisplayName=f"Folder {id}", FullyQualifiedName=f"Tests/{id}", FolderType="Standard"
+        )
+        crud.uip_folder.upsert(db=db, obj_in=folder)
+    r = client.get(FOLDERS_URL, params={"filter": "Id ge 900001 and Id le 900020"}, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    rows = r.json()
+    assert len(rows) == 20
+    # Serialized through FolderInDB: every column, UUIDs as strings
+    assert set(rows[0]) == set(schemas.FolderInDB.model_fields)
+    assert uuid.UUID(rows[0]["Key"])
+    assert rows[0]["IsDeleted"] is False
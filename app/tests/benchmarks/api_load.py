@@ -0,0 +1,267 @@
+"""API load test: how many concurrent dashboard users one backend instance can serve.
+
+Async httpx driver. Each virtual user logs in once and then loops over a weighted mix of the dashboard
+traffic until the end of the run:
+    - OData reads of /uipath/* (folder filters and pagination, revalidating with If-None-Match like a browser)
+    - /login/oauth and /login/refresh
+    - the scheduler endpoints (status, schedules and the sync run trends)
+It reports throughput and latency percentiles per endpoint, and fails if any of them is over the limits of
+load_thresholds.json ("default" applies to every endpoint without its own entry, "total" to the whole run).
+
+The backend must be running (with the usual .env). --seed first bulk loads a synthetic dataset of the given
+scale straight into its database: use it on test stacks only.
+
+Usage (from the backend root):
+    python -m app.tests.benchmarks.api_load --base-url http://localhost:8888 --users 50 --duration 60
+    python -m app.tests.benchmarks.api_load --seed --folders 10 --rows 50000 --users 200 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from app.core.telemetry import percentiles
+
+THRESHOLDS_PATH = Path(__file__).with_name("load_thresholds.json")
+
+API_PREFIX = "/api/v1"
+
+# Endpoint -> weight in the traffic mix (reads dominate, as on the dashboards)
+TRAFFIC_MIX: dict[str, int] = {
+    "uipath/jobs": 20,
+    "uipath/queueitems": 20,
+    "uipath/queueitemevents": 8,
+    "uipath/processes": 6,
+    "uipath/queuedefinitions": 6,
+    "uipath/folders": 6,
+    "uipath/sessions": 6,
+    "login/oauth": 2,
+    "login/refresh": 4,
+    "scheduler/status": 4,
+    "scheduler/schedules": 4,
+    "scheduler/syncruns/trends": 4,
+}
+
+
+@dataclass
+class Samples:
+    """Latencies (ms) and failures of one endpoint"""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def summarize(samples: dict[str, Samples], seconds: float) -> dict[str, dict[str, Any]]:
+    """Throughput and latency percentiles per endpoint, plus a "total" entry
+
+    Args:
+        samples (dict[str, Samples]): Endpoint -> samples
+        seconds (float): Duration of the run
+
+    Returns:
+        dict[str, dict[str, Any]]: Endpoint -> requests, errors, error_rate, rps, p50/p90/p95/p99 and max (ms)
+    """
+    everything = Samples()
+    for endpoint_samples in samples.values():
+        everything.latencies.extend(endpoint_samples.latencies)
+        everything.errors += endpoint_samples.errors
+    summary = {}
+    for endpoint, endpoint_samples in sorted(samples.items()) + [("total", everything)]:
+        requests = len(endpoint_samples.latencies)
+        summary[endpoint] = {
+            "requests": requests,
+            "errors": endpoint_samples.errors,
+            "error_rate": round(endpoint_samples.errors / requests, 4) if requests else 0.0,
+            "rps": round(requests / seconds, 1) if seconds else 0.0,
+            **percentiles(endpoint_samples.latencies, points=(50, 90, 95, 99)),
+            "max": round(max(endpoint_samples.latencies, default=0.0), 2),
+        }
+    return summary
+
+
+def check_thresholds(summary: dict[str, dict[str, Any]], thresholds: dict[str, dict[str, float]]) -> list[str]:
+    """Threshold violations of the summary (empty if there are none).
+    Limits: p50_ms, p95_ms, p99_ms and error_rate (maximums), min_rps (minimum)
+    """
+    violations = []
+    for endpoint, metrics in summary.items():
+        limits = thresholds.get(endpoint) or ({} if endpoint == "total" else thresholds.get("default", {}))
+        for limit, value in limits.items():
+            if limit == "min_rps":
+                if metrics["rps"] < value:
+                    violations.append(f"{endpoint}: {metrics['rps']} req/s < {value}")
+                continue
+            metric = limit.removesuffix("_ms")
+            if metric in metrics and metrics[metric] > value:
+                violations.append(f"{endpoint}: {limit} {metrics[metric]} > {value}")
+    return violations
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, username: str, password: str, folders: int, rows: int):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.folders = folders
+        self.rows = rows
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.etags: dict[str, str] = {}  # url -> ETag, as the browser cache would keep them
+
+    def _odata_params(self, entity: str) -> dict[str, Any]:
+        folder = random.randint(1, max(self.folders, 1))
+        if entity in ("jobs", "queueitems", "processes", "queuedefinitions") and random.random() < 0.5:
+            return {"filter": f"OrganizationUnitId eq {folder}"}
+        pages = max(self.rows // 100, 1) if entity in ("jobs", "queueitems", "queueitemevents") else 1
+        return {"top": 100, "skip": 100 * random.randrange(pages)}
+
+    def build_request(self, endpoint: str) -> tuple[str, str, dict[str, Any]]:
+        """Method, path and httpx keyword arguments for a request to the endpoint"""
+        path = f"{API_PREFIX}/{endpoint}"
+        if endpoint == "login/oauth":
+            return "POST", path, {"data": {"username": self.username, "password": self.password}}
+        if endpoint == "login/refresh":
+            return "POST", path, {"headers": {"Authorization": f"Bearer {self.refresh_token}"}}
+        headers = {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
+        if endpoint.startswith("uipath/"):
+            return "GET", path, {"params": self._odata_params(endpoint.split("/", 1)[1]), "headers": headers}
+        return "GET", path, {"headers": headers}
+
+    async def request(self, endpoint: str, samples: dict[str, Samples]) -> None:
+        method, path, kwargs = self.build_request(endpoint)
+        url = str(self.client.build_request(method, path, params=kwargs.get("params")).url)
+        if method == "GET" and url in self.etags:
+            kwargs["headers"] = {**kwargs.get("headers", {}), "If-None-Match": self.etags[url]}
+        endpoint_samples = samples[endpoint]
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            endpoint_samples.latencies.append((time.perf_counter() - start) * 1000)
+            endpoint_samples.errors += 1
+            return
+        endpoint_samples.latencies.append((time.perf_counter() - start) * 1000)
+        endpoint_samples.statuses[response.status_code] += 1
+        if response.status_code >= 400:
+            endpoint_samples.errors += 1
+            return
+        if "etag" in response.headers:
+            self.etags[url] = response.headers["etag"]
+        if endpoint.startswith("login/"):
+            tokens = response.json()
+            self.access_token = tokens.get("access_token") or self.access_token
+            self.refresh_token = tokens.get("refresh_token") or self.refresh_token
+
+    async def run(self, deadline: float, think_time: float, samples: dict[str, Samples]) -> None:
+        await self.request("login/oauth", samples)
+        endpoints = [endpoint for endpoint in TRAFFIC_MIX if endpoint != "login/refresh" or self.refresh_token]
+        weights = [TRAFFIC_MIX[endpoint] for endpoint in endpoints]
+        while time.perf_counter() < deadline:
+            await self.request(random.choices(endpoints, weights)[0], samples)
+            if think_time:
+                await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+async def run_load(
+    base_url: str,
+    users: int,
+    duration: float,
+    ramp_up: float,
+    think_time: float,
+    username: str,
+    password: str,
+    folders: int,
+    rows: int,
+) -> tuple[dict[str, Samples], float]:
+    """Runs the virtual users against the backend. Returns the samples per endpoint and the elapsed time"""
+    samples: dict[str, Samples] = defaultdict(Samples)
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        tasks = []
+        for index in range(users):
+            user = VirtualUser(client, username, password, folders, rows)
+            tasks.append(asyncio.create_task(user.run(deadline, think_time, samples)))
+            if ramp_up:
+                await asyncio.sleep(ramp_up / users)
+        await asyncio.gather(*tasks)
+        return samples, time.perf_counter() - start
+
+
+def seed_database(folders: int, rows: int) -> dict[str, int]:
+    """Bulk loads the synthetic dataset into the configured database"""
+    # App imports here: the settings are read from the environment at import time
+    from app.db.session import engine
+    from app.tests.benchmarks.seed import load_rows
+    from app.tests.benchmarks.synthetic import ENTITIES, SyntheticDataset
+
+    generator = SyntheticDataset(folders=folders, queue_items=rows, jobs=rows)
+    return {entity: load_rows(engine, entity, (row for _, row in generator.iter_rows(entity))) for entity in ENTITIES}
+
+
+def print_report(summary: dict[str, dict[str, Any]]) -> None:
+    columns = ("requests", "errors", "rps", "p50", "p90", "p95", "p99", "max")
+    print(f"{'endpoint':<28}" + "".join(f"{column:>10}" for column in columns))
+    for endpoint, metrics in summary.items():
+        print(f"{endpoint:<28}" + "".join(f"{metrics.get(column, '-'):>10}" for column in columns))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8888", help="Backend under test")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load (ramp-up included)")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds to start all the users")
+    parser.add_argument("--think-ms", type=float, default=500, help="Mean pause between requests of a user")
+    parser.add_argument("--seed", action="store_true", help="Bulk load the synthetic dataset first (test stacks only)")
+    parser.add_argument("--folders", type=int, default=5, help="Folders of the dataset")
+    parser.add_argument("--rows", type=int, default=10_000, help="Jobs and queue items per folder")
+    parser.add_argument("--thresholds", type=Path, default=THRESHOLDS_PATH, help="Limits file")
+    parser.add_argument("--output", type=Path, help="Also write the summary as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if args.seed:
+        loaded = seed_database(args.folders, args.rows)
+        print("Seeded " + ", ".join(f"{entity}={rows}" for entity, rows in loaded.items()))
+    samples, seconds = asyncio.run(
+        run_load(
+            args.base_url,
+            users=args.users,
+            duration=args.duration,
+            ramp_up=min(args.ramp_up, args.duration),
+            think_time=args.think_ms / 1000,
+            username=os.environ["FIRST_SUPERUSER"],
+            password=os.environ["FIRST_SUPERUSER_PASSWORD"],
+            folders=args.folders,
+            rows=args.rows,
+        )
+    )
+    summary = summarize(samples, seconds)
+    print(f"\n{args.users} users for {seconds:.1f}s against {args.base_url}")
+    print_report(summary)
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2))
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds.exists() else {}
+    violations = check_thresholds(summary, thresholds)
+    for violation in violations:
+        print(f"THRESHOLD {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
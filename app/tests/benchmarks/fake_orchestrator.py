@@ -0,0 +1,141 @@
+"""Local stand-in for the Orchestrator OData API, for the benchmarks.
+
+Serves the entities of a dataset (entity -> folder -> rows, folder 0 for the ones without folder) with the
+OData options the ingestion uses: $top, $skip, $count and $select, scoped by the X-UIPATH-OrganizationUnitId
+header. $filter is accepted and ignored. It also answers the token endpoint, so the token manager works as is.
+
+Each response can be delayed (latency_ms) and every Nth request throttled with a 429 (throttle_every), and every
+request is counted per entity and status so the benchmarks can report the API calls.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+# First path segment after /odata/ -> dataset entity
+ENTITY_PATHS = {
+    "Folders": "folders",
+    "Releases": "processes",
+    "QueueDefinitions": "queuedefinitions",
+    "QueueItems": "queueitems",
+    "QueueItemEvents": "queueitemevents",
+    "Jobs": "jobs",
+    "Sessions": "sessions",
+}
+
+
+class FakeOrchestrator:
+    def __init__(
+        self,
+        dataset: dict[str, dict[int, list[dict]]],
+        latency_ms: float = 0,
+        throttle_every: int = 0,
+        port: int = 0,
+    ):
+        self.dataset = dataset
+        self.latency = latency_ms / 1000
+        self.throttle_every = throttle_every
+        self.lock = threading.Lock()
+        self.calls: Counter = Counter()  # (entity, status) -> requests
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "FakeOrchestrator":
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-orchestrator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeOrchestrator":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def api_calls(self, entity: Optional[str] = None) -> int:
+        with self.lock:
+            return sum(count for (name, _), count in self.calls.items() if entity is None or name == entity)
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.calls.clear()
+            self.requests = 0
+
+    def _count(self, entity: str, status: int) -> bool:
+        """Counts the request and tells if it must be throttled"""
+        with self.lock:
+            self.requests += 1
+            throttled = bool(self.throttle_every) and self.requests % self.throttle_every == 0
+            self.calls[(entity, 429 if throttled else status)] += 1
+        return throttled
+
+    def page(self, entity: str, folder: int, query: dict[str, list[str]]) -> dict:
+        """OData response body for the query"""
+        rows = self.dataset.get(entity, {}).get(folder, [])
+        skip = int(query.get("$skip", ["0"])[0])
+        top = int(query.get("$top", [str(len(rows))])[0])
+        selected = rows[skip : skip + top]
+        select = query.get("$select", [""])[0]
+        if select:
+            fields = [field.strip() for field in select.split(",") if field.strip()]
+            selected = [{field: row.get(field) for field in fields} for row in selected]
+        body: dict = {"@odata.context": f"{self.url}/odata/$metadata#{entity}", "value": selected}
+        if query.get("$count", ["false"])[0].lower() == "true":
+            body["@odata.count"] = len(rows)
+        return body
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        orchestrator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+                payload = json.dumps(body, default=str).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; odata.metadata=minimal")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self) -> None:
+                # Token endpoint (client credentials)
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                orchestrator._count("token", 200)
+                self._send(200, {"access_token": "benchmark", "expires_in": 3600, "token_type": "Bearer", "scope": ""})
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                segment = url.path.split("/odata/", 1)[-1].split("/", 1)[0].split("(", 1)[0]
+                entity = ENTITY_PATHS.get(segment)
+                if entity is None:
+                    orchestrator._count(segment or "unknown", 404)
+                    self._send(404, {"message": f"Unknown entity {segment}"})
+                    return
+                if orchestrator._count(entity, 200):
+                    self._send(429, {"message": "Too many requests"}, {"Retry-After": "1"})
+                    return
+                if orchestrator.latency:
+                    time.sleep(orchestrator.latency)
+                folder = int(self.headers.get("X-UIPATH-OrganizationUnitId") or 0)
+                self._send(200, orchestrator.page(entity, folder, parse_qs(url.query)))
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
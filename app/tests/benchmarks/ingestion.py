@@ -0,0 +1,302 @@
+"""End-to-end ingestion benchmarks.
+
+Runs every sync pipeline of app.worker.uipath (folders, processes, queue definitions, jobs, queue items,
+queue item events and sessions) against the fake Orchestrator (app.tests.benchmarks.fake_orchestrator) and a
+disposable Postgres database (created on the configured server and dropped at the end), and reports for each:
+rows/s, peak RSS, API calls and DB statements.
+
+The results are compared with the baselines stored in baselines.json (per scenario), and the run fails if
+throughput drops or calls, statements or memory grow more than the tolerance. Baselines depend on the machine:
+record them on the reference one with --update-baseline.
+
+Usage (from the backend root, with the usual .env):
+    python -m app.tests.benchmarks.ingestion --scenario small
+    python -m app.tests.benchmarks.ingestion --scenario medium --latency-ms 50 --throttle-every 0
+    python -m app.tests.benchmarks.ingestion --scenario small --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Generator
+
+from app.tests.benchmarks.fake_orchestrator import FakeOrchestrator
+from app.tests.benchmarks.synthetic import SyntheticDataset
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+# rows: jobs, queue items and events per folder (the other entities are a few per folder)
+# synthetic: realistic dataset (app.tests.benchmarks.synthetic) instead of the minimal rows
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "small": {"folders": 3, "rows": 2_000, "latency_ms": 0, "throttle_every": 0},
+    "medium": {"folders": 10, "rows": 20_000, "latency_ms": 20, "throttle_every": 0},
+    "slowapi": {"folders": 5, "rows": 5_000, "latency_ms": 250, "throttle_every": 0},
+    "realistic": {"folders": 5, "rows": 20_000, "latency_ms": 20, "throttle_every": 0, "synthetic": True},
+}
+
+# Lower is better for all of them but rows_per_s
+REGRESSION_KEYS = ("api_calls", "db_statements", "peak_rss_mb")
+
+
+def simple_dataset(folders: int, rows: int) -> dict[str, dict[int, list[dict]]]:
+    """Minimal valid Orchestrator rows for every entity"""
+    dataset: dict[str, dict[int, list[dict]]] = {"folders": {0: []}, "sessions": {0: []}}
+    for entity in ("processes", "queuedefinitions", "jobs", "queueitems", "queueitemevents"):
+        dataset[entity] = {}
+    created = "2024-01-01T00:00:00Z"
+    for f in range(1, folders + 1):
+        dataset["folders"][0].append(
+            {
+                "Key": str(uuid.UUID(int=f)),
+                "DisplayName": f"Folder {f}",
+                "FullyQualifiedName": f"Shared/Folder {f}",
+                "FolderType": "Standard",
+                "Id": f,
+            }
+        )
+        dataset["processes"][f] = [
+            {
+                "Key": str(uuid.UUID(int=f * 1000 + p)),
+                "Name": f"Process {p}",
+                "OrganizationUnitId": f,
+                "Id": f * 1000 + p,
+                "ProcessKey": f"Process{p}",
+                "ProcessVersion": "1.0.0",
+                "JobPriority": "Normal",
+            }
+            for p in range(20)
+        ]
+        dataset["queuedefinitions"][f] = [
+            {
+                "Key": str(uuid.UUID(int=f * 1000 + q)),
+                "Name": f"Queue {q}",
+                "OrganizationUnitId": f,
+                "Id": f * 1000 + q,
+                "CreationTime": created,
+            }
+            for q in range(10)
+        ]
+        dataset["jobs"][f] = [
+            {
+                "Key": str(uuid.UUID(int=f * 10**7 + j)),
+                "ReleaseName": f"Process {j % 20}",
+                "CreationTime": created,
+                "State": "Successful",
+                "OrganizationUnitId": f,
+                "Id": f * 10**7 + j,
+                "JobPriority": "Normal",
+                "Source": "Manual",
+                "SourceType": "Manual",
+            }
+            for j in range(rows)
+        ]
+        dataset["queueitems"][f] = [
+            {
+                "QueueDefinitionId": f * 1000 + i % 10,
+                "Status": "Successful",
+                "Key": str(uuid.UUID(int=f * 10**7 + i)),
+                "Priority": "Normal",
+                "RetryNumber": 0,
+                "CreationTime": created,
+                "OrganizationUnitId": f,
+                "Id": f * 10**7 + i,
+            }
+            for i in range(rows)
+        ]
+        dataset["queueitemevents"][f] = [
+            {
+                "QueueItemId": f * 10**7 + e,
+                "Timestamp": created,
+                "Action": "Processed",
+                "Status": "Successful",
+                "Id": f * 10**7 + e,
+            }
+            for e in range(rows)
+        ]
+    dataset["sessions"][0] = [
+        {
+            "SessionId": s,
+            "MachineId": s,
+            "MachineName": f"Machine {s}",
+            "HostMachineName": f"HOST{s}",
+            "RuntimeType": "Unattended",
+            "Status": "Available",
+            "IsUnresponsive": False,
+            "Runtimes": 1,
+            "UsedRuntimes": 0,
+            "ServiceUserName": "robot",
+            "Platform": "Windows",
+        }
+        for s in range(1, folders * 2 + 1)
+    ]
+    return dataset
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of the results against the baseline (empty if there are none)"""
+    regressions = []
+    for pipeline, metrics in results.items():
+        base = baseline.get(pipeline)
+        if not base:
+            continue
+        if metrics["rows_per_s"] < base["rows_per_s"] * (1 - tolerance):
+            regressions.append(f"{pipeline}: rows/s {metrics['rows_per_s']} < baseline {base['rows_per_s']}")
+        for key in REGRESSION_KEYS:
+            if metrics[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{pipeline}: {key} {metrics[key]} > baseline {base[key]}")
+    return regressions
+
+
+@contextmanager
+def disposable_database() -> Generator[str, None, None]:
+    """Creates an empty database on the configured Postgres server and drops it afterwards"""
+    from sqlalchemy import create_engine, text
+
+    name = f"bench_{uuid.uuid4().hex[:8]}"
+    admin_url = (
+        f"postgresql+psycopg2://{os.environ['POSTGRES_USER']}:{os.environ['POSTGRES_PASSWORD']}"
+        f"@{os.environ['POSTGRES_SERVER']}/postgres"
+    )
+    admin = create_engine(admin_url, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        yield name
+    finally:
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        admin.dispose()
+
+
+def count_statements(engines: list) -> Callable[[], int]:
+    """Counts the statements executed through the engines. Returns a function reading the count"""
+    from sqlalchemy import event
+
+    executed = [0]
+
+    def before_cursor_execute(*args: Any, **kwargs: Any) -> None:
+        executed[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return lambda: executed[0]
+
+
+def run_benchmark(scenario: dict[str, Any]) -> dict[str, dict]:
+    """Runs every pipeline once. The environment must already point to the fake Orchestrator and the database"""
+    # App imports here: the settings are read from the environment at import time
+    from app.db.base import Base
+    from app.db.session import async_engine, db_pool, engine
+    from app.worker import uipath
+    from app.worker.runtime import async_runtime
+
+    Base.metadata.create_all(bind=engine)
+    statements = count_statements([engine, async_engine.sync_engine, db_pool.engine.sync_engine])
+    pipelines: list[tuple[str, Callable[[], list]]] = [
+        ("folders", lambda: uipath._fetch_folders()),
+        ("processes", lambda: async_runtime.run(uipath.fetch_processes_async())),
+        ("queuedefinitions", lambda: async_runtime.run(uipath.fetch_queuedefinitions_async())),
+        ("jobs", lambda: async_runtime.run(uipath.fetch_jobs_async())),
+        ("queueitems", lambda: async_runtime.run(uipath.fetch_queue_items_async())),
+        ("queueitemevents", lambda: async_runtime.run(uipath.fetch_queue_item_events_async())),
+        ("sessions", lambda: uipath._fetch_sessions()),
+    ]
+    orchestrator: FakeOrchestrator = scenario["orchestrator"]
+    results = {}
+    for name, pipeline in pipelines:
+        orchestrator.reset_counters()
+        before = statements()
+        start = time.perf_counter()
+        rows = len(pipeline())
+        seconds = time.perf_counter() - start
+        results[name] = {
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_s": round(rows / seconds, 1) if seconds else 0.0,
+            "api_calls": orchestrator.api_calls(),
+            "db_statements": statements() - before,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    async_runtime.stop()
+    return results
+
+
+def print_report(name: str, results: dict[str, dict]) -> None:
+    columns = ("rows", "seconds", "rows_per_s", "api_calls", "db_statements", "peak_rss_mb")
+    print(f"\nScenario {name}")
+    print(f"{'pipeline':<18}" + "".join(f"{column:>15}" for column in columns))
+    for pipeline, metrics in results.items():
+        print(f"{pipeline:<18}" + "".join(f"{metrics[column]:>15}" for column in columns))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="small")
+    parser.add_argument("--folders", type=int, help="Override the folders of the scenario")
+    parser.add_argument("--rows", type=int, help="Override the jobs/queue items/events per folder")
+    parser.add_argument("--latency-ms", type=float, help="Override the API latency")
+    parser.add_argument("--throttle-every", type=int, help="Answer 429 to every Nth request (0 never)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression (0.2 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    scenario = dict(SCENARIOS[args.scenario])
+    for key in ("folders", "rows", "latency_ms", "throttle_every"):
+        if getattr(args, key) is not None:
+            scenario[key] = getattr(args, key)
+    if scenario.get("synthetic"):
+        generator = SyntheticDataset(folders=scenario["folders"], queue_items=scenario["rows"], jobs=scenario["rows"])
+        dataset = generator.to_dataset()
+    else:
+        dataset = simple_dataset(scenario["folders"], scenario["rows"])
+
+    with FakeOrchestrator(
+        dataset, latency_ms=scenario["latency_ms"], throttle_every=scenario["throttle_every"]
+    ) as orchestrator, disposable_database() as database:
+        os.environ.update(
+            {
+                "POSTGRES_DB": database,
+                "UIP_API_URL": orchestrator.url,
+                "UIP_AUTH_TOKENURL": f"{orchestrator.url}/identity_/connect/token",
+                "SYNC_LOCK_ENABLED": "False",
+                "METRICS_WORKER_PORT": "0",
+                "TRACING_ENABLED": "False",
+            }
+        )
+        results = run_benchmark({**scenario, "orchestrator": orchestrator})
+
+    print_report(args.scenario, results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    if args.update_baseline:
+        baselines[args.scenario] = results
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline for {args.scenario} stored in {BASELINES_PATH}")
+        return 0
+    if args.scenario not in baselines:
+        print(f"\nNo baseline for {args.scenario}, run with --update-baseline to store one")
+        return 0
+    regressions = compare(results, baselines[args.scenario], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
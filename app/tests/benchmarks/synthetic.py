@@ -0,0 +1,526 @@
+"""Synthetic Orchestrator datasets with realistic volume and distributions.
+
+Generates folders (with subfolders), releases, queue definitions, queue items with their events, jobs and
+sessions, shaped like the Orchestrator OData responses (PascalCase fields, ISO dates, enum values the swagger
+client accepts):
+    - Items and jobs arrive uniformly (Poisson) over the time window, so Ids grow with CreationTime
+    - Few releases run most of the jobs, and every release has its own run time (lognormal)
+    - Every queue has its own processing time (lognormal), wait time and nested SpecificContent template
+    - Application exceptions are retried while the queue allows it: the failed attempt becomes Retried and a new
+      item is created with AncestorId, RetryNumber + 1 and SecondsInPreviousAttempts
+    - Items created in the last hours of the window are still New/InProgress, jobs still Pending/Running
+    - Events follow the item lifecycle: Create -> Status (InProgress) -> Status (result) [-> Retry | Delete]
+Everything derives from the seed, so the same arguments always give the same dataset. Rows are generated
+lazily per folder, so millions of items can be streamed to the DB or to JSON pages without holding them.
+
+Usage (from the backend root, with the usual .env for --load):
+    python -m app.tests.benchmarks.synthetic --folders 10 --queue-items 200000 --jobs 20000 --load
+    python -m app.tests.benchmarks.synthetic --folders 3 --queue-items 5000 --pages /tmp/orchestrator
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+INT32_MAX = 2**31 - 1
+
+ENTITIES = ("folders", "processes", "queuedefinitions", "queueitems", "queueitemevents", "jobs", "sessions")
+# Dataset entity -> Orchestrator OData entity set
+ENTITY_PATHS = {
+    "folders": "Folders",
+    "processes": "Releases",
+    "queuedefinitions": "QueueDefinitions",
+    "queueitems": "QueueItems",
+    "queueitemevents": "QueueItemEvents",
+    "jobs": "Jobs",
+    "sessions": "Sessions",
+}
+
+# Result of a processing attempt (New/InProgress depend on the time, see queue_history)
+ITEM_OUTCOMES = {"Successful": 0.87, "BusinessException": 0.07, "ApplicationException": 0.06}
+ABANDON_RATE = 0.01
+DELETE_RATE = 0.01
+JOB_STATES = {"Successful": 0.9, "Faulted": 0.06, "Stopped": 0.04}
+JOB_SOURCES = {("Manual", "Manual"): 0.1, ("Schedule", "Schedule"): 0.5, ("Queue trigger", "Queue"): 0.4}
+PRIORITIES = {"Normal": 0.8, "High": 0.15, "Low": 0.05}
+
+BUSINESS_REASONS = ("Invalid data in input", "Customer not found", "Amount over approval limit", "Duplicated")
+APPLICATION_REASONS = ("Selector not found", "Timeout waiting for the application", "SAP session lost")
+
+# Nested SpecificContent templates, one per queue (round robin)
+CONTENT_TEMPLATES = ("invoice", "customer", "order")
+
+
+def _isoformat(moment: datetime) -> str:
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _choice(rng: random.Random, weights: dict) -> Any:
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class SyntheticDataset:
+    """Deterministic generator of an Orchestrator tenant
+
+    Args:
+        folders (int): Folders (Ids 1..folders, some of them subfolders of the first ones)
+        queue_items (int): Transactions per folder (retries add more items on top)
+        jobs (int): Jobs per folder
+        days (int): Time window, ending at `end`
+        queues (int): Queue definitions per folder
+        releases (int): Releases (processes) per folder
+        machines (int): Sessions (machines) of the tenant. Defaults to 2 per folder.
+        seed (int): Random seed
+        end (datetime): End of the time window (fixed by default so the output is reproducible)
+    """
+
+    def __init__(
+        self,
+        folders: int = 3,
+        queue_items: int = 10_000,
+        jobs: int = 2_000,
+        days: int = 30,
+        queues: int = 8,
+        releases: int = 12,
+        machines: Optional[int] = None,
+        seed: int = 1,
+        end: datetime = datetime(2024, 6, 1, tzinfo=timezone.utc),
+    ):
+        self.folder_count = folders
+        self.queue_items = queue_items
+        self.jobs_per_folder = jobs
+        self.queues = queues
+        self.releases = releases
+        self.machines = machines or folders * 2
+        self.seed = seed
+        self.end = end
+        self.start = end - timedelta(days=days)
+        self.max_retries = 3
+        # Id blocks per folder: every attempt of every transaction, 4 events at most per attempt
+        self.item_stride = 10 ** len(str(queue_items * (self.max_retries + 1)))
+        self.event_stride = self.item_stride * 10
+        self.job_stride = 10 ** len(str(jobs))
+        if (folders + 1) * self.event_stride > INT32_MAX:
+            raise ValueError("Too many folders/items for int32 Ids, lower --folders or --queue-items")
+
+    def _rng(self, *scope: Any) -> random.Random:
+        # Independent stream per scope: any entity of any folder can be regenerated on its own
+        return random.Random(":".join(str(part) for part in (self.seed, *scope)))
+
+    def _arrivals(self, rng: random.Random, count: int) -> Iterator[datetime]:
+        """Uniform arrivals over the window (a Poisson process with a fixed count), in order"""
+        window = (self.end - self.start).total_seconds()
+        position = 0.0
+        for remaining in range(count, 0, -1):
+            # Minimum of the remaining uniforms: the arrivals come out sorted without generating them all first
+            position += (1 - position) * (1 - rng.random() ** (1 / remaining))
+            yield self.start + timedelta(seconds=position * window)
+
+    # ---------- folders, releases, queues, sessions
+
+    def folders(self) -> list[dict]:
+        rng = self._rng("folders")
+        rows: list[dict] = []
+        for folder in range(1, self.folder_count + 1):
+            parent = rows[rng.randrange(len(rows))] if rows and rng.random() < 0.3 else None
+            name = f"{rng.choice(('Finance', 'HR', 'Sales', 'Operations', 'IT'))} {folder}"
+            rows.append(
+                {
+                    "Key": _uuid(rng),
+                    "DisplayName": name,
+                    "FullyQualifiedName": f"{parent['FullyQualifiedName']}/{name}" if parent else name,
+                    "Description": None,
+                    "FolderType": "Standard",
+                    "ParentId": parent["Id"] if parent else None,
+                    "ParentKey": parent["Key"] if parent else None,
+                    "Id": folder,
+                }
+            )
+        return rows
+
+    def processes(self, folder: int) -> list[dict]:
+        rng = self._rng("processes", folder)
+        rows = []
+        for release in range(self.releases):
+            name = f"{rng.choice(('Invoice', 'Onboarding', 'Reconciliation', 'Report', 'Orders'))}_{release}"
+            arguments = [{"name": "in_Config", "type": "System.String", "required": False}]
+            rows.append(
+                {
+                    "Key": _uuid(rng),
+                    "Name": f"{name}_Folder{folder}",
+                    "OrganizationUnitId": folder,
+                    "Id": folder * 1000 + release,
+                    "ProcessKey": name,
+                    "ProcessVersion": f"1.{rng.randrange(10)}.{rng.randrange(100)}",
+                    "JobPriority": _choice(rng, PRIORITIES),
+                    "Arguments": {"Input": json.dumps(arguments), "Output": None},
+                }
+            )
+        return rows
+
+    def queuedefinitions(self, folder: int) -> list[dict]:
+        rng = self._rng("queuedefinitions", folder)
+        rows = []
+        for queue in range(self.queues):
+            template = CONTENT_TEMPLATES[queue % len(CONTENT_TEMPLATES)]
+            rows.append(
+                {
+                    "Key": _uuid(rng),
+                    "Name": f"{template.capitalize()}Queue_{queue}",
+                    "OrganizationUnitId": folder,
+                    "Id": folder * 1000 + queue,
+                    "ReleaseId": folder * 1000 + queue % self.releases,
+                    "CreationTime": _isoformat(self.start - timedelta(days=rng.randrange(30, 400))),
+                    "Description": f"{template} transactions",
+                    "MaxNumberOfRetires": rng.choice((0, 1, 2, self.max_retries)),
+                    "AcceptAutomaticallyRetry": rng.random() < 0.8,
+                    "EnforceUniqueReference": rng.random() < 0.5,
+                    "Encrypted": False,
+                    "SlaInMinutes": rng.choice((0, 60, 240, 1440)),
+                    "RiskSlaInMinutes": 0,
+                    "IsProcessInCurrentFolder": True,
+                    "FoldersCount": 1,
+                    "Tags": [],
+                }
+            )
+        return rows
+
+    def sessions(self) -> list[dict]:
+        rng = self._rng("sessions")
+        rows = []
+        for machine in range(1, self.machines + 1):
+            status = _choice(rng, {"Available": 0.6, "Busy": 0.3, "Disconnected": 0.08, "Unknown": 0.02})
+            runtimes = rng.choice((1, 1, 2, 4))
+            rows.append(
+                {
+                    "SessionId": machine,
+                    "MachineId": 100 + machine,
+                    "MachineName": f"Robots_{(machine - 1) // 4 + 1}",
+                    "HostMachineName": f"VMROBOT{machine:03d}",
+                    "RuntimeType": "Unattended",
+                    "Status": status,
+                    "IsUnresponsive": status == "Disconnected" and rng.random() < 0.5,
+                    "Runtimes": runtimes,
+                    "UsedRuntimes": rng.randint(1, runtimes) if status == "Busy" else 0,
+                    "ServiceUserName": f"svc_robot{machine:03d}",
+                    "Platform": "Windows",
+                }
+            )
+        return rows
+
+    # ---------- queue items and events
+
+    def _specific_content(self, rng: random.Random, template: str, reference: str) -> dict:
+        if template == "invoice":
+            lines: list[dict[str, Any]] = [
+                {
+                    "Sku": f"SKU-{rng.randrange(10**5):05d}",
+                    "Quantity": rng.randint(1, 20),
+                    "Price": rng.randrange(100, 50_000) / 100,
+                }
+                for _ in range(rng.randint(1, 5))
+            ]
+            return {
+                "InvoiceNumber": reference,
+                "Supplier": {"Name": f"Supplier {rng.randrange(500)}", "VatId": f"ES{rng.randrange(10**8):08d}"},
+                "Lines": lines,
+                "Total": round(sum(line["Quantity"] * line["Price"] for line in lines), 2),
+                "Currency": rng.choice(("EUR", "EUR", "USD")),
+            }
+        if template == "customer":
+            return {
+                "CustomerId": reference,
+                "Contact": {
+                    "Email": f"customer{rng.randrange(10**6)}@example.com",
+                    "Country": rng.choice(("ES", "FR", "DE")),
+                },
+                "Documents": [f"doc_{rng.randrange(10**6)}.pdf" for _ in range(rng.randint(0, 3))],
+            }
+        return {
+            "OrderId": reference,
+            "Items": rng.randint(1, 30),
+            "Shipping": {
+                "Method": rng.choice(("Standard", "Express")),
+                "Address": {"City": f"City {rng.randrange(200)}"},
+            },
+        }
+
+    def queue_history(self, folder: int) -> Iterator[tuple[dict, list[dict]]]:
+        """Queue items of the folder (every attempt is an item), each with its events, in Id order"""
+        definitions = self.queuedefinitions(folder)
+        rng = self._rng("queueitems", folder)
+        # Per queue: share of the traffic, median processing seconds and mean wait before processing
+        profiles = [
+            (rng.uniform(0.2, 1), rng.choice((15, 45, 120, 300)), rng.choice((60, 600, 3600))) for _ in definitions
+        ]
+        item_id = folder * self.item_stride
+        event_id = folder * self.event_stride
+        recent = self.end - timedelta(hours=6)
+        for number, created in enumerate(self._arrivals(rng, self.queue_items)):
+            queue_index = rng.choices(range(len(definitions)), [profile[0] for profile in profiles])[0]
+            queue, (_, median, wait) = definitions[queue_index], profiles[queue_index]
+            template = CONTENT_TEMPLATES[queue_index % len(CONTENT_TEMPLATES)]
+            reference = f"{template[:3].upper()}-{folder}-{number:07d}"
+            content = self._specific_content(rng, template, reference)
+            priority = _choice(rng, PRIORITIES)
+            ancestor = None
+            spent = 0
+            for retry in range(self.max_retries + 1):
+                item_id += 1
+                item: dict[str, Any] = {
+                    "QueueDefinitionId": queue["Id"],
+                    "OrganizationUnitId": folder,
+                    "Id": item_id,
+                    "Key": _uuid(rng),
+                    "Reference": reference,
+                    "Priority": priority,
+                    "RetryNumber": retry,
+                    "AncestorId": ancestor,
+                    "SecondsInPreviousAttempts": spent,
+                    "CreationTime": _isoformat(created),
+                    "SpecificContent": content,
+                    "ReviewStatus": "None",
+                    "ProcessingExceptionType": None,
+                    "ProcessingException": None,
+                    "StartProcessing": None,
+                    "EndProcessing": None,
+                    "Output": None,
+                    "Analytics": None,
+                    "Progress": None,
+                    "DueDate": None,
+                    "DeferDate": None,
+                    "RiskSlaDate": None,
+                }
+                # Up to 4 events per attempt: Create, InProgress, result, Retry
+                base = event_id
+                event_id += 4
+                events = [self._event(base + 1, item_id, created, "Create", "New")]
+                started = created + timedelta(seconds=rng.expovariate(1 / wait))
+                if started >= self.end or (created >= recent and rng.random() < 0.7):
+                    item["Status"] = "New"
+                    yield item, events
+                    break
+                if rng.random() < DELETE_RATE:
+                    item["Status"] = "Deleted"
+                    events.append(self._event(base + 2, item_id, started, "Delete", "Deleted"))
+                    yield item, events
+                    break
+                item["StartProcessing"] = _isoformat(started)
+                events.append(self._event(base + 2, item_id, started, "Status", "InProgress"))
+                seconds = rng.lognormvariate(math.log(median), 0.6)
+                ended = started + timedelta(seconds=seconds)
+                if ended >= self.end:
+                    item["Status"] = "InProgress"
+                    yield item, events
+                    break
+                if rng.random() < ABANDON_RATE:
+                    item["Status"] = "Abandoned"
+                    abandoned = min(started + timedelta(hours=24), self.end - timedelta(seconds=1))
+                    events.append(self._event(base + 3, item_id, abandoned, "Status", "Abandoned"))
+                    yield item, events
+                    break
+                outcome = _choice(rng, ITEM_OUTCOMES)
+                item["EndProcessing"] = _isoformat(ended)
+                if outcome == "Successful":
+                    item["Status"] = "Successful"
+                    item["Output"] = {"Result": "OK", "Document": f"{reference}.pdf"}
+                    item["Analytics"] = {"HandlingSeconds": round(seconds, 1)}
+                else:
+                    reasons = BUSINESS_REASONS if outcome == "BusinessException" else APPLICATION_REASONS
+                    item["Status"] = "Failed"
+                    item["ProcessingExceptionType"] = outcome
+                    item["ProcessingException"] = {
+                        "Reason": rng.choice(reasons),
+                        "Details": f"{outcome} while processing {reference}",
+                        "Type": outcome,
+                        "AssociatedImageFilePath": None,
+                        "CreationTime": _isoformat(ended),
+                    }
+                events.append(self._event(base + 3, item_id, ended, "Status", item["Status"]))
+                retry_allowed = queue["AcceptAutomaticallyRetry"] and retry < queue["MaxNumberOfRetires"]
+                if outcome != "ApplicationException" or not retry_allowed:
+                    yield item, events
+                    break
+                # Orchestrator marks the attempt as Retried and clones it
+                item["Status"] = "Retried"
+                events.append(self._event(base + 4, item_id, ended, "Retry", "Retried"))
+                yield item, events
+                ancestor = ancestor or item_id
+                spent += int(seconds)
+                created = ended
+
+    @staticmethod
+    def _event(event_id: int, item_id: int, moment: datetime, action: str, status: str) -> dict:
+        return {
+            "QueueItemId": item_id,
+            "Timestamp": _isoformat(moment),
+            "Action": action,
+            "Status": status,
+            "ReviewStatus": "None",
+            "UserId": None,
+            "UserName": "svc_robot" if action == "Status" else None,
+            "Data": None,
+            "Id": event_id,
+        }
+
+    # ---------- jobs
+
+    def jobs(self, folder: int) -> Iterator[dict]:
+        rng = self._rng("jobs", folder)
+        releases = self.processes(folder)
+        # Few releases run most of the jobs
+        weights = [1 / (rank + 1) for rank in range(len(releases))]
+        medians = [rng.choice((30, 120, 600, 1800)) for _ in releases]
+        hosts = [session["HostMachineName"] for session in self.sessions()]
+        for number, created in enumerate(self._arrivals(rng, self.jobs_per_folder)):
+            index = rng.choices(range(len(releases)), weights)[0]
+            release = releases[index]
+            source, source_type = _choice(rng, JOB_SOURCES)
+            reason = rng.choice(APPLICATION_REASONS)
+            start = created + timedelta(seconds=rng.expovariate(1 / 20))
+            end = start + timedelta(seconds=rng.lognormvariate(math.log(medians[index]), 0.8))
+            started: Optional[datetime] = start
+            ended: Optional[datetime] = end
+            state = _choice(rng, JOB_STATES)
+            if start >= self.end:
+                state, started, ended = "Pending", None, None
+            elif end >= self.end:
+                state, ended = "Running", None
+            yield {
+                "Key": _uuid(rng),
+                "Id": folder * self.job_stride + number + 1,
+                "OrganizationUnitId": folder,
+                "ReleaseName": release["Name"],
+                "CreationTime": _isoformat(created),
+                "StartTime": _isoformat(started) if started else None,
+                "EndTime": _isoformat(ended) if ended else None,
+                "State": state,
+                "JobPriority": release["JobPriority"],
+                "Source": source,
+                "SourceType": source_type,
+                "HostMachineName": rng.choice(hosts) if started else None,
+                "Info": "Job completed" if state == "Successful" else f"Job {state.lower()}: {reason}",
+                "InputArguments": json.dumps({"in_Config": "Data/Config.xlsx"}),
+                "OutputArguments": json.dumps({"out_Processed": rng.randrange(500)}) if state == "Successful" else None,
+                "Reference": "",
+                "StopStrategy": "SoftStop" if state == "Stopped" else None,
+            }
+
+    # ---------- outputs
+
+    def iter_rows(self, entity: str) -> Iterator[tuple[int, dict]]:
+        """(folder, row) pairs of the entity (folder 0 for folders and sessions)"""
+        if entity == "folders":
+            yield from ((0, row) for row in self.folders())
+            return
+        if entity == "sessions":
+            yield from ((0, row) for row in self.sessions())
+            return
+        for folder in range(1, self.folder_count + 1):
+            if entity == "processes":
+                yield from ((folder, row) for row in self.processes(folder))
+            elif entity == "queuedefinitions":
+                yield from ((folder, row) for row in self.queuedefinitions(folder))
+            elif entity == "jobs":
+                yield from ((folder, row) for row in self.jobs(folder))
+            elif entity == "queueitems":
+                yield from ((folder, item) for item, _ in self.queue_history(folder))
+            elif entity == "queueitemevents":
+                yield from ((folder, event) for _, events in self.queue_history(folder) for event in events)
+            else:
+                raise ValueError(f"Unknown entity {entity}")
+
+    def to_dataset(self) -> dict[str, dict[int, list[dict]]]:
+        """Whole dataset in memory (entity -> folder -> rows), for the fake Orchestrator"""
+        dataset: dict[str, dict[int, list[dict]]] = {}
+        for entity in ENTITIES:
+            folders: dict[int, list[dict]] = dataset.setdefault(entity, {})
+            for folder, row in self.iter_rows(entity):
+                folders.setdefault(folder, []).append(row)
+        return dataset
+
+    def write_pages(self, directory: Path, page_size: int = 1000) -> dict[str, dict[int, int]]:
+        """Writes OData pages as the API would return them: <Entity>/<folder>/<skip>.json, plus an index.json
+        with the row count per entity and folder
+
+        Returns:
+            dict[str, dict[int, int]]: Entity -> folder -> rows
+        """
+        counts: dict[str, dict[int, int]] = {}
+        for entity, path in ENTITY_PATHS.items():
+            folder_counts = counts.setdefault(entity, {})
+            page: list[dict] = []
+            current = 0
+            for folder, row in self.iter_rows(entity):
+                if page and (folder != current or len(page) >= page_size):
+                    _write_page(directory, path, current, folder_counts[current] - len(page), page)
+                    page = []
+                current = folder
+                page.append(row)
+                folder_counts[folder] = folder_counts.get(folder, 0) + 1
+            if page:
+                _write_page(directory, path, current, folder_counts[current] - len(page), page)
+        (directory / "index.json").write_text(json.dumps(counts, indent=2))
+        return counts
+
+
+def _write_page(directory: Path, path: str, folder: int, skip: int, rows: list[dict]) -> None:
+    target = directory / path / str(folder)
+    target.mkdir(parents=True, exist_ok=True)
+    body = {"@odata.context": f"$metadata#{path}", "value": rows}
+    (target / f"{skip:09d}.json").write_text(json.dumps(body))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folders", type=int, default=3)
+    parser.add_argument("--queue-items", type=int, default=10_000, help="Transactions per folder")
+    parser.add_argument("--jobs", type=int, default=2_000, help="Jobs per folder")
+    parser.add_argument("--days", type=int, default=30, help="Time window of the data")
+    parser.add_argument("--seed", type=int, default=1)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--pages", type=Path, help="Write Orchestrator JSON pages to this directory")
+    output.add_argument("--load", action="store_true", help="Bulk load into the configured database")
+    output.add_argument("--sample", action="store_true", help="Print a few rows of every entity")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    generator = SyntheticDataset(
+        folders=args.folders, queue_items=args.queue_items, jobs=args.jobs, days=args.days, seed=args.seed
+    )
+    if args.sample:
+        for entity in ENTITIES:
+            for _, row in islice(generator.iter_rows(entity), 2):
+                print(entity, json.dumps(row, default=str))
+        return 0
+    if args.pages:
+        counts = generator.write_pages(args.pages, page_size=args.page_size)
+        totals = {entity: sum(folders.values()) for entity, folders in counts.items()}
+    else:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        # App imports here: the settings are read from the environment at import time
+        from app.db.session import engine
+        from app.tests.benchmarks.seed import load_rows
+
+        totals = {
+            entity: load_rows(engine, entity, (row for _, row in generator.iter_rows(entity))) for entity in ENTITIES
+        }
+    print(", ".join(f"{entity}={rows}" for entity, rows in totals.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+from app.tests.benchmarks.api_load import Samples, check_thresholds, summarize
+
+
+def test_summary_and_thresholds() -> None:
+    samples = {
+        "uipath/jobs": Samples(latencies=[float(ms) for ms in range(1, 101)], errors=2),
+        "login/oauth": Samples(latencies=[900.0, 1100.0]),
+    }
+    summary = summarize(samples, seconds=10)
+    assert summary["uipath/jobs"]["p95"] == 95
+    assert summary["uipath/jobs"]["error_rate"] == 0.02
+    assert summary["total"]["requests"] == 102
+    assert summary["total"]["rps"] == 10.2
+
+    thresholds: dict[str, dict[str, float]] = {
+        "default": {"p95_ms": 90, "error_rate": 0.05},
+        "login/oauth": {"p95_ms": 2000},
+        "total": {"min_rps": 20},
+    }
+    violations = check_thresholds(summary, thresholds)
+    assert violations == ["uipath/jobs: p95_ms 95.0 > 90", "total: 10.2 req/s < 20"]
@@ -0,0 +1,39 @@
+import json
+from urllib.request import Request, urlopen
+
+from app.tests.benchmarks.fake_orchestrator import FakeOrchestrator
+from app.tests.benchmarks.ingestion import compare, simple_dataset
+
+
+def _get(url: str, folder: int = 0) -> tuple[int, dict]:
+    request = Request(url, headers={"X-UIPATH-OrganizationUnitId": str(folder)})
+    try:
+        with urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except Exception as e:  # HTTPError
+        return e.code, {}  # type: ignore
+
+
+def test_fake_orchestrator_pages_and_counts() -> None:
+    dataset = simple_dataset(folders=2, rows=25)
+    with FakeOrchestrator(dataset, throttle_every=4) as orchestrator:
+        status, body = _get(f"{orchestrator.url}/odata/Jobs?$select=Id&$count=true&$top=10&$skip=20", folder=2)
+        assert status == 200
+        assert body["@odata.count"] == 25
+        assert [row["Id"] for row in body["value"]] == [2 * 10**7 + i for i in range(20, 25)]
+        assert set(body["value"][0]) == {"Id"}
+        status, body = _get(f"{orchestrator.url}/odata/Folders")
+        assert len(body["value"]) == 2
+        _get(f"{orchestrator.url}/odata/Jobs", folder=1)
+        status, _ = _get(f"{orchestrator.url}/odata/Jobs", folder=1)
+        assert status == 429
+        assert orchestrator.api_calls("jobs") == 3
+        assert orchestrator.api_calls() == 4
+
+
+def test_compare_flags_regressions() -> None:
+    baseline = {"jobs": {"rows_per_s": 1000, "api_calls": 10, "db_statements": 100, "peak_rss_mb": 200}}
+    ok = {"jobs": {"rows_per_s": 900, "api_calls": 10, "db_statements": 110, "peak_rss_mb": 210}}
+    assert compare(ok, baseline, tolerance=0.2) == []
+    slow = {"jobs": {"rows_per_s": 500, "api_calls": 20, "db_statements": 100, "peak_rss_mb": 200}}
+    assert len(compare(slow, baseline, tolerance=0.2)) == 2
@@ -0,0 +1,27 @@
+from collections import Counter
+
+from app.tests.benchmarks.synthetic import SyntheticDataset
+
+
+def test_synthetic_dataset_is_reproducible_and_consistent() -> None:
+    dataset = SyntheticDataset(folders=2, queue_items=3000, jobs=500, seed=7).to_dataset()
+    assert dataset == SyntheticDataset(folders=2, queue_items=3000, jobs=500, seed=7).to_dataset()
+
+    items = {item["Id"]: item for rows in dataset["queueitems"].values() for item in rows}
+    statuses = Counter(item["Status"] for item in items.values())
+    assert statuses["Successful"] > len(items) * 0.7
+    assert statuses["Failed"] and statuses["Retried"]
+    for item in items.values():
+        if item["AncestorId"] is not None:
+            # Retries point to the first attempt of the same transaction
+            ancestor = items[item["AncestorId"]]
+            assert ancestor["Status"] == "Retried" and ancestor["Reference"] == item["Reference"]
+            assert item["RetryNumber"] > 0
+        if item["Status"] == "Failed":
+            assert item["ProcessingException"]["Type"] == item["ProcessingExceptionType"]
+
+    events = [event for rows in dataset["queueitemevents"].values() for event in rows]
+    assert len({event["Id"] for event in events}) == len(events)
+    last_status = {event["QueueItemId"]: event["Status"] for event in sorted(events, key=lambda event: event["Id"])}
+    assert last_status == {item_id: item["Status"] for item_id, item in items.items()}
+    assert [folder["Id"] for folder in dataset["folders"][0]] == [1, 2]
@@ -0,0 +1,175 @@
+"""Ingestion write path benchmark: cost per row of upserting queue items, per write strategy.
+
+Strategies (the same synthetic queue items, written several rounds: the first one inserts, the rest update):
+    - merge_nullpool: the old path, a merge + commit per row on a NullPool engine (a new connection per row)
+    - bulk_nullpool: one executemany INSERT ... ON CONFLICT per batch, still a new connection per batch
+    - bulk_pooled_nocache: same on pooled connections, with the asyncpg statement cache disabled
+    - bulk_pooled: same with the statement cache (ASYNCPG_STATEMENT_CACHE_SIZE), the default ingestion setup
+It reports the microseconds per row of each round and of the warm rounds (all but the first), on a disposable
+database created on the configured Postgres server.
+
+Usage (from the backend root, with the usual .env):
+    python -m app.tests.benchmarks.upsert --rows 20000 --rounds 3
+    python -m app.tests.benchmarks.upsert --rows 5000 --batch-size 1000 --output upsert.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from app.tests.benchmarks.ingestion import disposable_database
+from app.tests.benchmarks.synthetic import SyntheticDataset
+
+STRATEGIES = ("merge_nullpool", "bulk_nullpool", "bulk_pooled_nocache", "bulk_pooled")
+
+# Loaded straight into the DB before the run (the queue items reference them)
+PARENT_ENTITIES = ("folders", "processes", "queuedefinitions")
+
+
+def _to_schema(schema: Any, row: dict) -> Any:
+    # The worker builds the schemas from the API client models, which have already parsed the datetimes
+    values = dict(row)
+    for name, field in schema.model_fields.items():
+        if field.annotation is datetime and isinstance(values.get(name), str):
+            values[name] = datetime.fromisoformat(values[name].replace("Z", "+00:00"))
+    return schema(**values)
+
+
+def _make_engine(url: str, strategy: str, pool_size: int, cache_size: int) -> Any:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    if strategy.endswith("nullpool"):
+        return create_async_engine(url, poolclass=NullPool)
+    cache = 0 if strategy == "bulk_pooled_nocache" else cache_size
+    return create_async_engine(
+        url, pool_size=pool_size, max_overflow=0, connect_args={"prepared_statement_cache_size": cache}
+    )
+
+
+async def _write_round(
+    factory: Callable[[], Any], strategy: str, rows: list, batch_size: int, concurrency: int
+) -> None:
+    from app import crud
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def merge(row: Any) -> None:
+        async with limit, factory() as db:
+            await crud.uip_queue_item.upsert_async(db=db, obj_in=row)
+
+    async def bulk(batch: list) -> None:
+        async with limit, factory() as db, db.begin():
+            await crud.uip_queue_item.upsert_many_async(db=db, objs_in=batch)
+
+    if strategy == "merge_nullpool":
+        await asyncio.gather(*(merge(row) for row in rows))
+    else:
+        await asyncio.gather(*(bulk(rows[index : index + batch_size]) for index in range(0, len(rows), batch_size)))
+
+
+async def run_strategy(
+    url: str, strategy: str, rows: list, rounds: int, batch_size: int, pool_size: int, cache_size: int
+) -> list[float]:
+    """Writes the rows `rounds` times with the strategy. Returns the microseconds per row of each round"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import sessionmaker
+
+    engine = _make_engine(url, strategy, pool_size, cache_size)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    timings = []
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await _write_round(factory, strategy, rows, batch_size, concurrency=pool_size)
+            timings.append(round((time.perf_counter() - start) / len(rows) * 1_000_000, 1))
+    finally:
+        await engine.dispose()
+    return timings
+
+
+def run_benchmark(rows: int, rounds: int, batch_size: int, cache_size: int, strategies: list[str]) -> dict[str, dict]:
+    """Runs every strategy on its own copy of the table. The environment must already point to the database"""
+    # App imports here: the settings are read from the environment at import time
+    from sqlalchemy import text
+
+    from app import crud, schemas
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.tests.benchmarks.seed import load_rows
+
+    Base.metadata.create_all(bind=engine)
+    generator = SyntheticDataset(folders=1, queue_items=rows, jobs=0)
+    for entity in PARENT_ENTITIES:
+        load_rows(engine, entity, (row for _, row in generator.iter_rows(entity)))
+    items = [_to_schema(schemas.QueueItemGETResponseExtended, row) for _, row in generator.iter_rows("queueitems")]
+
+    results = {}
+    for strategy in strategies:
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {crud.uip_queue_item.model.__tablename__} CASCADE"))
+        timings = asyncio.run(
+            run_strategy(
+                settings.SQLALCHEMY_DATABASE_URI_ASYNC,  # type: ignore
+                strategy,
+                items,
+                rounds=rounds,
+                batch_size=batch_size,
+                pool_size=settings.MAX_DB_CONNECTIONS,
+                cache_size=cache_size,
+            )
+        )
+        warm = timings[1:] or timings
+        results[strategy] = {
+            "rows": len(items),
+            "us_per_row": timings,
+            "warm_us_per_row": round(sum(warm) / len(warm), 1),
+        }
+    return results
+
+
+def print_report(results: dict[str, dict]) -> None:
+    baseline = results.get("merge_nullpool", {}).get("warm_us_per_row")
+    print(f"{'strategy':<22}{'rows':>10}{'warm us/row':>14}{'speedup':>10}   rounds (us/row)")
+    for strategy, metrics in results.items():
+        speedup = f"{baseline / metrics['warm_us_per_row']:.1f}x" if baseline and metrics["warm_us_per_row"] else "-"
+        print(
+            f"{strategy:<22}{metrics['rows']:>10}{metrics['warm_us_per_row']:>14}{speedup:>10}   "
+            + ", ".join(str(timing) for timing in metrics["us_per_row"])
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="Queue items (retries add some more)")
+    parser.add_argument("--rounds", type=int, default=3, help="Writes of the same rows (the first one inserts)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per executemany")
+    parser.add_argument("--cache-size", type=int, default=500, help="asyncpg prepared statement cache of bulk_pooled")
+    parser.add_argument("--strategy", action="append", choices=STRATEGIES, help="Only these strategies")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    with disposable_database() as database:
+        os.environ.update({"POSTGRES_DB": database, "SLOW_QUERY_LOG_ENABLED": "False", "TRACING_ENABLED": "False"})
+        results: dict[str, Any] = run_benchmark(
+            args.rows, args.rounds, args.batch_size, args.cache_size, args.strategy or list(STRATEGIES)
+        )
+
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+from app.core.celery_app import BULK_QUEUE, CRITICAL_QUEUE, REALTIME_QUEUE, celery_app
+from app.worker.uipath import fetchjobs, polljobs
+
+
+def test_task_routes() -> None:
+    router = celery_app.amqp.router
+    assert router.route({}, polljobs.name, (), {})["queue"].name == CRITICAL_QUEUE
+    assert router.route({}, fetchjobs.name, (), {})["queue"].name == REALTIME_QUEUE
+    # Backfills are sent to the bulk queue explicitly (see app.api.api_v1.datafetch)
+    assert router.route({"queue": BULK_QUEUE}, fetchjobs.name, (), {})["queue"].name == BULK_QUEUE
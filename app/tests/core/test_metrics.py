@@ -0,0 +1,30 @@
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_and_gauge_exposition() -> None:
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("calls_total", "Calls", ["endpoint", "status"]))
+    gauge = registry.register(Gauge("in_use", "In use", ["pool"]))
+    counter.inc(endpoint="jobs_get", status="2xx")
+    counter.inc(2, endpoint="jobs_get", status="2xx")
+    counter.inc(endpoint='we"ird', status="401")
+    gauge.set_function(lambda: 3, pool="sync")
+    text = registry.render()
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{endpoint="jobs_get",status="2xx"} 3' in text
+    assert 'calls_total{endpoint="we\\"ird",status="401"} 1' in text
+    assert 'in_use{pool="sync"} 3' in text
+    assert text.endswith("\n")
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+    text = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 5.55' in text
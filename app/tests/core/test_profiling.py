@@ -0,0 +1,40 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from app.core import profiling
+from app.core.config import settings
+
+
+def busy_loop(seconds: float) -> int:
+    total = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+def test_profile_is_written_listed_and_capped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_MS", 1)
+    # Any sampling is over this overhead, so the interval keeps doubling
+    monkeypatch.setattr(settings, "PROFILING_MAX_OVERHEAD", 0.0)
+
+    profiler = profiling.start_profile("task", "app.worker.uipath.fetchjobs")
+    assert profiler is not None
+    # Only one profile at a time per process
+    assert profiling.start_profile("request", "GET /api/v1/uipath/jobs") is None
+    busy_loop(0.3)
+    path = profiling.finish_profile(profiler, state="SUCCESS")
+
+    assert path is not None and "busy_loop" in path.read_text()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in path.read_text().splitlines())
+    assert profiler.interval > 0.001
+    listed = profiling.list_profiles()
+    assert [profile["id"] for profile in listed] == [profiler.id]
+    assert listed[0]["state"] == "SUCCESS"
+    assert profiling.profile_path(profiler.id) == path
+    assert profiling.profile_path("../secrets") is None
+    assert json.loads(path.with_suffix(".json").read_text())["name"] == "app.worker.uipath.fetchjobs"
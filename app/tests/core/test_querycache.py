@@ -0,0 +1,66 @@
+import pytest
+
+from app.core.querycache import InMemoryLRUBackend, QueryCache, RedisBackend, normalize_filter, normalize_query
+
+
+def test_normalize_query_equivalent_urls() -> None:
+    a = normalize_query(filter="State  eq 'Faulted'", select="Id, State", top=100, skip=0)
+    b = normalize_query(filter="State eq 'Faulted'", select="State,Id", top=100, skip=0)
+    assert a == b
+    assert a != normalize_query(filter="State eq 'Faulted'", select="State,Id", top=100, skip=100)
+
+
+def test_normalize_filter_keeps_string_literals() -> None:
+    assert normalize_filter("  Name eq  'a  b'   and Id  gt 1 ") == "Name eq 'a  b' and Id gt 1"
+    assert normalize_filter("Name eq 'it''s  here'") == "Name eq 'it''s  here'"
+
+
+def test_query_cache_hit_and_invalidation() -> None:
+    cache = QueryCache(backend=InMemoryLRUBackend(max_entries=10), ttl=60)
+    query = normalize_query(filter="Id ne 0")
+    value, key = cache.get("uipath_jobs", "2024-01-01T00:00:00", query)
+    assert value is None
+    cache.set(key, "[]")
+    value, _ = cache.get("uipath_jobs", "2024-01-01T00:00:00", query)
+    assert value == "[]"
+    # The workers wrote the entity: new version token
+    value, _ = cache.get("uipath_jobs", "2024-01-01T00:00:05", query)
+    assert value is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_lru_eviction() -> None:
+    backend = InMemoryLRUBackend(max_entries=2)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    backend.get("a")
+    backend.set("c", "3", ttl=60)
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+
+
+def test_backend_is_built_on_first_use() -> None:
+    built = []
+
+    def factory() -> InMemoryLRUBackend:
+        built.append(True)
+        return InMemoryLRUBackend(max_entries=10)
+
+    cache = QueryCache(ttl=60, backend_factory=factory)
+    assert not built
+    assert cache.stats()["backend"] is None
+    cache.get("uipath_jobs", "never", normalize_query())
+    cache.get("uipath_jobs", "never", normalize_query())
+    assert len(built) == 1
+    assert cache.stats()["backend"] == "InMemoryLRUBackend"
+
+
+def test_misconfigured_backend_fails_on_use() -> None:
+    def factory() -> RedisBackend:
+        raise RuntimeError("QUERY_CACHE_BACKEND is 'redis' but QUERY_CACHE_REDIS_URL is not set")
+
+    cache = QueryCache(ttl=60, backend_factory=factory)
+    with pytest.raises(RuntimeError, match="QUERY_CACHE_REDIS_URL"):
+        cache.get("uipath_jobs", "never", normalize_query())
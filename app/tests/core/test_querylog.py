@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db.querylog import instrument_queries, normalize_sql, query_stats, redact_plan
+
+
+def test_normalize_sql_redacts_and_collapses() -> None:
+    sql = normalize_sql(
+        "INSERT INTO t (a, b) VALUES (%(a_m0)s, %(b_m0)s), (%(a_m1)s, %(b_m1)s)\n  WHERE  name = 'secret'"
+    )
+    assert sql == "INSERT INTO t (a, b) VALUES (...), ... WHERE name = '?'"
+    assert normalize_sql("SELECT * FROM t WHERE id IN ($1, $2, $3)") == "SELECT * FROM t WHERE id IN (...)"
+
+
+def test_plan_is_redacted() -> None:
+    plan = redact_plan(
+        "Hash Join  (cost=1.51..2.82 rows=1 width=117) (actual time=0.046..0.048 rows=0 loops=1)\n"
+        '  Hash Cond: (g."Id" = (f."Id" + 1))\n'
+        "  ->  Seq Scan on uipath_folders f  (cost=0.00..1.50 rows=1 width=117)\n"
+        '        Filter: (("Id" > 42) AND ("Id" = ANY (\'{1,2}\'::integer[])) AND '
+        "((\"DisplayName\")::text = 'it''s secret'::text) AND (\"Price\" < -1.5))\n"
+        "        Rows Removed by Filter: 20\n"
+        "        Buffers: shared hit=1"
+    )
+    assert plan.splitlines() == [
+        "Hash Join  (cost=1.51..2.82 rows=1 width=117) (actual time=0.046..0.048 rows=0 loops=1)",
+        '  Hash Cond: (g."Id" = (f."Id" + ?))',
+        "  ->  Seq Scan on uipath_folders f  (cost=0.00..1.50 rows=1 width=117)",
+        '        Filter: (("Id" > ?) AND ("Id" = ANY (\'?\'::integer[])) AND '
+        '(("DisplayName")::text = \'?\'::text) AND ("Price" < ?))',
+        "        Rows Removed by Filter: 20",
+        "        Buffers: shared hit=1",
+    ]
+
+
+def test_statements_are_aggregated_and_slow_ones_counted(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    query_stats.reset()
+    engine = create_engine("sqlite://")
+    instrument_queries(engine, "test")
+    with engine.connect() as conn:
+        for value in range(3):
+            conn.execute(text("SELECT :value"), {"value": value})
+        try:
+            conn.execute(text("SELECT * FROM missing"))
+        except Exception:
+            pass
+        assert not conn.info["query_started"]
+    stats = [row for row in query_stats.top() if row["engine"] == "test" and row["sql"] == "SELECT ?"]
+    assert stats[0]["calls"] == 3 and stats[0]["slow_calls"] == 3
@@ -0,0 +1,35 @@
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.db.session import ReplicaRouter
+
+
+def test_reads_go_to_the_primary_when_the_replica_lags_or_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    router = ReplicaRouter(create_engine("sqlite://"), max_lag=10, check_interval=0)
+    lags: Iterator[float | Exception] = iter([1.0, 30.0, RuntimeError("down"), 2.0])
+
+    def measure_lag() -> float:
+        lag = next(lags)
+        if isinstance(lag, Exception):
+            raise lag
+        return lag
+
+    monkeypatch.setattr(router, "measure_lag", measure_lag)
+    assert [router.replica_usable() for _ in range(4)] == [True, False, False, True]
+    assert router.lag == 2.0
+
+
+def test_lag_is_checked_once_per_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    router = ReplicaRouter(create_engine("sqlite://"), max_lag=10, check_interval=3600)
+    calls: list[int] = []
+
+    def measure_lag() -> float:
+        calls.append(1)
+        return 0.0
+
+    monkeypatch.setattr(router, "measure_lag", measure_lag)
+    assert all(router.replica_usable() for _ in range(5))
+    assert len(calls) == 1
+    assert not ReplicaRouter(None, max_lag=10, check_interval=0).replica_usable()
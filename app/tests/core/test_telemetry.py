@@ -0,0 +1,27 @@
+from app.core.telemetry import current_report, percentiles, record_api_call, record_db_write
+from app.schemas.tracking import SyncReport
+
+
+def test_percentiles_nearest_rank() -> None:
+    assert percentiles([]) == {}
+    samples = list(range(1, 101))
+    assert percentiles(reversed(samples)) == {"p50": 50, "p95": 95, "p99": 99}
+    assert percentiles([7.0]) == {"p50": 7.0, "p95": 7.0, "p99": 7.0}
+
+
+def test_records_into_current_report_only() -> None:
+    record_api_call(1.0, folder=1)  # No current report: ignored
+    report = SyncReport(entity="jobs")
+    token = current_report.set(report)
+    try:
+        record_api_call(0.2, folder=1)
+        record_api_call(0.1, folder=1, page=False)
+        record_api_call(0.3, folder=2)
+        record_db_write(0.5)
+    finally:
+        current_report.reset(token)
+    assert report.api_calls == 3
+    assert report._latencies == [200.0, 100.0, 300.0]
+    assert report.folders[1].pages == 1
+    assert report.folders[2].pages == 1
+    assert report.db_write_seconds == 0.5
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app import crud, schemas
+from app.core.config import settings
+from app.tests.utils.orchestrator import (
+    CREATED,
+    FOLDER_ID,
+    OTHER_FOLDER_ID,
+    create_folder,
+    create_queue,
+    queue_item,
+    stable_key,
+)
+
+
+async def _upsert_many_async(objs_in: list[Any]) -> set[Any]:
+    # An engine of its own: the shared async one is bound to the loop that first used it
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI_ASYNC, poolclass=NullPool)  # type: ignore
+    try:
+        async with AsyncSession(engine) as db, db.begin():
+            return await crud.uip_queue_item.upsert_many_async(db=db, objs_in=objs_in)
+    finally:
+        await engine.dispose()
+
+
+def test_upsert_many_skips_unchanged_rows(db: Session) -> None:
+    create_queue(db)
+    items = [queue_item(910001, SpecificContent={"Invoice": "A-1", "Lines": [1, 2]}), queue_item(910002)]
+    crud.uip_queue_item.upsert_many(db=db, objs_in=items)
+    db.commit()
+    assert crud.uip_queue_item.upsert_many(db=db, objs_in=items) == set()
+    # json compares through its jsonb cast: the same content with its keys in another order is unchanged
+    reordered = queue_item(910001, SpecificContent={"Lines": [1, 2], "Invoice": "A-1"})
+    changed = queue_item(910002, Status="InProgress")
+    assert crud.uip_queue_item.upsert_many(db=db, objs_in=[reordered, changed]) == {910002}
+    db.commit()
+    db.expire_all()
+    assert crud.uip_queue_item.get(db=db, id=910002).Status == "InProgress"  # type: ignore[union-attr]
+
+
+def test_upsert_many_async_skips_unchanged_rows(db: Session) -> None:
+    create_queue(db)
+    items = [queue_item(910003, SpecificContent={"Invoice": "A-3"}), queue_item(910004, SpecificContent=None)]
+    asyncio.run(_upsert_many_async(items))
+    assert asyncio.run(_upsert_many_async(items)) == set()
+    changed = [queue_item(910003, SpecificContent={"Invoice": "A-3", "Paid": True}), items[1]]
+    assert asyncio.run(_upsert_many_async(changed)) == {910003}
+    db.expire_all()
+    assert crud.uip_queue_item.get(db=db, id=910003).SpecificContent == {"Invoice": "A-3", "Paid": True}  # type: ignore
+
+
+def _process(id: int, folder: int = FOLDER_ID) -> schemas.ProcessCreate:
+    return schemas.ProcessCreate(
+        Id=id,
+        Key=stable_key(id),
+        Name=f"Process {id}",
+        OrganizationUnitId=folder,
+        ProcessKey=f"Process{id}",
+        ProcessVersion="1.0.0",
+    )
+
+
+def _deleted(db: Session, ids: list[int]) -> dict[int, bool]:
+    model = crud.uip_process.model
+    db.expire_all()
+    rows = db.execute(select(model.Id, model.IsDeleted).where(model.Key.in_([stable_key(id) for id in ids])))
+    return {id: deleted for id, deleted in rows}
+
+
+def test_reconcile_deleted_flips_only_the_changed_rows(db: Session) -> None:
+    create_folder(db)
+    create_folder(db, OTHER_FOLDER_ID)
+    ids = [910001, 910002, 910003]
+    for process in (_process(910001), _process(910002), _process(910003, OTHER_FOLDER_ID)):
+        crud.uip_process.upsert(db=db, obj_in=process)
+    # UUID primary key, bound as text and cast to the column type
+    keys = [str(stable_key(id)) for id in ids]
+    crud.uip_process.reconcile_deleted(db=db, seen_ids=keys, folders=[FOLDER_ID, OTHER_FOLDER_ID])
+    assert crud.uip_process.reconcile_deleted(db=db, seen_ids=keys[:1], folders=[FOLDER_ID]) == (1, 0)
+    assert _deleted(db, ids) == {910001: False, 910002: True, 910003: False}
+    # Seen again: restored, and nothing left to flip after that
+    assert crud.uip_process.reconcile_deleted(db=db, seen_ids=keys[:2], folders=[FOLDER_ID]) == (0, 1)
+    assert crud.uip_process.reconcile_deleted(db=db, seen_ids=keys[:2], folders=[FOLDER_ID]) == (0, 0)
+    assert _deleted(db, ids) == {910001: False, 910002: False, 910003: False}
+
+
+def _events(db: Session, *events: tuple[int, int, datetime, str]) -> None:
+    rows = [
+        schemas.QueueItemEventCreate(Id=id, QueueItemId=item, Timestamp=timestamp, Action="Status", Status=status)
+        for id, item, timestamp, status in events
+    ]
+    crud.uip_queue_item_event.upsert_many(db=db, objs_in=rows)
+    db.commit()
+
+
+def test_apply_latest_events(db: Session) -> None:
+    create_queue(db)
+    items = [910011, 910012]
+    model, events = crud.uip_queue_item.model, crud.uip_queue_item_event.model
+    db.execute(delete(events).where(events.QueueItemId.in_(items)))
+    crud.uip_queue_item.upsert_many(db=db, objs_in=[queue_item(id) for id in items])
+    db.commit()
+    started, ended = CREATED + timedelta(minutes=1), CREATED + timedelta(minutes=2)
+    # Two events with the same Timestamp: the one with the highest Id is the latest
+    _events(db, (9100111, 910011, started, "InProgress"), (9100113, 910011, ended, "Successful"))
+    _events(db, (9100112, 910011, ended, "Failed"))
+    _events(db, (9100121, 910012, started, "InProgress"), (9100122, 910012, ended, "Failed"))
+    updated = crud.uip_queue_item.apply_latest_events(db=db, ids=items)
+    assert {row.Id: row.Status for row in updated} == {910011: "Successful", 910012: "Failed"}
+    db.expire_all()
+    item = crud.uip_queue_item.get(db=db, id=910011)
+    assert item is not None and (item.StartProcessing, item.EndProcessing) == (started, ended)
+    # Nothing changed: no rows written or returned
+    assert crud.uip_queue_item.apply_latest_events(db=db, ids=items) == []
+    # Processed again: no longer ended, so EndProcessing is cleared
+    restarted = CREATED + timedelta(minutes=3)
+    _events(db, (9100123, 910012, restarted, "InProgress"))
+    updated = crud.uip_queue_item.apply_latest_events(db=db, ids=items)
+    assert [(row.Id, row.Status) for row in updated] == [(910012, "InProgress")]
+    db.expire_all()
+    item = crud.uip_queue_item.get(db=db, id=910012)
+    assert item is not None and (item.StartProcessing, item.EndProcessing) == (restarted, None)
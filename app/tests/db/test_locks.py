@@ -0,0 +1,50 @@
+import threading
+import time
+
+from app.db.locks import sync_lock, sync_lock_key
+
+
+def test_lock_key_per_request() -> None:
+    assert sync_lock_key("jobs", [2, 1]) == sync_lock_key("jobs", [1, 2, 2])
+    assert sync_lock_key("jobs", [1], filter="State  eq 'Running'") == sync_lock_key("jobs", [1], "State eq 'Running'")
+    assert sync_lock_key("jobs", [1]) != sync_lock_key("jobs", [1], filter="Id in (1, 2)")
+    assert sync_lock_key("jobs", [1]) != sync_lock_key("jobs", [1], synctimes=True)
+    assert sync_lock_key("jobs", [1]) != sync_lock_key("processes", [1])
+
+
+def test_same_request_coalesced_without_waiting() -> None:
+    with sync_lock("locktest", [1], synctimes=True) as acquired:
+        assert acquired
+        start = time.monotonic()
+        with sync_lock("locktest", [1], synctimes=True, wait_seconds=0) as again:
+            assert not again
+        assert time.monotonic() - start < 1
+        # A different request of the same entity and folders is not dropped
+        with sync_lock("locktest", [1], filter="Id in (1, 2)", wait_seconds=0) as filtered:
+            assert filtered
+    with sync_lock("locktest", [1], synctimes=True, wait_seconds=0) as after:
+        assert after
+
+
+def test_waiting_request_runs_after_the_running_one() -> None:
+    released = threading.Event()
+
+    def hold() -> None:
+        with sync_lock("locktest", [2]) as acquired:
+            assert acquired
+            time.sleep(1)
+        released.set()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.3)
+    with sync_lock("locktest", [2], wait_seconds=10) as acquired:
+        assert acquired
+        assert released.wait(timeout=1)
+    holder.join()
+
+
+def test_waiting_request_times_out() -> None:
+    with sync_lock("locktest", [3]):
+        with sync_lock("locktest", [3], wait_seconds=1) as acquired:
+            assert not acquired
@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from app.schedules.adaptive import AdaptiveSchedulePolicy
+
+
+def test_quiet_key_backs_off_until_max() -> None:
+    policy = AdaptiveSchedulePolicy(min_seconds=30, max_seconds=300, busy_rows=10, backoff=2, speedup=0.5)
+    assert policy.observe("jobs", 1, duration=1, base=150, digest="a") == 150
+    assert policy.observe("jobs", 1, duration=1, base=150, digest="a") == 300  # Same rows: nothing changed
+    assert policy.observe("jobs", 0, duration=1, base=150) == 300  # Clamped
+    assert policy.observe("jobs", 1, duration=1, base=150, digest="b") == 300
+
+
+def test_busy_key_speeds_up_but_not_below_duration() -> None:
+    policy = AdaptiveSchedulePolicy(min_seconds=30, max_seconds=300, busy_rows=10, backoff=2, speedup=0.5)
+    assert policy.observe("processes:1", 10, duration=1, base=150, digest="a") == 75
+    assert policy.observe("processes:1", 10, duration=50, base=150, digest="b") == 100
+
+
+def test_due_per_key() -> None:
+    policy = AdaptiveSchedulePolicy(min_seconds=30, max_seconds=300, slack_seconds=0)
+    now = datetime(2024, 1, 1)
+    assert policy.is_due("processes:1", now)
+    policy.mark_dispatched("processes:1", base=60, now=now)
+    assert not policy.is_due("processes:1", now + timedelta(seconds=30))
+    assert policy.is_due("processes:1", now + timedelta(seconds=60))
+    assert policy.is_due("processes:2", now)
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.schedules.jobpolling import chunks, due_by_folder, id_filter, is_due
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+def _job(id: int, folder: int | None, started: datetime, last_polled: datetime | None = None) -> SimpleNamespace:
+    return SimpleNamespace(
+        Id=id, OrganizationUnitId=folder, StartTime=started, CreationTime=started, LastPolledAt=last_polled
+    )
+
+
+def test_poll_interval_grows_with_age_up_to_max() -> None:
+    # 10 minutes old at the last poll: polled again after 1 minute
+    started = NOW - timedelta(minutes=11)
+    assert not is_due(started, NOW - timedelta(minutes=1, seconds=-1), NOW, factor=0.1, max_seconds=3600)
+    assert is_due(started, NOW - timedelta(minutes=1), NOW, factor=0.1, max_seconds=3600)
+    # Stuck for days: capped at the maximum interval
+    started = NOW - timedelta(days=5)
+    assert not is_due(started, NOW - timedelta(minutes=59), NOW, factor=0.1, max_seconds=3600)
+    assert is_due(started, NOW - timedelta(hours=1), NOW, factor=0.1, max_seconds=3600)
+    # Never polled
+    assert is_due(started, None, NOW, factor=0.1, max_seconds=3600)
+
+
+def test_due_jobs_grouped_by_folder() -> None:
+    jobs = [
+        _job(1, 10, NOW - timedelta(minutes=5)),
+        _job(2, 20, NOW - timedelta(minutes=5)),
+        _job(3, 10, NOW - timedelta(days=3), last_polled=NOW - timedelta(minutes=1)),  # Not due
+        _job(4, None, NOW),  # No folder, can't be polled
+    ]
+    assert {folder: [job.Id for job in due] for folder, due in due_by_folder(jobs, NOW).items()} == {10: [1], 20: [2]}
+
+
+def test_chunks_and_filter() -> None:
+    assert [list(chunk) for chunk in chunks([1, 2, 3, 4, 5], 2)] == [[1, 2], [3, 4], [5]]
+    assert id_filter([1, 2]) == "Id in (1, 2)"
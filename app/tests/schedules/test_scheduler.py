@@ -0,0 +1,17 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from app.schedules.scheduler import wait_for_result
+
+
+def test_wait_for_result_polls_off_the_event_loop() -> None:
+    threads = []
+
+    def ready() -> bool:
+        threads.append(threading.get_ident())
+        return True
+
+    result = SimpleNamespace(ready=ready, successful=lambda: True)
+    assert asyncio.run(wait_for_result(result, timeout=5))  # type: ignore[arg-type]
+    assert threads and threading.get_ident() not in threads
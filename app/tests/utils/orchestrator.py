@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+
+# Ids well above the ones the other tests (and a real sync) use
+FOLDER_ID = QUEUE_ID = 910001
+OTHER_FOLDER_ID = 910002
+CREATED = datetime(2024, 1, 1, 8)
+
+
+def stable_key(id: int) -> uuid.UUID:
+    # The same Key on every run: a new one would be a change of the row
+    return uuid.UUID(int=id, version=4)
+
+
+def create_folder(db: Session, id: int = FOLDER_ID) -> None:
+    folder = schemas.FolderCreate(
+        Id=id, Key=stable_key(id), DisplayName=f"Tests {id}", FullyQualifiedName=f"Tests/{id}", FolderType="Standard"
+    )
+    crud.uip_folder.upsert(db=db, obj_in=folder)
+
+
+def create_queue(db: Session, id: int = QUEUE_ID, folder: int = FOLDER_ID) -> None:
+    create_folder(db, folder)
+    queue = schemas.QueueDefinitionCreate(Id=id, Key=stable_key(id), Name=f"Tests {id}", OrganizationUnitId=folder)
+    crud.uip_queue_definitions.upsert(db=db, obj_in=queue)
+
+
+def queue_item(id: int, **values: Any) -> Any:
+    """Full data queue item of the test queue, as the worker writes them (the CRUD is typed with QueueItemCreate)"""
+    fields: dict[str, Any] = {
+        "Id": id,
+        "Key": stable_key(id),
+        "QueueDefinitionId": QUEUE_ID,
+        "OrganizationUnitId": FOLDER_ID,
+        "Status": "New",
+        "Priority": "Normal",
+        "RetryNumber": 0,
+        "CreationTime": CREATED,
+    }
+    return schemas.QueueItemGETResponseExtended(**{**fields, **values})
@@ -0,0 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.db.session import db_pool
+from app.worker.uipath import _bulk_write
+
+
+class FakeCRUD:
+    """Records how many writes run at once. Rows with a negative Id fail like a missing parent row"""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.max_running = 0
+
+    async def upsert_many_async(self, db: Any, *, objs_in: list[Any], upsert: bool = True) -> set[Any]:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if any(obj.Id < 0 for obj in objs_in):
+                raise IntegrityError("INSERT", {}, Exception("violates foreign key constraint"))
+            return {obj.Id for obj in objs_in}
+        finally:
+            self.running -= 1
+
+
+@asynccontextmanager
+async def fake_session() -> AsyncGenerator[None, None]:
+    yield None
+
+
+def test_bulk_write_is_bounded_by_the_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "INGESTION_UPSERT_BATCH_SIZE", 2)
+    monkeypatch.setattr(db_pool, "pool_size", 3)
+    ids = list(range(1, 21)) + [-1, -2] + list(range(21, 41))
+    rows = [SimpleNamespace(Id=id) for id in ids]
+    crud = FakeCRUD()
+    with mock.patch.object(db_pool, "session", fake_session):
+        written = asyncio.run(_bulk_write(rows, crud))  # type: ignore[arg-type]
+    # 21 batches and the row by row retry of the failed one, never more than the pool at once
+    assert written == set(range(1, 41))
+    assert crud.max_running == 3
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.db.locks import sync_lock
+from app.worker.uipath import _run_sync, advancewatermark
+
+FILTER = "CreationTime gt 2024-01-01T00:00:00Z"
+
+
+def _shard_result(coalesced: bool = False) -> dict:
+    return schemas.SyncReport(entity="jobs", filter=FILTER, coalesced=coalesced).model_dump(mode="json")
+
+
+def test_watermark_not_advanced_if_a_shard_did_not_run(db: Session) -> None:
+    start = datetime(2024, 1, 1)
+    crud.tracked_synctimes.update_jobsstarted(db=db, newtime=start)
+    newtime = (start + timedelta(hours=1)).isoformat()
+    advancewatermark([_shard_result(), _shard_result(coalesced=True)], entity="jobs", newtime=newtime)
+    advancewatermark([_shard_result(), None], entity="jobs", newtime=newtime)
+    db.expire_all()
+    assert crud.tracked_synctimes.get_jobsstarted(db=db) == start
+    advancewatermark([_shard_result(), _shard_result()], entity="jobs", newtime=newtime)
+    db.expire_all()
+    assert crud.tracked_synctimes.get_jobsstarted(db=db) == start + timedelta(hours=1)
+
+
+def test_coalesced_shard_raises_in_a_chord() -> None:
+    runner = mock.Mock(return_value=[])
+    shard = SimpleNamespace(request=SimpleNamespace(id="shard", chord={"task": "advancewatermark"}))
+    with sync_lock("jobs", [1], filter=FILTER):
+        report = schemas.SyncReport(entity="jobs", filter=FILTER)
+        assert _run_sync(report, runner, [1])["coalesced"]
+        with mock.patch("app.worker.uipath.current_task", shard):
+            with pytest.raises(RuntimeError):
+                _run_sync(schemas.SyncReport(entity="jobs", filter=FILTER), runner, [1])
+    runner.assert_not_called()
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+import app.worker.uipath as uipath
+from app import crud, schemas
+from app.core.config import settings
+from app.tests.utils.orchestrator import CREATED, FOLDER_ID, create_folder, stable_key
+
+ENDED = datetime(2024, 1, 1, 9)
+
+
+def _running_jobs(db: Session, ids: list[int]) -> None:
+    create_folder(db)
+    for id in ids:
+        job = schemas.JobCreate(
+            Id=id,
+            Key=stable_key(id),
+            ReleaseName="Tests",
+            CreationTime=CREATED,
+            StartTime=CREATED,
+            State="Running",
+            OrganizationUnitId=FOLDER_ID,
+        )
+        crud.uip_job.upsert(db=db, obj_in=job)
+    # Never polled, so they are all due
+    model = crud.uip_job.model
+    db.execute(update(model).where(model.Id.in_(ids)).values(State="Running", EndTime=None, LastPolledAt=None))
+    db.commit()
+
+
+def test_poll_writes_only_the_changed_jobs(db: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "JOBPOLL_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "JOBPOLL_REFETCH_FINISHED", True)
+    ids = [910001, 910002, 910003]
+    _running_jobs(db, ids)
+    polled = [
+        SimpleNamespace(id=910001, state="Running", end_time=None),
+        SimpleNamespace(id=910002, state="Stopping", end_time=None),
+        SimpleNamespace(id=910003, state="Successful", end_time=ENDED),
+    ]
+    calls: list[dict[str, Any]] = []
+
+    async def call_api(func: Any, **kwargs: Any) -> SimpleNamespace:
+        calls.append(kwargs)
+        return SimpleNamespace(value=polled)
+
+    refetched = [SimpleNamespace(Id=910003)]
+    fetch_jobs = mock.AsyncMock(return_value=refetched)
+    report = schemas.SyncReport(entity="jobspolled")
+    monkeypatch.setattr(uipath, "_call_api", call_api)
+    monkeypatch.setattr(uipath, "fetch_jobs_async", fetch_jobs)
+    assert asyncio.run(uipath.poll_jobs_async(folderlist=[FOLDER_ID], report=report)) == refetched
+    # One request per chunk, only Id/State/EndTime of its jobs
+    assert sorted(call["filter"] for call in calls) == ["Id in (910001, 910002)", "Id in (910003)"]
+    assert {call["select"] for call in calls} == {"Id,State,EndTime"}
+    # The finished job is refetched in full, the other change is written in place
+    fetch_jobs.assert_awaited_once_with(folderlist=[FOLDER_ID], filter="Id in (910003)")
+    model = crud.uip_job.model
+    db.expire_all()
+    rows = db.execute(select(model.Id, model.State, model.LastPolledAt).where(model.Id.in_(ids))).all()
+    assert {row.Id: row.State for row in rows} == {910001: "Running", 910002: "Stopping", 910003: "Running"}
+    assert all(row.LastPolledAt is not None for row in rows)
+    stats = report.folders[FOLDER_ID]
+    assert (stats.rows, stats.updated, stats.unchanged) == (3, 2, 1)
@@ -0,0 +1,29 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.tests.utils.orchestrator import FOLDER_ID, OTHER_FOLDER_ID, create_queue, stable_key
+from app.worker.uipath import _reconcile_deleted
+
+
+def _queue(id: int, folder: int) -> schemas.QueueDefinitionCreate:
+    return schemas.QueueDefinitionCreate(Id=id, Key=stable_key(id), Name=f"Tests {id}", OrganizationUnitId=folder)
+
+
+def test_folders_without_rows_are_not_reconciled(db: Session) -> None:
+    queues = [_queue(910001, FOLDER_ID), _queue(910002, OTHER_FOLDER_ID), _queue(910003, FOLDER_ID)]
+    for queue in queues:
+        create_queue(db, queue.Id, queue.OrganizationUnitId)
+    folders = [FOLDER_ID, OTHER_FOLDER_ID]
+    _reconcile_deleted(crud.uip_queue_definitions, queues, folderlist=folders)  # type: ignore[arg-type]
+    # Nothing came back for the other folder: its queue is kept, the missing one of the first folder is deleted
+    report = schemas.SyncReport(entity="queuedefinitions")
+    _reconcile_deleted(crud.uip_queue_definitions, queues[:1], report=report, folderlist=folders)  # type: ignore[arg-type]
+    assert report.deleted == 1
+    model = crud.uip_queue_definitions.model
+    db.expire_all()
+    rows = db.execute(select(model.Id, model.IsDeleted).where(model.Id.in_([910001, 910002, 910003])))
+    assert {id: deleted for id, deleted in rows} == {910001: False, 910002: False, 910003: True}
+    # An empty answer reconciles nothing
+    _reconcile_deleted(crud.uip_queue_definitions, [], report=report, folderlist=folders)
+    assert report.deleted == 1
@@ -1,9 +1,14 @@
 from celery.app import trace
 
 from app.core.celery_app import celery_app
+from app.worker import metrics  # noqa: F401 (task signals and the per-process exporter)
+from app.worker import profiling  # noqa: F401 (opt-in task profiles)
+from app.worker import tracing  # noqa: F401 (task spans)
 from app.worker.uipath import (
     FetchUIPathToken,
     GetUIPathToken,
+    advancewatermark,
+    fanoutsync,
     fetchfolders,
     fetchjobs,
     fetchprocesses,
@@ -11,6 +16,7 @@ from app.worker.uipath import (
     fetchqueueitemevents,
     fetchqueueitems,
     fetchsessions,
+    polljobs,
 )
 
 trace.LOG_SUCCESS = """\
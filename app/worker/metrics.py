@@ -0,0 +1,75 @@
+"""Prometheus exporter of the Celery worker processes.
+
+Every prefork process has its own metrics (see app.core.metrics), so each one serves them on its own port:
+METRICS_WORKER_PORT + the process index (worker-start.sh gives each pool its own base port). Prometheus scrapes
+them as separate targets and sums them up. Besides whatever the tasks record (Orchestrator calls, DB pools,
+rows written), the task signals add the run time of every task and the time it waited in the queue.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from billiard.process import current_process
+from celery.signals import task_postrun, task_prerun, worker_process_init
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY, TASK_DURATION, TASK_QUEUE_LAG
+
+# task id -> start time of the tasks running in this process
+_started: dict[str, float] = {}
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Scrapes every few seconds, don't flood the worker log
+        pass
+
+
+def start_metrics_exporter(port: int) -> ThreadingHTTPServer | None:
+    """Serves /metrics on the port in a daemon thread. Returns None if the port can't be used"""
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not start the worker metrics exporter on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+    logger.info(f"Worker metrics exporter listening on port {port}")
+    return server
+
+
+@worker_process_init.connect
+def start_process_exporter(**kwargs: Any) -> None:
+    if settings.METRICS_ENABLED and settings.METRICS_WORKER_PORT:
+        start_metrics_exporter(settings.METRICS_WORKER_PORT + (getattr(current_process(), "index", None) or 0))
+
+
+@task_prerun.connect
+def observe_task_start(task_id: Any = None, task: Any = None, **kwargs: Any) -> None:
+    now = time.time()
+    _started[task_id] = time.perf_counter()  # type: ignore
+    request = task.request  # type: ignore
+    sent_at = getattr(request, "sent_at", None) or (getattr(request, "headers", None) or {}).get("sent_at")
+    if sent_at:
+        queue = (request.delivery_info or {}).get("routing_key") or "unknown"
+        TASK_QUEUE_LAG.observe(max(now - float(sent_at), 0), queue=queue)
+
+
+@task_postrun.connect
+def observe_task_end(task_id: Any = None, task: Any = None, state: Any = None, **kwargs: Any) -> None:
+    start = _started.pop(task_id, None)  # type: ignore
+    if start is not None:
+        TASK_DURATION.observe(time.perf_counter() - start, task=task.name, state=state or "UNKNOWN")  # type: ignore
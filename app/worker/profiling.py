@@ -0,0 +1,31 @@
+"""Opt-in profiles of the Celery tasks (see app.core.profiling).
+
+A task is profiled if it's in PROFILING_TASKS or it was published while handling a profiled request (the
+"profile" header, stamped by app.core.celery_app). The profile covers the task and everything it runs in the
+async runtime and the executor threads.
+"""
+
+from typing import Any
+
+from celery.signals import task_postrun, task_prerun
+
+from app.core.profiling import SamplingProfiler, finish_profile, should_profile_task, start_profile
+
+# task id -> profiler of the task running in this process
+_profilers: dict[str, SamplingProfiler] = {}
+
+
+@task_prerun.connect
+def start_task_profile(task_id: Any = None, task: Any = None, **kwargs: Any) -> None:
+    request = task.request  # type: ignore
+    requested = bool(getattr(request, "profile", None) or (getattr(request, "headers", None) or {}).get("profile"))
+    if not should_profile_task(task.name, requested=requested):  # type: ignore
+        return
+    profiler = start_profile("task", task.name)  # type: ignore
+    if profiler is not None:
+        _profilers[task_id] = profiler  # type: ignore
+
+
+@task_postrun.connect
+def finish_task_profile(task_id: Any = None, state: Any = None, **kwargs: Any) -> None:
+    finish_profile(_profilers.pop(task_id, None), task_id=task_id, state=state)  # type: ignore
@@ -0,0 +1,94 @@
+"""Async runtime for the Celery worker processes.
+
+Instead of creating and tearing down an event loop in every task (asyncio.run), each worker process keeps one
+long-lived loop running in a background thread, and the task wrappers submit their coroutines to it.
+Everything that is bound to a loop (the async DB engine and the ConnectionPool sessions and lock) always sees
+the same one, and the per-task startup cost is gone. The executor and the API clients (with their HTTP
+connection pools) are module level, so they are reused as well.
+
+The loop is started on worker_process_init (after the fork), and lazily on first use anywhere else.
+Coroutines run in a copy of the caller's context, so context variables set by the task (i.e. the current
+SyncReport, see app.core.telemetry) are seen by everything the coroutine runs.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from typing import Any, Coroutine
+
+from celery.signals import worker_process_init, worker_process_shutdown
+from loguru import logger
+
+from app.db.session import async_engine, db_pool
+
+
+class AsyncRuntime:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread: threading.Thread | None = None
+        self.pid: int | None = None
+
+    def is_running(self) -> bool:
+        # A loop inherited through fork has no thread behind it
+        return self.loop is not None and self.pid == os.getpid() and self.thread is not None and self.thread.is_alive()
+
+    def start(self) -> None:
+        with self.lock:
+            if self.is_running():
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, args=(loop,), name="async-runtime", daemon=True)
+            thread.start()
+            self.loop, self.thread, self.pid = loop, thread, os.getpid()
+            logger.info(f"Async runtime started (pid {self.pid})")
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def run(self, coro: Coroutine) -> Any:
+        """Runs the coroutine in the process loop and waits for its result (from sync code, like asyncio.run)"""
+        self.start()
+        context = contextvars.copy_context()
+        return asyncio.run_coroutine_threadsafe(self._in_context(coro, context), self.loop).result()  # type: ignore
+
+    @staticmethod
+    async def _in_context(coro: Coroutine, context: contextvars.Context) -> Any:
+        # The loop thread has its own context, run the coroutine as a task in the caller's one instead
+        return await asyncio.get_running_loop().create_task(coro, context=context)
+
+    async def _cleanup(self) -> None:
+        await db_pool.close_all_sessions()
+        await db_pool.dispose_engine()
+        await async_engine.dispose()
+
+    def stop(self, timeout: float = 30) -> None:
+        with self.lock:
+            if not self.is_running():
+                return
+            loop, thread = self.loop, self.thread
+            try:
+                asyncio.run_coroutine_threadsafe(self._cleanup(), loop).result(timeout=timeout)  # type: ignore
+            except Exception as e:
+                logger.warning(f"Error closing the async DB resources: {e}")
+            loop.call_soon_threadsafe(loop.stop)  # type: ignore
+            thread.join(timeout=timeout)  # type: ignore
+            loop.close()  # type: ignore
+            self.loop, self.thread, self.pid = None, None, None
+            logger.info("Async runtime stopped")
+
+
+async_runtime = AsyncRuntime()
+
+
+@worker_process_init.connect
+def start_async_runtime(**kwargs: Any) -> None:
+    async_runtime.start()
+
+
+@worker_process_shutdown.connect
+def stop_async_runtime(**kwargs: Any) -> None:
+    async_runtime.stop()
@@ -0,0 +1,45 @@
+"""Task spans of the Celery workers (see app.core.tracing).
+
+Each task runs in a span that continues the trace of whoever published it (the context travels in the message
+headers). The span is current while the task runs, so the Orchestrator call, parsing and DB spans of the sync
+hang from it, including the ones in the async runtime (it runs coroutines in the caller's context).
+"""
+
+from typing import Any
+
+from celery.signals import task_postrun, task_prerun, worker_process_init
+
+from app.core.tracing import end_span, setup_tracing, start_span
+
+# task id -> span handle of the tasks running in this process
+_spans: dict[str, object] = {}
+
+TRACE_HEADERS = ("traceparent", "tracestate", "baggage")
+
+
+@worker_process_init.connect
+def setup_process_tracing(**kwargs: Any) -> None:
+    setup_tracing("worker")
+
+
+@task_prerun.connect
+def start_task_span(task_id: Any = None, task: Any = None, **kwargs: Any) -> None:
+    request = task.request  # type: ignore
+    # Custom headers end up as request attributes (or in request.headers, depending on the protocol)
+    carrier = dict(getattr(request, "headers", None) or {})
+    for header in TRACE_HEADERS:
+        value = getattr(request, header, None)
+        if value:
+            carrier[header] = value
+    handle = start_span(
+        f"celery.task {task.name}",  # type: ignore
+        carrier=carrier,
+        **{"celery.task_id": task_id, "celery.queue": (request.delivery_info or {}).get("routing_key")},
+    )
+    if handle is not None:
+        _spans[task_id] = handle  # type: ignore
+
+
+@task_postrun.connect
+def end_task_span(task_id: Any = None, state: Any = None, **kwargs: Any) -> None:
+    end_span(_spans.pop(task_id, None), **{"celery.state": state})  # type: ignore
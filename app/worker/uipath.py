@@ -4,12 +4,19 @@ Note that the functions can also be used directly and they return the results fr
 # Standard Library Imports
 
 import asyncio
+import contextvars
 import functools
+import hashlib
+import time
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Callable, Sequence
 
+from celery import Task, chord, current_task, group
 from loguru import logger
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # External Dependencies
@@ -20,10 +27,13 @@ from uipath_orchestrator_rest.rest import ApiException
 from app import crud, schemas
 
 # Project-Specific Imports
-from app.core.celery_app import celery_app
+from app.core.celery_app import REALTIME_QUEUE, celery_app
 from app.core.config import settings
+from app.core.metrics import SYNC_ROWS, UIPATH_API_DURATION, UIPATH_API_REQUESTS
+from app.core.telemetry import current_report, percentiles, record_api_call, record_db_write
+from app.core.tracing import span
 from app.core.uipapiconfig import (
-    oauth2_session,
+    uipath_token_manager,
     uipclient_config,
     uipclient_folders,
     uipclient_jobs,
@@ -34,18 +44,117 @@ from app.core.uipapiconfig import (
     uipclient_sessions,
 )
 from app.crud.base import CRUDBase
-from app.db.session import get_db, get_db_async_pool
+from app.db.locks import sync_lock
+from app.db.session import db_pool, get_db, get_db_async_pool
+from app.schedules.jobpolling import POLL_SELECT, chunks, due_by_folder, id_filter
+from app.worker.runtime import async_runtime
 
 executor = ThreadPoolExecutor(max_workers=settings.EXECUTOR_MAX_THREADS)
 
 
+def _load_stored_token() -> schemas.UIPathTokenResponse | None:
+    """Token stored in DB by any process (API or another worker), so it is shared instead of fetched again"""
+    with get_db() as db:
+        return crud.uipath_token.get_latest_valid(db=db)
+
+
+def _store_token(tokenresponse: schemas.UIPathTokenResponse) -> None:
+    with get_db() as db:
+        crud.uipath_token.upsert(db=db, obj_in=tokenresponse)
+        crud.uipath_token.remove_expired(db=db)
+
+
+uipath_token_manager.loader = _load_stored_token
+uipath_token_manager.on_refresh = _store_token
+
+
+def _timed_call(func: Callable[..., Any], **kwargs: Any) -> tuple[Any, float]:
+    endpoint = getattr(func, "__name__", "unknown")
+    status = "error"
+    start = time.perf_counter()
+    try:
+        with span(
+            f"uipath.{endpoint}",
+            folder=kwargs.get("x_uipath_organization_unit_id"),
+            top=kwargs.get("top"),
+            skip=kwargs.get("skip"),
+        ):
+            response = uipath_token_manager.call(functools.partial(func, **kwargs))
+        status = "2xx"
+        return response, time.perf_counter() - start
+    except ApiException as e:
+        status = str(e.status)
+        raise
+    finally:
+        UIPATH_API_REQUESTS.inc(endpoint=endpoint, status=status)
+        UIPATH_API_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+async def _call_api(func: Callable[..., Any], **kwargs: Any) -> Any:
+    """Calls an API client method in the executor through the token manager:
+    the token is refreshed beforehand if it's about to expire and the call is retried once on 401.
+    The call is recorded in the current sync report (latency and pages per folder).
+
+    Args:
+        func (Callable): API client method (i.e. uipclient_jobs.jobs_get)
+        kwargs: Arguments for the API client method
+
+    Returns:
+        Any: API response
+    """
+    # The executor threads don't inherit the context: run the call in a copy of ours (trace spans)
+    context = contextvars.copy_context()
+    response, seconds = await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(context.run, _timed_call, func, **kwargs)
+    )
+    record_api_call(seconds, folder=kwargs.get("x_uipath_organization_unit_id"), page="count" not in kwargs)
+    return response
+
+
+def _call_api_sync(func: Callable[..., Any], **kwargs: Any) -> Any:
+    """Same as _call_api, in the calling thread"""
+    response, seconds = _timed_call(func, **kwargs)
+    record_api_call(seconds, folder=kwargs.get("x_uipath_organization_unit_id"), page="count" not in kwargs)
+    return response
+
+
+async def _bulk_write(obj_in: list[schemas.BaseApiModel], crudobject: CRUDBase, upsert: bool = True) -> set[Any]:
+    """Writes the rows in batches of INGESTION_UPSERT_BATCH_SIZE concurrently on the pooled engine, at most as many
+    at once as the pool has connections. A batch that fails on a constraint (i.e. a missing parent row) is written
+    again row by row, one at a time, so only the offending rows are lost, as with the per-row upserts.
+
+    Returns:
+        set[Any]: Primary keys of the rows inserted or changed
+    """
+    limit = asyncio.Semaphore(max(db_pool.pool_size, 1))
+
+    async def write_batch(batch: list[schemas.BaseApiModel]) -> set[Any]:
+        try:
+            async with limit, db_pool.session() as db:
+                return await crudobject.upsert_many_async(db=db, objs_in=batch, upsert=upsert)
+        except IntegrityError as e:
+            if len(batch) == 1:
+                logger.error(e)
+                return set()
+        written: set[Any] = set()
+        for obj in batch:
+            written |= await write_batch([obj])
+        return written
+
+    size = max(settings.INGESTION_UPSERT_BATCH_SIZE, 1)
+    batches = [obj_in[index : index + size] for index in range(0, len(obj_in), size)]
+    return set().union(*await asyncio.gather(*(write_batch(batch) for batch in batches)))
+
+
 async def _CRUDHelper_async(
     obj_in: list[schemas.BaseApiModel],
     crudobject: CRUDBase,
     upsert: bool = True,
+    report: schemas.SyncReport | None = None,
 ):
     """CRUD Helper to reuse in other functions asynchronously.
     Note, because it's async, each threadpool will get its own db session from the common pool.
+    If a report is provided, the rows are counted in it (inserted/updated/unchanged/skipped per folder).
     """
     # logger.debug("DB Sync")
     # with get_db() as db:
@@ -53,6 +162,7 @@ async def _CRUDHelper_async(
     # return
 
     logger.debug("CRUDHelper Async")
+    existing = _report_rows(report=report, crudobject=crudobject, obj_in=obj_in, upsert=upsert)
 
     async def process_object(obj):
         # Helper to run in threadpool
@@ -62,8 +172,20 @@ async def _CRUDHelper_async(
             else:
                 return await crudobject.create_safe_async(db=db, obj_in=obj)
 
-    tasks = [process_object(ob) for ob in obj_in]
-    results = await asyncio.gather(*tasks)
+    results: set[Any] | list[Any]
+    start = time.perf_counter()
+    with span("db.write", table=crudobject.model.__tablename__, rows=len(obj_in), upsert=upsert):
+        if settings.INGESTION_BULK_UPSERT:
+            results = await _bulk_write(obj_in=obj_in, crudobject=crudobject, upsert=upsert)
+            _report_unchanged(report=report, crudobject=crudobject, obj_in=obj_in, existing=existing, written=results)
+            changed = bool(results)
+        else:
+            tasks = [process_object(ob) for ob in obj_in]
+            results = await asyncio.gather(*tasks)
+            changed = bool(obj_in)
+        if changed:
+            await _mark_entity_written_async(crudobject)
+    record_db_write(time.perf_counter() - start)
     return results
 
 
@@ -72,6 +194,7 @@ def _CRUDHelper(
     crudobject: CRUDBase,
     upsert: bool = True,
     db: Session | None = None,
+    report: schemas.SyncReport | None = None,
 ):
     """CRUD Helper to reuse in other functions. Sync, mostly outdated
 
@@ -80,14 +203,265 @@ def _CRUDHelper(
     """
     if db is None:
         raise ValueError("No DB Object provided")
+    existing = _report_rows(report=report, crudobject=crudobject, obj_in=obj_in, upsert=upsert, db=db)
+    start = time.perf_counter()
+    changed = bool(obj_in)
+    if settings.INGESTION_BULK_UPSERT:
+        try:
+            written = crudobject.upsert_many(db=db, objs_in=obj_in, upsert=upsert)
+            db.commit()
+            _report_unchanged(report=report, crudobject=crudobject, obj_in=obj_in, existing=existing, written=written)
+            changed = bool(written)
+        except IntegrityError as e:
+            # Row by row below, so only the offending rows are lost
+            db.rollback()
+            logger.warning(f"Bulk upsert of {crudobject.model.__tablename__} failed, writing row by row: {e}")
+            _write_rows(obj_in=obj_in, crudobject=crudobject, upsert=upsert, db=db)
+    else:
+        _write_rows(obj_in=obj_in, crudobject=crudobject, upsert=upsert, db=db)
+    if changed:
+        _mark_entity_written(crudobject, db=db)
+    record_db_write(time.perf_counter() - start)
+
+
+def _write_rows(obj_in: list[schemas.BaseApiModel], crudobject: CRUDBase, upsert: bool, db: Session) -> None:
     if upsert:
-        for ob in obj_in:  # TODO insert all at once?
+        for ob in obj_in:
             crudobject.upsert(db=db, obj_in=ob)
     else:
         for ob in obj_in:
             crudobject.create_safe(db=db, obj_in=ob)
 
 
+def _reconcile_deleted(
+    crudobject: CRUDBase,
+    obj_in: list[schemas.BaseApiModel],
+    report: schemas.SyncReport | None = None,
+    folderlist: list[int] | None = None,
+) -> None:
+    """After a full (unfiltered) sync: soft deletes the rows of the synced folders (every row if folderlist is None)
+    that Orchestrator didn't return, and restores the ones it returned again. See CRUDBase.reconcile_deleted.
+    Folders that returned no rows are left alone: an empty answer is more likely a permissions/API problem than
+    everything in the folder deleted at once."""
+    if not settings.RECONCILE_DELETED_ENABLED:
+        return
+    entity = crudobject.model.__tablename__
+    folders: list[int] | None = None
+    if folderlist is None:
+        if not obj_in:
+            logger.warning(f"No {entity} returned, deleted rows not reconciled")
+            return
+    else:
+        returned = {getattr(obj, "OrganizationUnitId", None) for obj in obj_in}
+        folders = [folder for folder in folderlist if folder in returned]
+        empty = [folder for folder in folderlist if folder not in returned]
+        if empty:
+            logger.warning(f"No {entity} returned for folders {empty}, their deleted rows not reconciled")
+        if not folders:
+            return
+    pk = sqlalchemy_inspect(crudobject.model).primary_key[0]
+    with get_db() as db:
+        deleted, restored = crudobject.reconcile_deleted(
+            db=db, seen_ids=[getattr(obj, pk.name) for obj in obj_in], folders=folders
+        )
+    if deleted or restored:
+        logger.info(f"Reconciled {entity}: {deleted} deleted, {restored} restored")
+        _mark_entity_written(crudobject)
+    if report is not None:
+        report.deleted += deleted
+
+
+async def _reconcile_deleted_async(
+    crudobject: CRUDBase,
+    obj_in: list[schemas.BaseApiModel],
+    report: schemas.SyncReport | None = None,
+    folderlist: list[int] | None = None,
+) -> None:
+    """Same as _reconcile_deleted from the event loop: the DB work runs in the executor"""
+    await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(_reconcile_deleted, crudobject, obj_in, report=report, folderlist=folderlist)
+    )
+
+
+def _mark_entity_written(crudobject: CRUDBase, db: Session | None = None) -> None:
+    """Helper to flag that new data was written for the entity: updates the entity version token
+    (ETag/Last-Modified and query cache key of the local data endpoints)"""
+    entity = crudobject.model.__tablename__
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if db is None:
+        with get_db() as db:
+            crud.tracked_synctimes.update_entity_written(db=db, entity=entity, newtime=now)
+    else:
+        crud.tracked_synctimes.update_entity_written(db=db, entity=entity, newtime=now)
+
+
+async def _mark_entity_written_async(crudobject: CRUDBase) -> None:
+    """Same as _mark_entity_written from the event loop: the DB write runs in the executor"""
+    await asyncio.get_running_loop().run_in_executor(executor, _mark_entity_written, crudobject)
+
+
+def _jsonable(results: list[schemas.BaseApiModel]) -> list[dict]:
+    """Task results go through the JSON serializer of the result backend, pydantic models can't"""
+    return [obj.model_dump(mode="json") for obj in results]
+
+
+def _add_digest(digest: str | None, row_hash: int) -> str:
+    # Sum of the row hashes: the digest doesn't depend on the order the API returned the rows
+    return f"{(int(digest or '0', 16) + row_hash) % 2**64:016x}"
+
+
+def _report_rows(
+    report: schemas.SyncReport | None,
+    crudobject: CRUDBase,
+    obj_in: list[schemas.BaseApiModel],
+    upsert: bool,
+    db: Session | None = None,
+) -> set[Any]:
+    """Counts the rows about to be written in the sync report, per folder (OrganizationUnitId, 0 if there's none).
+    Rows whose primary key is already in the DB are updated (or skipped if upsert is False), the rest inserted.
+
+    Returns:
+        set[Any]: Primary keys of the rows already in the DB (empty without a report)
+    """
+    if report is None or not obj_in:
+        return set()
+    pk = sqlalchemy_inspect(crudobject.model).primary_key[0]
+    ids = [getattr(obj, pk.name) for obj in obj_in]
+    if db is None:
+        with get_db() as db:
+            existing = set(db.execute(select(pk).where(pk.in_(ids))).scalars())
+    else:
+        existing = set(db.execute(select(pk).where(pk.in_(ids))).scalars())
+    for obj in obj_in:
+        stats = report.folders.setdefault(getattr(obj, "OrganizationUnitId", None) or 0, schemas.FolderSyncStats())
+        stats.rows += 1
+        if getattr(obj, pk.name) not in existing:
+            stats.inserted += 1
+        elif upsert:
+            stats.updated += 1
+        else:
+            stats.skipped += 1
+        row_hash = int(hashlib.sha1(obj.model_dump_json().encode()).hexdigest()[:16], 16)
+        stats.digest = _add_digest(stats.digest, row_hash)
+    return existing
+
+
+def _report_unchanged(
+    report: schemas.SyncReport | None,
+    crudobject: CRUDBase,
+    obj_in: list[schemas.BaseApiModel],
+    existing: set[Any],
+    written: set[Any],
+) -> None:
+    """Moves the rows counted as updated that the upsert left as they were (nothing changed) to unchanged"""
+    if report is None or not existing:
+        return
+    pk = sqlalchemy_inspect(crudobject.model).primary_key[0]
+    # Same representation on both sides (i.e. UUID keys come back from the DB as UUID, the schemas have str)
+    existing_keys = {str(key) for key in existing}
+    written_keys = {str(key) for key in written}
+    for obj in obj_in:
+        key = str(getattr(obj, pk.name))
+        if key in existing_keys and key not in written_keys:
+            stats = report.folders[getattr(obj, "OrganizationUnitId", None) or 0]
+            if stats.updated:
+                stats.updated -= 1
+                stats.unchanged += 1
+
+
+def _finish_report(
+    report: schemas.SyncReport, results: list[schemas.BaseApiModel], start: float, fullresult: bool = False
+) -> dict:
+    """Totals of the report, ready for the result backend. The rows themselves are only included with fullresult"""
+    report.duration = time.monotonic() - start
+    report.rows = sum(stats.rows for stats in report.folders.values())
+    report.inserted = sum(stats.inserted for stats in report.folders.values())
+    report.updated = sum(stats.updated for stats in report.folders.values())
+    report.skipped = sum(stats.skipped for stats in report.folders.values())
+    report.unchanged = sum(stats.unchanged for stats in report.folders.values())
+    for stats in report.folders.values():
+        report.digest = _add_digest(report.digest, int(stats.digest or "0", 16))
+    report.api_latency_ms = percentiles(report._latencies)
+    for op in ("inserted", "updated", "unchanged", "skipped", "deleted"):
+        SYNC_ROWS.inc(getattr(report, op), entity=report.entity, op=op)
+    if fullresult:
+        report.results = _jsonable(results)
+    return report.model_dump(mode="json")
+
+
+def _ledger_start(report: schemas.SyncReport) -> int | None:
+    """Opens the sync_runs row of the run (the ledger never makes the sync fail)"""
+    if not settings.SYNC_RUNS_ENABLED:
+        return None
+    try:
+        with get_db() as db:
+            crud.sync_run.purge(db=db, days=settings.SYNC_RUNS_RETENTION_DAYS)
+            task_id = current_task.request.id if current_task else None
+            return crud.sync_run.start(db=db, entity=report.entity, task_id=task_id, filter=report.filter)
+    except Exception as e:
+        logger.warning(f"Could not add the {report.entity} sync to the ledger: {e}")
+        return None
+
+
+def _ledger_finish(runid: int | None, report: schemas.SyncReport, status: str, error: str | None = None) -> None:
+    if runid is None:
+        return
+    try:
+        with get_db() as db:
+            crud.sync_run.finish(db=db, id=runid, report=report, status=status, error=error)
+    except Exception as e:
+        logger.warning(f"Could not update the {report.entity} sync in the ledger: {e}")
+
+
+def _run_sync(
+    report: schemas.SyncReport,
+    runner: Callable[[], Any],
+    folderlist: list[int] | None = None,
+    fullresult: bool = False,
+    synctimes: bool = False,
+) -> dict:
+    """Runs a sync single-flight (see app.db.locks) with its report as the current one (see app.core.telemetry),
+    and records it in the sync_runs ledger: running, then success, failed or coalesced.
+    A coalesced sync that is a shard of a chord (see fanoutsync) raises, so the chord callback never runs for
+    folders that fetched nothing.
+
+    Args:
+        report (schemas.SyncReport): Report of the sync
+        runner (Callable[[], Any]): Runs the sync and returns the rows
+        folderlist (list[int] | None, optional): Folders being synced (part of the lock key). Defaults to None.
+        fullresult (bool, optional): Include every row in the result. Defaults to False.
+        synctimes (bool, optional): The sync starts from the watermark (part of the lock key). Defaults to False.
+
+    Returns:
+        dict: SyncReport (as a dict)
+    """
+    runid = _ledger_start(report)
+    token = current_report.set(report)
+    start = time.monotonic()
+    try:
+        with sync_lock(report.entity, folderlist, filter=report.filter, synctimes=synctimes) as acquired:
+            if not acquired:
+                report.coalesced = True
+                _ledger_finish(runid, report, "coalesced")
+            else:
+                start = time.monotonic()
+                result = runner()
+    except Exception as e:
+        report.duration = time.monotonic() - start
+        report.api_latency_ms = percentiles(report._latencies)
+        _ledger_finish(runid, report, "failed", error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current_report.reset(token)
+    if report.coalesced:
+        if current_task and current_task.request.chord:
+            raise RuntimeError(f"Sync of {report.entity} for folders {folderlist} coalesced, chord callback skipped")
+        return report.model_dump(mode="json")
+    summary = _finish_report(report, result, start, fullresult=fullresult)
+    _ledger_finish(runid, report, "success")
+    return summary
+
+
 def _APIResToList(response, objSchema):
     """Helper function to make a list of pydantic models from API Response
 
@@ -98,7 +472,8 @@ def _APIResToList(response, objSchema):
     Returns:
         list[objSchema]: List of items
     """
-    return [objSchema.parse_from_swagger(obj.to_dict(), obj.attribute_map) for obj in response.value]
+    with span("uipath.parse", schema=objSchema.__name__, rows=len(response.value)):
+        return [objSchema.parse_from_swagger(obj.to_dict(), obj.attribute_map) for obj in response.value]
 
 
 def _APIResToListQueueItem(response, objSchema):
@@ -113,14 +488,15 @@ def _APIResToListQueueItem(response, objSchema):
         list[objSchema]: List of items
     """
     res = []
-    for obj in response.value:
-        base_map = obj.attribute_map
-        if obj.processing_exception is not None:
-            excep_map = obj.processing_exception.attribute_map
-        else:
-            excep_map = None
-        parsed = objSchema.parse_from_swagger(obj.to_dict(), base_map, excep_map)
-        res.append(parsed)
+    with span("uipath.parse", schema=objSchema.__name__, rows=len(response.value)):
+        for obj in response.value:
+            base_map = obj.attribute_map
+            if obj.processing_exception is not None:
+                excep_map = obj.processing_exception.attribute_map
+            else:
+                excep_map = None
+            parsed = objSchema.parse_from_swagger(obj.to_dict(), base_map, excep_map)
+            res.append(parsed)
     return res
 
 
@@ -163,29 +539,27 @@ def validate_or_default_folderlist(folderlist: list[int] | None) -> list[int]:
 
 
 @celery_app.task(acks_late=True)
-def FetchUIPathToken(uipclient_config=uipclient_config) -> schemas.UIPathTokenResponse:
+def FetchUIPathToken(uipclient_config=uipclient_config, force: bool = False) -> schemas.UIPathTokenResponse:
     """Fetch UIPath Access Token.
-    Fetches a new token and update the "config" setting, deleting old tokens as well
+    The token is kept in memory by the token manager and only requested again when it's about to expire
+    (or when force is set). New tokens are stored in DB and the old ones are deleted.
+
+    Args:
+        force (bool, optional): Request a new token even if the current one is still valid. Defaults to False.
 
     Returns:
         UIPathTokenResponse: Pydantic model with all the parameters from repsonse (access token, expiration)
     """
-    logger.info("Refreshing token")
-    response = oauth2_session.fetch_token(url=settings.UIP_AUTH_TOKENURL, grant_type=settings.UIP_GRANT_TYPE)
-    tokenresponse = schemas.UIPathTokenResponse.parse_obj(response)
-    # We update the UIPConfig variable
+    tokenresponse = uipath_token_manager.get_token(force=force)
+    # We update the UIPConfig variable (if it's not the shared one already updated by the manager)
     if uipclient_config is not None:
         uipclient_config.access_token = tokenresponse.access_token
-    with get_db() as db:
-        crud.uipath_token.upsert(db=db, obj_in=tokenresponse)
-        crud.uipath_token.remove_expired(db=db)
-    logger.info("Token Updated")
     return tokenresponse
 
 
 @celery_app.task(acks_late=True)
 def GetUIPathToken(uipclient_config: Configuration = uipclient_config) -> str:
-    """Returns uipath token (bare string) from database
+    """Returns uipath token (bare string) from memory, or from database if this process doesn't have one yet
 
     Args:
         uipclient_config (Configuration, optional): _description_. Defaults to uipclient_config.
@@ -193,14 +567,23 @@ def GetUIPathToken(uipclient_config: Configuration = uipclient_config) -> str:
     Returns:
         str: Access token (Bearer)
     """
-    with get_db() as db:
-        token: str = crud.uipath_token.get(db=db)
+    token = uipath_token_manager.get_token().access_token
     uipclient_config.access_token = token
     return token
 
 
 @celery_app.task(acks_late=True)
-def fetchfolders(upsert: bool = True, fulldata: bool = True) -> Any:
+def fetchfolders(upsert: bool = True, fulldata: bool = True, fullresult: bool = False) -> dict:
+    """Get folders and save in DB (single-flight, see app.db.locks). Returns a SyncReport (as a dict)"""
+    report = schemas.SyncReport(entity="folders")
+
+    def runner() -> Any:
+        return _fetch_folders(upsert=upsert, fulldata=fulldata, report=report)
+
+    return _run_sync(report, runner, fullresult=fullresult)
+
+
+def _fetch_folders(upsert: bool = True, fulldata: bool = True, report: schemas.SyncReport | None = None) -> Any:
     """Get folders and save in DB. NOT ASYNC (not really needed)
     Args:
         db (Session, optional): Database session. Defaults to Depends(deps.get_db).
@@ -217,7 +600,7 @@ def fetchfolders(upsert: bool = True, fulldata: bool = True) -> Any:
     try:
         # Gets folders.
         select = objSchema.get_select_filter()
-        folders = uipclient_folders.folders_get(select=select)
+        folders = _call_api_sync(uipclient_folders.folders_get, select=select)
         folderlist = _APIResToList(response=folders, objSchema=objSchema)
         logger.info(f"Retrieved Folders API Info")
     except ApiException as e:
@@ -226,7 +609,8 @@ def fetchfolders(upsert: bool = True, fulldata: bool = True) -> Any:
     try:
         crudobject = crud.uip_folder
         with get_db() as db:
-            _CRUDHelper(crudobject=crudobject, upsert=upsert, obj_in=folderlist, db=db)
+            _CRUDHelper(crudobject=crudobject, upsert=upsert, obj_in=folderlist, db=db, report=report)
+        _reconcile_deleted(crudobject=crudobject, obj_in=folderlist, report=report)
         logger.info("Folder info stored in DB")
     except Exception as e:
         logger.error(f"Error when updating database: Folders: {e}")
@@ -246,6 +630,7 @@ async def fetch_jobs_async(
     folderlist: list[int] | None = None,
     filter: str | None = None,
     synctimes: bool = False,
+    report: schemas.SyncReport | None = None,
 ) -> list[schemas.JobGETResponse | schemas.JobGETResponse]:
     """Get Jobs and save in DB, ASYNC
 
@@ -277,22 +662,15 @@ async def fetch_jobs_async(
     async def fetch_from_folder(folder, top, skip):
         try:
             logger.info(f"Refreshing Jobs for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to jobs_get
-            jobs_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_jobs.jobs_get,
-                    select=select,
-                    filter=filter,
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                    top=top,
-                    skip=skip,
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            jobs_response = await _call_api(
+                uipclient_jobs.jobs_get,
+                select=select,
+                filter=filter,
+                x_uipath_organization_unit_id=folder,
+                top=top,
+                skip=skip,
             )
-            # Wait for result completion
-            jobs_response = jobs_result.get()  # type: ignore
             # Process response and map it to QueueItems schema
             jobs = _APIResToList(response=jobs_response, objSchema=objSchema)
             return jobs
@@ -303,21 +681,14 @@ async def fetch_jobs_async(
     async def fetch_count_from_folder(folder):
         try:
             logger.debug(f"Getting total count of Jobs  for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to jobs_get
-            jobs_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_jobs.jobs_get,
-                    select="Id",
-                    filter=filter,
-                    count="true",
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            jobs_response = await _call_api(
+                uipclient_jobs.jobs_get,
+                select="Id",
+                filter=filter,
+                count="true",
+                x_uipath_organization_unit_id=folder,
             )
-            # Wait for result completion
-            jobs_response = jobs_result.get()  # type: ignore
             totalcount: int = jobs_response[1]  # type: ignore
 
             logger.debug(f"Count for folder {folder} : {totalcount}")
@@ -348,7 +719,7 @@ async def fetch_jobs_async(
     try:
         # Insert/Update database (async)
         crudobject = crud.uip_job
-        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert)
+        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert, report=report)
         logger.info("Updated job info")
     except Exception as e:
         logger.error(f"Error when updating database: Jobs: {e}")
@@ -357,24 +728,115 @@ async def fetch_jobs_async(
     logger.info("Jobs fetched")
     if synctimes:
         crud.tracked_synctimes.update_jobsstarted(db=db, newtime=task_sync_time)
+        if report is not None:
+            report.watermark, report.filter = task_sync_time, filter
         logger.info(f"Jobs Info Successfully synced: '{filter}'")
     return results
 
 
 @celery_app.task(bind=True, acks_late=True)
-def fetchjobs(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False):
-    """A Celery task wrapper that runs the async fetch_jobs_async function."""
+def fetchjobs(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False, fullresult=False):
+    """A Celery task wrapper that runs the async fetch_jobs_async function.
+    Returns a SyncReport (as a dict), including every row only if fullresult is set."""
 
-    folderlist = folderlist or []
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="jobs", filter=filter)
 
     async def async_task_runner():
         return await fetch_jobs_async(
-            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes
+            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes, report=report
+        )
+
+    return _run_sync(
+        report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult, synctimes=synctimes
+    )
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    # The DB stores naive UTC datetimes, the API client returns aware ones
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def poll_jobs_async(
+    folderlist: list[int] | None = None, report: schemas.SyncReport | None = None
+) -> list[schemas.JobGETResponse]:
+    """Polls the state of the unfinished jobs that are due (see app.schedules.jobpolling), folder by folder and in
+    chunks of JOBPOLL_CHUNK_SIZE Ids, selecting only Id, State and EndTime. Only the jobs whose state changed are
+    written: the ones that reached a finished state are refetched in full (JOBPOLL_REFETCH_FINISHED), the rest
+    get their State/EndTime updated in place.
+
+    Args:
+        folderlist (list[int] | None, optional): Only the jobs of these folders. Defaults to every folder.
+        report (schemas.SyncReport | None, optional): Report of the sync. Defaults to None.
+
+    Returns:
+        list[schemas.JobGETResponse]: Jobs refetched in full
+    """
+    folderlist = validate_or_default_folderlist(folderlist)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with get_db() as db:
+        unfinished = crud.uip_job.get_unfinished(db=db)
+    due = {folder: jobs for folder, jobs in due_by_folder(unfinished, now).items() if folder in folderlist}
+    logger.info(f"Polling {sum(len(jobs) for jobs in due.values())} of {len(unfinished)} unfinished jobs")
+
+    async def poll_chunk(folder: int, jobs: Sequence[Any]) -> tuple[list[schemas.JobGETResponse], int]:
+        known = {job.Id: job for job in jobs}
+        response = await _call_api(
+            uipclient_jobs.jobs_get,
+            select=POLL_SELECT,
+            filter=id_filter(list(known)),
+            top=len(known),
+            x_uipath_organization_unit_id=folder,
         )
+        changes, finished = [], []
+        for obj in response.value:
+            job = known.get(obj.id)
+            if job is None:
+                continue
+            end_time = _naive_utc(obj.end_time)
+            if obj.state == job.State and end_time == job.EndTime:
+                continue
+            if obj.state in crud.uip_job.finished_states and settings.JOBPOLL_REFETCH_FINISHED:
+                finished.append(obj.id)
+            else:
+                changes.append({"job_id": obj.id, "state": obj.state, "end_time": end_time})
+        refetched = []
+        if finished:
+            refetched = await fetch_jobs_async(folderlist=[folder], filter=id_filter(finished))
+        with get_db() as db:
+            crud.uip_job.update_states(db=db, changes=changes)
+            crud.uip_job.mark_polled(db=db, ids=list(known), polled_at=now)
+        if report is not None:
+            stats = report.folders.setdefault(folder, schemas.FolderSyncStats())
+            stats.rows += len(known)
+            stats.updated += len(changes) + len(finished)
+            stats.unchanged += len(known) - len(changes) - len(finished)
+        return refetched, len(changes)
+
+    tasks = [
+        poll_chunk(folder, chunk) for folder, jobs in due.items() for chunk in chunks(jobs, settings.JOBPOLL_CHUNK_SIZE)
+    ]
+    polled = await asyncio.gather(*tasks)
+    if any(changed for _, changed in polled):
+        # The refetched jobs were already flagged by their upsert
+        await _mark_entity_written_async(crud.uip_job)
+    return [job for refetched, _ in polled for job in refetched]
+
+
+@celery_app.task(bind=True, acks_late=True)
+def polljobs(task: Task, folderlist: list[int] | None = None, fullresult: bool = False) -> dict:
+    """A Celery task wrapper that runs the async poll_jobs_async function.
+    Returns a SyncReport (as a dict), including the refetched jobs only if fullresult is set."""
+
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="jobspolled")
 
-    result = asyncio.run(async_task_runner())
+    async def async_task_runner() -> list[schemas.JobGETResponse]:
+        return await poll_jobs_async(folderlist=folderlist, report=report)
 
-    return result
+    return _run_sync(report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult)
 
 
 # -------------------------------
@@ -388,6 +850,7 @@ async def fetch_processes_async(
     folderlist: list[int] | None = None,
     filter: str | None = None,
     synctimes: bool = False,
+    report: schemas.SyncReport | None = None,
 ) -> Any:
     """Get Jobs and save in DB, ASYNC
 
@@ -403,6 +866,7 @@ async def fetch_processes_async(
     else:
         objSchema = schemas.ProcessGETResponse
     folderlist = validate_or_default_folderlist(folderlist)
+    fullsync = not filter
     filter = filter if filter else "Id ne 0"
     select = objSchema.get_select_filter()
     logger.info("Refreshing Releases")
@@ -411,22 +875,15 @@ async def fetch_processes_async(
     async def fetch_from_folder(folder, top, skip):
         try:
             logger.info(f"Refreshing Releases for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to releases_get
-            releases_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_processes.releases_get,
-                    select=select,
-                    filter=filter,
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                    top=top,
-                    skip=skip,
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            releases_response = await _call_api(
+                uipclient_processes.releases_get,
+                select=select,
+                filter=filter,
+                x_uipath_organization_unit_id=folder,
+                top=top,
+                skip=skip,
             )
-            # Wait for result completion
-            releases_response = releases_result.get()  # type: ignore
             # Process response and map it to Processes schema
             releases = _APIResToList(response=releases_response, objSchema=objSchema)
             return releases
@@ -437,21 +894,14 @@ async def fetch_processes_async(
     async def fetch_count_from_folder(folder):
         try:
             logger.debug(f"Getting total count of Releases for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to releases_get
-            releases_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_processes.releases_get,
-                    select="Id, ProcessKey, ProcessVersion, Name",
-                    filter=filter,
-                    count="true",
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            releases_response = await _call_api(
+                uipclient_processes.releases_get,
+                select="Id, ProcessKey, ProcessVersion, Name",
+                filter=filter,
+                count="true",
+                x_uipath_organization_unit_id=folder,
             )
-            # Wait for result completion
-            releases_response = releases_result.get()  # type: ignore
             totalcount: int = releases_response[1]  # type: ignore
 
             logger.debug(f"Count for folder {folder} : {totalcount}")
@@ -482,7 +932,9 @@ async def fetch_processes_async(
     try:
         # Insert/Update database (async)
         crudobject = crud.uip_process
-        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert)
+        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert, report=report)
+        if fullsync:
+            await _reconcile_deleted_async(crudobject=crudobject, obj_in=results, report=report, folderlist=folderlist)
         logger.info("Updated processes info")
     except Exception as e:
         logger.error(f"Error when updating database: Processes: {e}")
@@ -493,19 +945,23 @@ async def fetch_processes_async(
 
 
 @celery_app.task(bind=True, acks_late=True)
-def fetchprocesses(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False):
-    """A Celery task wrapper that runs the async fetch_processes_async function."""
+def fetchprocesses(
+    task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False, fullresult=False
+):
+    """A Celery task wrapper that runs the async fetch_processes_async function.
+    Returns a SyncReport (as a dict), including every row only if fullresult is set."""
 
-    folderlist = folderlist or []
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="processes", filter=filter)
 
     async def async_task_runner():
         return await fetch_processes_async(
-            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes
+            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes, report=report
         )
 
-    result = asyncio.run(async_task_runner())
-
-    return result
+    return _run_sync(
+        report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult, synctimes=synctimes
+    )
 
 
 # -------------------------------
@@ -519,6 +975,7 @@ async def fetch_queuedefinitions_async(
     folderlist: list[int] | None = None,
     filter: str | None = None,
     synctimes: bool = False,
+    report: schemas.SyncReport | None = None,
 ) -> Any:
     """Get Jobs and save in DB, ASYNC
 
@@ -534,6 +991,7 @@ async def fetch_queuedefinitions_async(
     else:
         objSchema = schemas.QueueDefinitionGETResponse
     folderlist = validate_or_default_folderlist(folderlist)
+    fullsync = not filter
     filter = filter if filter else "Id ne 0"
     select = objSchema.get_select_filter()
     logger.info("Refreshing Queue Definitions")
@@ -542,22 +1000,15 @@ async def fetch_queuedefinitions_async(
     async def fetch_from_folder(folder, top, skip):
         try:
             logger.info(f"Refreshing Releases for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_definitions_get
-            queue_definitions_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queuedefinitions.queue_definitions_get,
-                    select=select,
-                    filter=filter,
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                    top=top,
-                    skip=skip,
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queue_definitions_response = await _call_api(
+                uipclient_queuedefinitions.queue_definitions_get,
+                select=select,
+                filter=filter,
+                x_uipath_organization_unit_id=folder,
+                top=top,
+                skip=skip,
             )
-            # Wait for result completion
-            queue_definitions_response = queue_definitions_result.get()  # type: ignore
             # Process response and map it to Process schema
             queue_definitions = _APIResToList(response=queue_definitions_response, objSchema=objSchema)
             return queue_definitions
@@ -568,21 +1019,14 @@ async def fetch_queuedefinitions_async(
     async def fetch_count_from_folder(folder):
         try:
             logger.debug(f"Getting total count of Releases for folder: {folder}")
-            # Use apply_async with async_req=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_definitions_get
-            queue_definitions_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queuedefinitions.queue_definitions_get,
-                    select="Id, Name",
-                    filter=filter,
-                    count="true",
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queue_definitions_response = await _call_api(
+                uipclient_queuedefinitions.queue_definitions_get,
+                select="Id, Name",
+                filter=filter,
+                count="true",
+                x_uipath_organization_unit_id=folder,
             )
-            # Wait for result completion
-            queue_definitions_response = queue_definitions_result.get()  # type: ignore
             totalcount: int = queue_definitions_response[1]  # type: ignore
 
             logger.debug(f"Count for folder {folder} : {totalcount}")
@@ -613,7 +1057,9 @@ async def fetch_queuedefinitions_async(
     try:
         # Insert/Update database (async)
         crudobject = crud.uip_queue_definitions
-        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert)
+        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert, report=report)
+        if fullsync:
+            await _reconcile_deleted_async(crudobject=crudobject, obj_in=results, report=report, folderlist=folderlist)
         logger.info("Updated job info")
     except Exception as e:
         logger.error(f"Error when updating database: Queue Definitoins: {e}")
@@ -624,19 +1070,23 @@ async def fetch_queuedefinitions_async(
 
 
 @celery_app.task(bind=True, acks_late=True)
-def fetchqueuedefinitions(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False):
-    """A Celery task wrapper that runs the async fetch_queuedefinitions_async function."""
+def fetchqueuedefinitions(
+    task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False, fullresult=False
+):
+    """A Celery task wrapper that runs the async fetch_queuedefinitions_async function.
+    Returns a SyncReport (as a dict), including every row only if fullresult is set."""
 
-    folderlist = folderlist or []
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="queuedefinitions", filter=filter)
 
     async def async_task_runner():
         return await fetch_queuedefinitions_async(
-            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes
+            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes, report=report
         )
 
-    result = asyncio.run(async_task_runner())
-
-    return result
+    return _run_sync(
+        report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult, synctimes=synctimes
+    )
 
 
 # -------------------------------
@@ -650,6 +1100,7 @@ async def fetch_queue_items_async(
     folderlist: list[int] | None = None,
     filter: str | None = None,
     synctimes: bool = False,
+    report: schemas.SyncReport | None = None,
 ) -> Any:
     """Get QueueItems and save in DB (optional). Set formdata.cruddb to True"""
 
@@ -674,22 +1125,15 @@ async def fetch_queue_items_async(
     async def fetch_from_folder(folder, top, skip):
         try:
             logger.info(f"Refreshing qitems for folder: {folder}")
-            # Use apply_async with async_res=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_items_get
-            queueitems_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queueuitems.queue_items_get,
-                    select=select,
-                    filter=filter,
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_res=True is passed correctly
-                    top=top,
-                    skip=skip,
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queueitems_response = await _call_api(
+                uipclient_queueuitems.queue_items_get,
+                select=select,
+                filter=filter,
+                x_uipath_organization_unit_id=folder,
+                top=top,
+                skip=skip,
             )
-            # Wait for result completion
-            queueitems_response = queueitems_result.get()  # type: ignore
             # Process response and map it to QueueItems schema
             queueitems = _APIResToListQueueItem(response=queueitems_response, objSchema=objSchema)
             return queueitems
@@ -700,21 +1144,14 @@ async def fetch_queue_items_async(
     async def fetch_count_from_folder(folder):
         try:
             logger.debug(f"Getting total count of qitems for folder: {folder}")
-            # Use apply_async with async_res=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_items_get
-            queueitems_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queueuitems.queue_items_get,
-                    select="Id",
-                    filter=filter,
-                    count="true",
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queueitems_response = await _call_api(
+                uipclient_queueuitems.queue_items_get,
+                select="Id",
+                filter=filter,
+                count="true",
+                x_uipath_organization_unit_id=folder,
             )
-            # Wait for result completion
-            queueitems_response = queueitems_result.get()  # type: ignore
             totalcount: int = queueitems_response[1]  # type: ignore
 
             logger.debug(f"Count for folder {folder} : {totalcount}")
@@ -745,7 +1182,7 @@ async def fetch_queue_items_async(
     try:
         # Insert/Update database (async)
         crudobject = crud.uip_queue_item
-        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert)
+        await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert, report=report)
     except Exception as e:
         logger.error(f"Error when updating database: QueueItems: {e}")
         raise e
@@ -754,24 +1191,30 @@ async def fetch_queue_items_async(
 
     if synctimes:
         crud.tracked_synctimes.update_queueitemnew(db=db, newtime=task_sync_time)
+        if report is not None:
+            report.watermark, report.filter = task_sync_time, filter
         logger.info(f"Queue Items New Info Successfully synced: '{filter}'")
     return results
 
 
 @celery_app.task(bind=True, acks_late=True)
-def fetchqueueitems(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False):
-    """A Celery task wrapper that runs the async fetch_queue_items_async function."""
+def fetchqueueitems(
+    task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False, fullresult=False
+):
+    """A Celery task wrapper that runs the async fetch_queue_items_async function.
+    Returns a SyncReport (as a dict), including every row only if fullresult is set."""
 
-    folderlist = folderlist or []
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="queueitems", filter=filter)
 
     async def async_task_runner():
         return await fetch_queue_items_async(
-            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes
+            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes, report=report
         )
 
-    result = asyncio.run(async_task_runner())
-
-    return result
+    return _run_sync(
+        report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult, synctimes=synctimes
+    )
 
 
 # -------------------------------
@@ -785,6 +1228,7 @@ async def fetch_queue_item_events_async(
     folderlist: list[int] | None = None,
     filter: str | None = None,
     synctimes: bool = False,
+    report: schemas.SyncReport | None = None,
 ) -> Any:
     """Get QueueItem Events and save in DB (optional). Set formdata.cruddb to True"""
 
@@ -799,7 +1243,7 @@ async def fetch_queue_item_events_async(
 
     if synctimes:
         with get_db() as db:
-            lastsynctime = crud.tracked_synctimes.get_queueitemnew(db=db)
+            lastsynctime = crud.tracked_synctimes.get_queueitemevent(db=db)
             filter = f"Timestamp gt {lastsynctime.isoformat()}Z" if lastsynctime else None
             task_sync_time = datetime.now()
     results = []
@@ -808,22 +1252,15 @@ async def fetch_queue_item_events_async(
     async def fetch_from_folder(folder, top, skip):
         try:
             logger.info(f"Refreshing qitem events for folder: {folder}")
-            # Use apply_async with async_res=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_items_get
-            queueitems_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queueuitemevents.queue_item_events_get,
-                    select=select,
-                    filter=filter,
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_res=True is passed correctly
-                    top=top,
-                    skip=skip,
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queueitems_response = await _call_api(
+                uipclient_queueuitemevents.queue_item_events_get,
+                select=select,
+                filter=filter,
+                x_uipath_organization_unit_id=folder,
+                top=top,
+                skip=skip,
             )
-            # Wait for result completion
-            queueitems_response = queueitems_result.get()  # type: ignore
             # Process response and map it to QueueItemEvents schema
             queueitems = _APIResToList(response=queueitems_response, objSchema=objSchema)
             return queueitems
@@ -834,21 +1271,14 @@ async def fetch_queue_item_events_async(
     async def fetch_count_from_folder(folder):
         try:
             logger.debug(f"Getting total count of Qitem Events for folder: {folder}")
-            # Use apply_async with async_res=True, handled by asyncio's run_in_executor
-            # functools.partial allows us to pass arguments to queue_items_get
-            queueitems_result = await asyncio.get_running_loop().run_in_executor(
-                executor,
-                functools.partial(
-                    uipclient_queueuitemevents.queue_item_events_get,
-                    select="Id",
-                    filter=filter,
-                    count="true",
-                    x_uipath_organization_unit_id=folder,
-                    async_req=True,  # Ensuring async_req=True is passed correctly
-                ),
+            # Runs in the executor with a valid token (retried once on 401)
+            queueitems_response = await _call_api(
+                uipclient_queueuitemevents.queue_item_events_get,
+                select="Id",
+                filter=filter,
+                count="true",
+                x_uipath_organization_unit_id=folder,
             )
-            # Wait for result completion
-            queueitems_response = queueitems_result.get()  # type: ignore
             totalcount: int = queueitems_response[1]  # type: ignore
 
             logger.debug(f"Count for folder {folder} : {totalcount}")
@@ -885,13 +1315,17 @@ async def fetch_queue_item_events_async(
         logger.info("Queue items synced, ready to insert events")
         try:
             crudobject = crud.uip_queue_item_event
-            await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert)
+            await _CRUDHelper_async(obj_in=results, crudobject=crudobject, upsert=upsert, report=report)
         except Exception as e:
             logger.error(f"Error when updating database: QueueItemEvents: {e}")
             raise e
+        if settings.QUEUEITEM_STATUS_FROM_EVENTS:
+            await _apply_events_to_items_async(queueitemevents=results)
     logger.info("Queue Item event fetched")
     if synctimes:
         crud.tracked_synctimes.update_queueitemevent(db=db, newtime=task_sync_time)
+        if report is not None:
+            report.watermark, report.filter = task_sync_time, filter
         logger.info(f"Queue Items Event Info Succesfully synced: '{filter}'")
     return results
 
@@ -929,8 +1363,8 @@ async def _sync_events_to_items_async(
         filter = f"Id in ({', '.join(str(x) for x in ids_not_in_db)})"
         tasks.append(fetch_queue_items_async(upsert=True, fulldata=False, filter=filter))
         logger.info("New queue items added")
-    if existing_ids:
-        # Update
+    if existing_ids and not settings.QUEUEITEM_STATUS_FROM_EVENTS:
+        # Update (derived from the events once they are inserted otherwise, see _apply_events_to_items_async)
         logger.info("Updating items")
         filter = f"Id in ({', '.join(str(x) for x in existing_ids)})"
         tasks.append(fetch_queue_items_async(upsert=True, fulldata=False, filter=filter))
@@ -938,27 +1372,65 @@ async def _sync_events_to_items_async(
     await asyncio.gather(*tasks)
 
 
+async def _apply_events_to_items_async(
+    queueitemevents: list[schemas.QueueItemEventGETResponseExtended | schemas.QueueItemEventGETResponse],
+) -> None:
+    """With QUEUEITEM_STATUS_FROM_EVENTS, after inserting the events: derives the status of their items from the
+    events table in one UPDATE (see CRUDQueueItem.apply_latest_events) instead of refetching every item.
+    Only the items that ended Successful or Failed are refetched, for their Output/ProcessingException.
+    Orchestrator retries are new items (fetched in full as new ones), so RetryNumber never changes through events."""
+    unique_qitem_ids = list(set(item.QueueItemId for item in queueitemevents))
+    with get_db() as db:
+        updated = crud.uip_queue_item.apply_latest_events(db=db, ids=unique_qitem_ids)
+    logger.info(f"Status of {len(updated)} queue items derived from their events")
+    if not updated:
+        return
+    await _mark_entity_written_async(crud.uip_queue_item)
+    refetch = [row.Id for row in updated if row.Status in ("Successful", "Failed")]
+    if refetch:
+        filter = f"Id in ({', '.join(str(x) for x in refetch)})"
+        await fetch_queue_items_async(upsert=True, fulldata=False, filter=filter)
+
+
 @celery_app.task(bind=True, acks_late=True)
-def fetchqueueitemevents(task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False):
-    """A Celery task wrapper that runs the async fetch_queue_item_events_async function."""
+def fetchqueueitemevents(
+    task=None, upsert=True, fulldata=True, folderlist=None, filter=None, synctimes=False, fullresult=False
+):
+    """A Celery task wrapper that runs the async fetch_queue_item_events_async function.
+    Returns a SyncReport (as a dict), including every row only if fullresult is set."""
 
-    folderlist = folderlist or []
+    folderlist = validate_or_default_folderlist(folderlist)
+    report = schemas.SyncReport(entity="queueitemevents", filter=filter)
 
     async def async_task_runner():
         return await fetch_queue_item_events_async(
-            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes
+            upsert=upsert, fulldata=fulldata, folderlist=folderlist, filter=filter, synctimes=synctimes, report=report
         )
 
-    result = asyncio.run(async_task_runner())
-
-    return result
+    return _run_sync(
+        report, lambda: async_runtime.run(async_task_runner()), folderlist, fullresult=fullresult, synctimes=synctimes
+    )
 
 
 # -------------------
 # -----------Sessions
 # --------------------
 @celery_app.task(acks_late=True)
-def fetchsessions(upsert: bool = True, fulldata: bool = True, filter: str | None = None) -> Any:
+def fetchsessions(
+    upsert: bool = True, fulldata: bool = True, filter: str | None = None, fullresult: bool = False
+) -> dict:
+    """Get sessions and save in DB (single-flight, see app.db.locks). Returns a SyncReport (as a dict)"""
+    report = schemas.SyncReport(entity="sessions", filter=filter)
+
+    def runner() -> Any:
+        return _fetch_sessions(upsert=upsert, fulldata=fulldata, filter=filter, report=report)
+
+    return _run_sync(report, runner, fullresult=fullresult)
+
+
+def _fetch_sessions(
+    upsert: bool = True, fulldata: bool = True, filter: str | None = None, report: schemas.SyncReport | None = None
+) -> Any:
     """Get sessions and save in DB (optional). Set formdata.cruddb to True
 
     Args:
@@ -969,6 +1441,7 @@ def fetchsessions(upsert: bool = True, fulldata: bool = True, filter: str | None
         sessions: List of sessions (Pydantic models)
     """
     logger.info("Refreshing sessions")
+    fullsync = not filter
     filter = filter if filter else "SessionId ne 0"  # This is just a hack to avoid having to duplicate code
     if fulldata:
         objSchema = schemas.SessionGETResponseExtended
@@ -978,8 +1451,11 @@ def fetchsessions(upsert: bool = True, fulldata: bool = True, filter: str | None
     runtime_type = "Unattended"  # TODO Settings?
     with get_db() as db:
         try:
-            sessions = uipclient_sessions.sessions_get_machine_session_runtimes(
-                select=select, filter=filter, runtime_type=runtime_type
+            sessions = _call_api_sync(
+                uipclient_sessions.sessions_get_machine_session_runtimes,
+                select=select,
+                filter=filter,
+                runtime_type=runtime_type,
             )
             sessions = _APIResToList(response=sessions, objSchema=objSchema)
             logger.info("Sessions API INfo retrieved")
@@ -988,10 +1464,110 @@ def fetchsessions(upsert: bool = True, fulldata: bool = True, filter: str | None
             raise e
         try:
             crudobject = crud.uip_session
-            _CRUDHelper(crudobject=crudobject, upsert=upsert, db=db, obj_in=sessions)
+            _CRUDHelper(crudobject=crudobject, upsert=upsert, db=db, obj_in=sessions, report=report)
+            if fullsync:
+                _reconcile_deleted(crudobject=crudobject, obj_in=sessions, report=report)
             logger.info("Sessions updated in DB")
         except Exception as e:
             logger.error(f"Error when updating database: Sessions: {e}")
             raise e
     logger.info("sessions fetched")
     return sessions
+
+
+# -------------------
+# -----------Fan-out
+# --------------------
+# Shard task for each entity that can be split by folder
+_FANOUT_TASKS = {
+    "jobs": fetchjobs,
+    "processes": fetchprocesses,
+    "queuedefinitions": fetchqueuedefinitions,
+    "queueitems": fetchqueueitems,
+    "queueitemevents": fetchqueueitemevents,
+}
+
+# Watermark based entities: (get watermark, update watermark, field compared in the filter)
+_WATERMARKS = {
+    "jobs": (crud.tracked_synctimes.get_jobsstarted, crud.tracked_synctimes.update_jobsstarted, "CreationTime"),
+    "queueitems": (
+        crud.tracked_synctimes.get_queueitemnew,
+        crud.tracked_synctimes.update_queueitemnew,
+        "StartProcessing",
+    ),
+    "queueitemevents": (
+        crud.tracked_synctimes.get_queueitemevent,
+        crud.tracked_synctimes.update_queueitemevent,
+        "Timestamp",
+    ),
+}
+
+
+@celery_app.task(bind=True, acks_late=True)
+def fanoutsync(
+    task: Task,
+    entity: str,
+    upsert: bool = True,
+    fulldata: bool = True,
+    folderlist: list[int] | None = None,
+    filter: str | None = None,
+    synctimes: bool = False,
+    fullresult: bool = False,
+) -> dict:
+    """Splits a sync into one subtask per folder so it runs in parallel across every Celery worker.
+    With synctimes, the watermark filter is built once here (every shard uses the same one) and the watermark
+    is only advanced by the chord callback, which Celery only calls when all the shards succeeded.
+
+    Args:
+        entity (str): jobs, processes, queuedefinitions, queueitems or queueitemevents
+        Same arguments as the regular sync tasks
+
+    Returns:
+        dict: Entity, number of shards and filter used
+    """
+    if entity not in _FANOUT_TASKS:
+        raise ValueError(f"Entity can't be synced by folder: {entity}")
+    if synctimes and entity not in _WATERMARKS:
+        raise ValueError(f"Entity has no watermark: {entity}")
+    folderlist = validate_or_default_folderlist(folderlist)
+    shardtask = _FANOUT_TASKS[entity]
+    newtime = None
+    if synctimes:
+        get_watermark, _, field = _WATERMARKS[entity]
+        with get_db() as db:
+            lastsynctime = get_watermark(db=db)
+        filter = f"{field} gt {lastsynctime.isoformat()}Z" if lastsynctime else None
+        newtime = datetime.now()
+    # Shards go to the same queue the fan-out came from (realtime or bulk)
+    queue = (task.request.delivery_info or {}).get("routing_key") or REALTIME_QUEUE
+    shards = group(
+        shardtask.s(
+            upsert=upsert, fulldata=fulldata, folderlist=[folder], filter=filter, synctimes=False, fullresult=fullresult
+        ).set(queue=queue)
+        for folder in folderlist
+    )
+    if newtime is not None:
+        chord(shards)(advancewatermark.s(entity=entity, newtime=newtime.isoformat()).set(queue=queue))
+    else:
+        shards.apply_async()
+    logger.info(f"Sync of {entity} split in {len(folderlist)} folder shards")
+    return {"entity": entity, "shards": len(folderlist), "filter": filter}
+
+
+@celery_app.task(acks_late=True)
+def advancewatermark(results: list, entity: str, newtime: str) -> dict:
+    """Chord callback of fanoutsync, only called when every shard succeeded.
+    The watermark never goes backwards (an older fan-out finishing last doesn't undo a newer one), and doesn't move
+    if a shard didn't run (coalesced into another sync that may have started before this fan-out's filter)"""
+    get_watermark, update_watermark, _ = _WATERMARKS[entity]
+    if any(not isinstance(result, dict) or result.get("coalesced") for result in results):
+        logger.warning(f"Watermark of {entity} not advanced: a shard of the fan-out didn't run")
+        return {"entity": entity, "watermark": None, "rows": 0}
+    synctime = datetime.fromisoformat(newtime)
+    with get_db() as db:
+        lastsynctime = get_watermark(db=db)
+        if lastsynctime is None or synctime > lastsynctime:
+            update_watermark(db=db, newtime=synctime)
+            logger.info(f"Watermark of {entity} advanced to {newtime}")
+    rows = sum(result.get("rows", 0) for result in results if isinstance(result, dict))
+    return {"entity": entity, "watermark": newtime, "rows": rows}
@@ -6,8 +6,48 @@ set -e
 pkill -f 'celery -A app.worker worker' || true
 
 python /app/app/celeryworker_pre_start.py
-# Standard command, no autoreload
-celery -A app.worker worker -l info -Q main-queue -c 1
+
+# One worker pool per queue (see app/core/celery_app.py), so bulk backfills never starve the polling tasks.
+# WORKER_POOL=critical|realtime|bulk starts a single pool (one container per pool), "all" (default) starts the three.
+# Each pool exposes its worker metrics from its own base port (METRICS_WORKER_PORT + 0/10/20, plus the process index).
+METRICS_BASE_PORT="${METRICS_WORKER_PORT:-9101}"
+start_pool() {
+    case "$1" in
+        critical)
+            # Unfinished job state polling: short tasks, never wait behind the other syncs
+            METRICS_WORKER_PORT="$METRICS_BASE_PORT" \
+                celery -A app.worker worker -l info -n critical@%h -Q critical-queue -c 1 \
+                --prefetch-multiplier "${CRITICAL_PREFETCH:-1}"
+            ;;
+        realtime)
+            # Scheduled polling: short tasks, a small prefetch saves round trips to the broker
+            METRICS_WORKER_PORT=$((METRICS_BASE_PORT + 10)) \
+                celery -A app.worker worker -l info -n realtime@%h -Q main-queue -c "${REALTIME_CONCURRENCY:-1}" \
+                --prefetch-multiplier "${REALTIME_PREFETCH:-4}"
+            ;;
+        bulk)
+            # Backfills: long tasks, don't reserve more than the one running
+            METRICS_WORKER_PORT=$((METRICS_BASE_PORT + 20)) \
+                celery -A app.worker worker -l info -n bulk@%h -Q bulk-queue -c "${BULK_CONCURRENCY:-1}" \
+                --prefetch-multiplier "${BULK_PREFETCH:-1}"
+            ;;
+        *)
+            echo "Unknown WORKER_POOL: $1" >&2
+            exit 1
+            ;;
+    esac
+}
+
+if [ "${WORKER_POOL:-all}" = "all" ]; then
+    start_pool critical &
+    start_pool realtime &
+    start_pool bulk &
+    # Exit (and let the container restart) as soon as any of the pools dies
+    wait -n
+else
+    # Standard command, no autoreload
+    start_pool "${WORKER_POOL}"
+fi
 
 # Dockerfile will run it with autoreload:
-#watchmedo shell-command --patterns="*.py" --recursive --command='./worker-start.sh' .
\ No newline at end of file
+#watchmedo shell-command --patterns="*.py" --recursive --command='./worker-start.sh' .